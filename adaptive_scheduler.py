@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import threading
+import time
+
+from app_paths import user_data_path
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveIntervalEstimator:
+    """按一天中的时段自适应调整提醒间隔
+
+    每个小时保存一个间隔缩放系数和一个忽略率的指数滑动平均，
+    每次事件只做常数次运算、占用固定内存，不需要保存历史记录。
+    提醒被忽略（提醒后很快暂停或停止）时放宽该时段的间隔，
+    专注周期顺利完成时逐步收紧。
+
+    记录事件（在计时线程中）只修改内存中的状态并标记为未保存，不读写文件；
+    由界面线程调用 flush() 写入状态文件（TimerThread在阶段变化和停止时调用）。
+    """
+
+    BUCKETS = 24  # 按小时分桶
+    IGNORE_WINDOW = 30  # 提醒后多少秒内暂停/停止视为忽略
+
+    __slots__ = (
+        "scales",
+        "ignore_rates",
+        "alpha",
+        "widen_step",
+        "tighten_step",
+        "min_scale",
+        "max_scale",
+        "path",
+        "_lock",
+        "_save_lock",
+        "_dirty",
+    )
+
+    def __init__(self, path=None, alpha=0.2, widen_step=0.1, tighten_step=0.03,
+                 min_scale=0.7, max_scale=2.0):
+        """
+        Args:
+            path: 状态文件路径，默认在用户数据目录
+            alpha: 忽略率滑动平均的权重
+            widen_step: 每次被忽略时间隔放宽的比例
+            tighten_step: 每次顺利完成时间隔收紧的比例
+            min_scale/max_scale: 缩放系数的范围
+        """
+        self.scales = [1.0] * self.BUCKETS
+        self.ignore_rates = [0.0] * self.BUCKETS
+        self.alpha = alpha
+        self.widen_step = widen_step
+        self.tighten_step = tighten_step
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.path = path or user_data_path("adaptive_intervals.json")
+        self._lock = threading.Lock()  # 保护缩放系数和忽略率
+        self._save_lock = threading.Lock()  # 同一时间只有一个线程写临时文件
+        self._dirty = False
+
+    @staticmethod
+    def current_bucket():
+        """当前所在的时段"""
+        return time.localtime().tm_hour
+
+    def interval_range(self, min_interval, max_interval, bucket=None):
+        """获取调整后的提醒间隔范围（O(1)，在计时线程中调用）
+
+        只读取一个系数，不需要加锁。
+        """
+        scale = self.scales[self.current_bucket() if bucket is None else bucket]
+        low = max(1, int(min_interval * scale))
+        high = max(low, int(max_interval * scale))
+        return low, high
+
+    def record_ignored(self, bucket=None):
+        """记录一次被忽略的提醒"""
+        bucket = self.current_bucket() if bucket is None else bucket
+        with self._lock:
+            self.ignore_rates[bucket] += self.alpha * (1.0 - self.ignore_rates[bucket])
+            # 忽略率越高放宽得越快
+            step = self.widen_step * (1.0 + self.ignore_rates[bucket])
+            self.scales[bucket] = min(self.max_scale, self.scales[bucket] * (1.0 + step))
+            self._dirty = True
+
+    def record_completed(self, bucket=None):
+        """记录一次顺利完成的专注周期"""
+        bucket = self.current_bucket() if bucket is None else bucket
+        with self._lock:
+            self.ignore_rates[bucket] -= self.alpha * self.ignore_rates[bucket]
+            self.scales[bucket] = max(self.min_scale, self.scales[bucket] * (1.0 - self.tighten_step))
+            self._dirty = True
+
+    def reset(self):
+        """清除学习结果"""
+        with self._lock:
+            self.scales = [1.0] * self.BUCKETS
+            self.ignore_rates = [0.0] * self.BUCKETS
+            self._dirty = True
+
+    def load(self):
+        """从状态文件恢复，文件不存在或损坏时保持默认值"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            scales = [float(x) for x in data["scales"]]
+            ignore_rates = [float(x) for x in data["ignore_rates"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if len(scales) != self.BUCKETS or len(ignore_rates) != self.BUCKETS:
+            return False
+        with self._lock:
+            self.scales = [min(self.max_scale, max(self.min_scale, x)) for x in scales]
+            self.ignore_rates = ignore_rates
+            self._dirty = False
+        return True
+
+    def save(self):
+        """写入状态文件（先写临时文件再替换，避免写入一半），返回是否成功"""
+        with self._save_lock:
+            with self._lock:
+                data = {
+                    "scales": [round(x, 4) for x in self.scales],
+                    "ignore_rates": [round(x, 4) for x in self.ignore_rates],
+                }
+                self._dirty = False
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning("保存自适应间隔失败: %s", e)
+                self._dirty = True
+                return False
+        return True
+
+    def flush(self):
+        """有未保存的变化时写入状态文件"""
+        return self.save() if self._dirty else False
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""日志配置
+
+各模块使用 logging.getLogger(__name__) 记录日志，这里统一配置输出:
+
+- 调用方线程只把记录放入队列（只做消息插值），格式化和写入在后台线程完成，
+  标准输出被重定向或很慢时也不会阻塞界面线程
+- 按模块设置级别，未开启的级别在调用处只做一次整数比较
+- 控制台输出人类可读的文本，日志文件每行一个JSON对象，按大小轮转
+
+级别用一个字符串描述，逗号分隔，第一项可以是默认级别，其余为 模块=级别，例如:
+
+    info,sound_manager=debug,notifications=warning
+
+可以通过命令行 --log-level 或环境变量 RANDOM_REMINDER_LOG 指定。
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+from app_paths import user_data_dir
+
+DEFAULT_LEVELS = "info"
+ENV_LEVELS = "RANDOM_REMINDER_LOG"
+LOG_FILE_NAME = "random-reminder.log"
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """只在调用方线程插值消息的队列处理器
+
+    标准的QueueHandler会在调用方线程完成整条记录的格式化，
+    这里只生成消息文本并丢弃参数，时间、JSON等格式化留给后台线程。
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # 异常对象引用着调用栈，在这里转成文本
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出为一行JSON"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "ms": int(record.msecs),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def parse_levels(spec):
+    """解析级别描述
+
+    Returns:
+        (默认级别, {模块名: 级别})
+    """
+    default = logging.INFO
+    levels = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, level = item.rpartition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"未知的日志级别: {level}")
+        if name:
+            levels[name.strip()] = value
+        else:
+            default = value
+    return default, levels
+
+
+def setup_logging(levels=None, console=True, log_file=True):
+    """配置日志并启动后台写入线程（重复调用时先停止上一次的配置）
+
+    Args:
+        levels: 级别描述，格式错误时抛出ValueError；None时读取环境变量 RANDOM_REMINDER_LOG，
+            环境变量格式错误时使用默认级别并记录警告
+        console: 是否输出到标准错误
+        log_file: 是否写入用户数据目录下的轮转日志文件，也可以传入文件路径
+
+    Returns:
+        日志文件路径，不写文件时为None
+    """
+    global _listener
+    shutdown_logging()
+
+    invalid_env = None
+    if levels:
+        default, module_levels = parse_levels(levels)
+    else:
+        try:
+            default, module_levels = parse_levels(os.environ.get(ENV_LEVELS) or DEFAULT_LEVELS)
+        except ValueError as e:
+            invalid_env = e
+            default, module_levels = parse_levels(DEFAULT_LEVELS)
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        handlers.append(stream)
+    path = None
+    if log_file:
+        if log_file is True:
+            log_dir = os.path.join(user_data_dir(), "logs")
+            os.makedirs(log_dir, exist_ok=True)
+            path = os.path.join(log_dir, LOG_FILE_NAME)
+        else:
+            path = log_file
+        rotating = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+        rotating.setFormatter(JsonFormatter())
+        handlers.append(rotating)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(default)
+    for name, level in module_levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    if handlers:
+        records = queue.SimpleQueue()
+        root.addHandler(DeferredQueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(logging.NullHandler())
+    if invalid_env is not None:
+        logging.getLogger(__name__).warning(
+            "环境变量 %s 无效（%s），使用默认日志级别 %s", ENV_LEVELS, invalid_env, DEFAULT_LEVELS
+        )
+    return path
+
+
+def shutdown_logging():
+    """写完队列中剩余的记录并停止后台线程"""
+    global _listener
+    listener = _listener
+    _listener = None
+    if listener is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""用户数据目录
+
+命令行的status等子命令也会用到这里，因此只依赖os和sys，
+不导入pathlib、platform等启动较慢的模块。
+"""
+
+import os
+import sys
+
+APP_DIR_NAME = "random-reminder"
+
+
+def user_data_dir():
+    """获取用户数据目录（不存在时自动创建）
+
+    可以通过环境变量 RANDOM_REMINDER_DATA_DIR 指定其它目录。
+    """
+    override = os.environ.get("RANDOM_REMINDER_DATA_DIR")
+    home = os.path.expanduser("~")
+    if override:
+        path = override
+    elif sys.platform == "darwin":
+        path = os.path.join(home, "Library", "Application Support", APP_DIR_NAME)
+    elif sys.platform == "win32":
+        path = os.path.join(os.environ.get("APPDATA", home), APP_DIR_NAME)
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+        path = os.path.join(base, APP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def user_data_path(name):
+    """获取用户数据目录下的文件路径"""
+    return os.path.join(user_data_dir(), name)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""休息活动内容包测试（离屏平台运行，不需要显示器）
+
+1. 生成一个大内容包：高分辨率的JPEG、PNG和多帧GIF动画
+2. 打开休息窗口，以快速时钟驱动倒计时，让活动快速轮换两遍
+3. 测量倒计时槽函数的耗时和事件循环的最大停顿，检查解码不卡住倒计时
+4. 检查切换时下一项已经预取好的比例、缓存字节数不超过上限、峰值内存的增长有界
+5. 对照：在界面线程中直接加载原图并缩放一张最大的图片的耗时
+
+超出预算或检查失败时以非零状态码退出。
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/activity_bench.py --items 40
+"""
+
+import argparse
+import json
+import os
+import statistics
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QElapsedTimer, QEventLoop, QPointF, Qt, QTimer  # noqa: E402
+from PyQt6.QtGui import QColor, QImage, QLinearGradient, QPainter, QPixmap  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from break_activities import CACHE_BYTES, IMAGE_BOX, load_content_pack  # noqa: E402
+from break_window import BreakWindow  # noqa: E402
+from memory_report import current_rss  # noqa: E402
+from theme import apply_theme  # noqa: E402
+
+# 倒计时槽函数（含切换活动）的最长耗时预算（毫秒）
+SLOT_BUDGET_MS = 16
+# 事件循环停顿（探测定时器两次触发的间隔超出周期的部分）的预算（毫秒）
+STALL_BUDGET_MS = 50
+# 切换时下一项已在缓存中的最低比例
+READY_BUDGET = 0.9
+# 峰值内存在缓存上限之外最多增加的量（解码中的图像、Qt内部缓冲）
+RSS_SLACK_MB = 64
+
+TICK_MS = 100  # 快速时钟：每100毫秒相当于倒计时1秒
+PROBE_MS = 5
+
+
+def gradient_image(width, height, seed):
+    """生成带渐变和色块的图像"""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(QPointF(0, 0), QPointF(width, height))
+    gradient.setColorAt(0, QColor.fromHsv(seed * 37 % 360, 200, 230))
+    gradient.setColorAt(1, QColor.fromHsv(seed * 91 % 360, 160, 90))
+    painter.fillRect(image.rect(), gradient)
+    for index in range(40):
+        painter.fillRect(
+            (index * 97 + seed * 13) % width, (index * 53 + seed * 7) % height,
+            width // 12, height // 12, QColor.fromHsv((seed + index) * 29 % 360, 180, 200),
+        )
+    painter.end()
+    return image
+
+
+def write_gif(path, width, height, frames, seed):
+    """写出多帧GIF动画
+
+    Qt不能写GIF，这里用最简单的方式编码：灰阶调色板，LZW只输出字面码，
+    每250个码插入一次清除码，码宽固定为9位。
+    """
+    out = bytearray(b"GIF89a")
+    out += struct.pack("<HHBBB", width, height, 0xF7, 0, 0)
+    out += bytes(v for i in range(256) for v in (i, i, i))
+    out += b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"  # 循环播放
+    for frame in range(frames):
+        out += b"\x21\xf9\x04\x00" + struct.pack("<H", 8) + b"\x00\x00"  # 每帧80毫秒
+        out += struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0) + b"\x08"
+        shift = frame * 256 // frames + seed
+        pixels = bytes(((x + y) // 2 + shift) & 0xFF for y in range(height) for x in range(width))
+        data = _lzw_literals(pixels)
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            out += bytes([len(block)]) + block
+        out += b"\x00"
+    out += b"\x3b"
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _lzw_literals(pixels):
+    clear, end = 256, 257
+    codes = []
+    for start in range(0, len(pixels), 250):
+        codes.append(clear)
+        codes.extend(pixels[start:start + 250])
+    codes.append(end)
+    value = 0
+    bits = 0
+    data = bytearray()
+    for code in codes:
+        value |= code << bits
+        bits += 9
+        while bits >= 8:
+            data.append(value & 0xFF)
+            value >>= 8
+            bits -= 8
+    if bits:
+        data.append(value & 0xFF)
+    return bytes(data)
+
+
+def build_pack(path, items):
+    """生成内容包：JPEG、PNG和GIF轮流出现，返回各格式的数量和总大小"""
+    activities = []
+    counts = {"jpg": 0, "png": 0, "gif": 0}
+    for index in range(items):
+        kind = ("jpg", "png", "jpg", "gif")[index % 4]
+        name = f"activity-{index}.{kind}"
+        if kind == "gif":
+            write_gif(os.path.join(path, name), 480, 270, 24, index)
+        elif kind == "png":
+            gradient_image(2400, 1600, index).save(os.path.join(path, name), "PNG")
+        else:
+            gradient_image(4000, 3000, index).save(os.path.join(path, name), "JPEG", 90)
+        counts[kind] += 1
+        activities.append({"title": f"活动 {index}", "text": "跟着图片做", "image": name, "seconds": 60})
+    with open(os.path.join(path, "activities.json"), "w", encoding="utf-8") as f:
+        json.dump({"activities": activities}, f, ensure_ascii=False)
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return counts, size
+
+
+def run_break(window, ticks):
+    """以快速时钟驱动倒计时，返回槽函数耗时、事件循环停顿和内存采样"""
+    slot_ms = []
+    stalls = []
+    peak_rss = current_rss() or 0
+    probe_clock = QElapsedTimer()
+    state = {"ticks": 0, "last_probe": None}
+    # 用局部事件循环，QApplication.quit()会关闭所有窗口
+    loop = QEventLoop()
+
+    def tick():
+        nonlocal peak_rss
+        start = time.perf_counter()
+        window.update_timer()
+        slot_ms.append((time.perf_counter() - start) * 1000)
+        peak_rss = max(peak_rss, current_rss() or 0)
+        state["ticks"] += 1
+        if state["ticks"] >= ticks:
+            loop.quit()
+
+    def probe():
+        now = probe_clock.elapsed()
+        if state["last_probe"] is not None:
+            stalls.append(max(0, now - state["last_probe"] - PROBE_MS))
+        state["last_probe"] = now
+
+    driver = QTimer()
+    driver.setTimerType(Qt.TimerType.PreciseTimer)
+    driver.timeout.connect(tick)
+    prober = QTimer()
+    prober.setTimerType(Qt.TimerType.PreciseTimer)
+    prober.timeout.connect(probe)
+    probe_clock.start()
+    driver.start(TICK_MS)
+    prober.start(PROBE_MS)
+    loop.exec()
+    driver.stop()
+    prober.stop()
+    return slot_ms, stalls, peak_rss
+
+
+def sync_load_ms(path):
+    """对照：在界面线程加载原图再缩放"""
+    start = time.perf_counter()
+    QPixmap(path).scaled(IMAGE_BOX, Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="休息活动内容包测试")
+    parser.add_argument("--items", type=int, default=40, help="内容包中的活动数")
+    parser.add_argument("--rounds", type=int, default=2, help="轮换的遍数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    apply_theme(app)
+    problems = []
+
+    with tempfile.TemporaryDirectory() as pack:
+        counts, pack_bytes = build_pack(pack, args.items)
+        activities = load_content_pack(pack)
+        if len(activities) != args.items or not all(a.image for a in activities):
+            problems.append("内容包读取不完整")
+
+        window = BreakWindow(None, debug_mode=True, activities=activities)
+        # 倒计时足够长，不会在轮换完之前结束
+        window.total_seconds = window.remaining_seconds = 10 ** 6
+        window.timer.stop()
+        window.show()
+        app.processEvents()
+        view = window.activity_view
+        seconds_per_item = view.duration(view.current)
+        baseline_rss = current_rss() or 0
+
+        ticks = args.items * args.rounds * seconds_per_item
+        slot_ms, stalls, peak_rss = run_break(window, ticks)
+        cache = view.cache
+        result = {
+            "items": args.items,
+            "formats": counts,
+            "pack_mb": pack_bytes / 1024 / 1024,
+            "switches": view.switches,
+            "ready_ratio": view.ready_on_switch / max(1, view.switches),
+            "decodes": view.loader.decode_count,
+            "slot_ms": {"p50": statistics.median(slot_ms), "max": max(slot_ms)},
+            "stall_ms": {"p99": sorted(stalls)[int(len(stalls) * 0.99) - 1], "max": max(stalls)},
+            "cache": {
+                "entries": len(cache),
+                "mb": cache.bytes / 1024 / 1024,
+                "limit_mb": cache.max_bytes / 1024 / 1024,
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "evictions": cache.evictions,
+            },
+            "rss_growth_mb": (peak_rss - baseline_rss) / 1024 / 1024,
+        }
+        # 静态图片中最大的JPEG和PNG（Qt加载GIF时只解码第一帧）
+        result["sync_load_ms"] = max(
+            sync_load_ms(max(
+                (a.image for a in activities if a.image.endswith(suffix)), key=os.path.getsize
+            ))
+            for suffix in (".jpg", ".png")
+        )
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+    violations = list(problems)
+    if result["slot_ms"]["max"] > SLOT_BUDGET_MS:
+        violations.append(f"倒计时槽函数最长 {result['slot_ms']['max']:.1f} ms 超出预算 {SLOT_BUDGET_MS} ms")
+    if result["stall_ms"]["max"] > STALL_BUDGET_MS:
+        violations.append(f"事件循环最长停顿 {result['stall_ms']['max']} ms 超出预算 {STALL_BUDGET_MS} ms")
+    if result["ready_ratio"] < READY_BUDGET:
+        violations.append(f"切换时只有 {result['ready_ratio']:.0%} 的图片已预取，低于 {READY_BUDGET:.0%}")
+    if cache.bytes > cache.max_bytes:
+        violations.append("缓存字节数超过上限")
+    if result["rss_growth_mb"] > CACHE_BYTES / 1024 / 1024 + RSS_SLACK_MB:
+        violations.append(
+            f"峰值内存增长 {result['rss_growth_mb']:.0f} MB，超过缓存上限加 {RSS_SLACK_MB} MB"
+        )
+
+    if args.json:
+        print(json.dumps({**result, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        print(f"内容包: {args.items} 项 {counts}，共 {result['pack_mb']:.0f} MB")
+        print(f"切换 {result['switches']} 次，已预取 {result['ready_ratio']:.0%}，解码 {result['decodes']} 次")
+        print(f"倒计时槽函数: p50 {result['slot_ms']['p50']:.2f} ms, 最长 {result['slot_ms']['max']:.2f} ms；"
+              f"事件循环停顿 p99 {result['stall_ms']['p99']} ms, 最长 {result['stall_ms']['max']} ms")
+        c = result["cache"]
+        print(f"缓存: {c['entries']} 项 {c['mb']:.1f}/{c['limit_mb']:.0f} MB，"
+              f"命中 {c['hits']}，未命中 {c['misses']}，淘汰 {c['evictions']}")
+        print(f"峰值内存增长: {result['rss_growth_mb']:.1f} MB")
+        print(f"对照：在界面线程加载原图并缩放，最大的JPEG/PNG需要 {result['sync_load_ms']:.0f} ms")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""打包配置对比测试
+
+分别用 随机提醒.spec（单文件、UPX）和 随机提醒-onedir.spec（单目录、精简）打包，
+比较:
+
+1. 打包结果的大小；单文件还统计每次启动解压到临时目录的大小
+2. 冷启动：打包后第一次启动（Linux下以root运行并加 --drop-caches 时先清空页缓存）
+3. 热启动：连续多次启动的中位数
+
+启动耗时是从创建进程到主窗口显示后退出（--exit-after-start）的总时间。
+单目录的大小没有小于单文件每次解压的大小，或热启动没有更快时以非零状态码退出。
+
+需要安装PyInstaller，打包在 --out 指定的目录中进行（默认 build/compare）。
+
+用法: python benchmarks/build_compare.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    "onefile": "随机提醒.spec",
+    "onedir": "随机提醒-onedir.spec",
+}
+APP_NAME = "随机提醒"
+
+
+def build(profile, out_dir):
+    """用PyInstaller打包一种配置，返回可执行文件路径"""
+    dist = out_dir / profile / "dist"
+    work = out_dir / profile / "work"
+    subprocess.run(
+        [
+            sys.executable, "-m", "PyInstaller", "--noconfirm", "--log-level", "WARN",
+            "--distpath", str(dist), "--workpath", str(work), str(ROOT / PROFILES[profile]),
+        ],
+        cwd=ROOT,
+        check=True,
+    )
+    return executable(profile, out_dir)
+
+
+def executable(profile, out_dir):
+    """打包结果中的可执行文件"""
+    dist = out_dir / profile / "dist"
+    name = APP_NAME + (".exe" if sys.platform == "win32" else "")
+    if profile == "onedir":
+        return dist / APP_NAME / name
+    return dist / name
+
+
+def bundle_size(profile, path):
+    """单文件为文件大小，单目录为整个目录的大小（字节）"""
+    if profile == "onedir":
+        # 单目录中有指向同一动态库的符号链接，不重复计算
+        return sum(
+            f.stat().st_size for f in path.parent.rglob("*") if f.is_file() and not f.is_symlink()
+        )
+    return path.stat().st_size
+
+
+def payload_size(path):
+    """单文件每次启动解压出的内容大小（字节），无法读取时返回None"""
+    try:
+        from PyInstaller.archive.readers import CArchiveReader
+    except ImportError:
+        return None
+    # 目录项为 (偏移, 压缩后大小, 解压后大小, 是否压缩, 类型)
+    return sum(entry[2] for entry in CArchiveReader(str(path)).toc.values())
+
+
+def drop_caches():
+    """清空页缓存（仅Linux且有root权限时）"""
+    if not sys.platform.startswith("linux") or os.geteuid() != 0:
+        return False
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+    return True
+
+
+def launch(path, env):
+    """启动一次并在主窗口显示后退出，返回耗时（毫秒）"""
+    start = time.perf_counter()
+    subprocess.run([str(path), "--exit-after-start"], env=env, check=True, timeout=60)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(profile, path, runs, env, cold_drop):
+    dropped = drop_caches() if cold_drop else False
+    cold = launch(path, env)
+    warm = [launch(path, env) for _ in range(runs)]
+    payload = payload_size(path) if profile == "onefile" else bundle_size(profile, path)
+    return {
+        "size_mb": bundle_size(profile, path) / 1024 / 1024,
+        "payload_mb": payload / 1024 / 1024 if payload is not None else None,
+        "cold_ms": cold,
+        "cold_after_drop_caches": dropped,
+        "warm_ms": {"p50": statistics.median(warm), "min": min(warm), "max": max(warm)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="打包配置对比测试")
+    parser.add_argument("--runs", type=int, default=10, help="热启动次数")
+    parser.add_argument("--out", default=str(ROOT / "build" / "compare"), help="打包输出目录")
+    parser.add_argument("--skip-build", action="store_true", help="使用 --out 中已有的打包结果")
+    parser.add_argument("--drop-caches", action="store_true", help="冷启动前清空页缓存（需要root）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out)
+    if not args.skip_build:
+        try:
+            import PyInstaller  # noqa: F401
+        except ImportError:
+            print("需要先安装PyInstaller: pip install pyinstaller", file=sys.stderr)
+            return 2
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        # 使用空的数据目录，不读写用户的历史和检查点
+        env = dict(os.environ, RANDOM_REMINDER_DATA_DIR=data_dir)
+        for profile in PROFILES:
+            path = executable(profile, out_dir) if args.skip_build else build(profile, out_dir)
+            results[profile] = measure(profile, path, args.runs, env, args.drop_caches)
+
+    violations = []
+    onefile, onedir = results["onefile"], results["onedir"]
+    if onefile["payload_mb"] is not None and onedir["size_mb"] >= onefile["payload_mb"]:
+        violations.append(
+            f"单目录打包 {onedir['size_mb']:.1f} MB 不小于单文件每次解压的 "
+            f"{onefile['payload_mb']:.1f} MB"
+        )
+    if onedir["warm_ms"]["p50"] >= onefile["warm_ms"]["p50"]:
+        violations.append(
+            f"单目录热启动 {onedir['warm_ms']['p50']:.0f} ms 不快于单文件 "
+            f"{onefile['warm_ms']['p50']:.0f} ms"
+        )
+
+    if args.json:
+        print(json.dumps({"profiles": results, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        for profile, result in results.items():
+            cold = "清空页缓存后" if result["cold_after_drop_caches"] else "打包后首次"
+            payload = "未知" if result["payload_mb"] is None else f"{result['payload_mb']:.1f} MB"
+            print(f"{PROFILES[profile]}: {result['size_mb']:.1f} MB（解压后 {payload}）, "
+                  f"冷启动（{cold}） {result['cold_ms']:.0f} ms, "
+                  f"热启动 p50 {result['warm_ms']['p50']:.0f} ms "
+                  f"({result['warm_ms']['min']:.0f}-{result['warm_ms']['max']:.0f} ms)")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
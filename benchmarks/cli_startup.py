@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""启动速度测试
+
+1. 多次以新进程运行 `cli.py status`，统计墙钟耗时的中位数和p90，
+   并用 -X importtime 检查整个过程没有导入PyQt6
+2. 插件较多的场景：生成大量订阅了各种事件的插件包，比较安装前后主程序
+   （离屏平台，`main.py --exit-after-start`）的启动耗时和峰值内存，
+   并检查启动过程没有导入任何插件模块
+
+超出预算、导入了PyQt6或启动时导入了插件时以非零状态码退出。
+
+用法: python benchmarks/cli_startup.py --runs 20 --plugins 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI = str(ROOT / "cli.py")
+MAIN = str(ROOT / "main.py")
+
+# status 命令的启动预算（毫秒）
+STATUS_BUDGET_MS = 50
+# 安装插件后主程序热启动中位数最多增加的比例和毫秒数
+PLUGIN_STARTUP_RATIO = 1.10
+PLUGIN_STARTUP_SLACK_MS = 20
+# 安装插件后主程序峰值内存最多增加的量（KB）
+PLUGIN_RSS_BUDGET_KB = 2048
+
+PLUGIN_EVENTS = ("reminder", "rest_end", "focus_complete", "phase", "break_start", "break_end")
+PLUGIN_MODULE_PREFIX = "rr_bench_plugin_"
+
+
+def time_command(args, env, runs):
+    """返回每次运行的耗时（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.9) - 1]
+
+
+def make_plugins(site_dir, count):
+    """在site_dir中生成count个已安装的插件包，每个订阅一个事件"""
+    for index in range(count):
+        name = f"{PLUGIN_MODULE_PREFIX}{index}"
+        event = PLUGIN_EVENTS[index % len(PLUGIN_EVENTS)]
+        dist_info = os.path.join(site_dir, f"{name}-1.0.dist-info")
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w", encoding="utf-8") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w", encoding="utf-8") as f:
+            f.write(f"[random_reminder.{event}]\n{name} = {name}:handle\n")
+        # 模块导入时分配一块内存，启动时误导入会反映在峰值内存上
+        with open(os.path.join(site_dir, f"{name}.py"), "w", encoding="utf-8") as f:
+            f.write("PAYLOAD = bytearray(64 * 1024)\n\ndef handle(*args):\n    pass\n")
+
+
+def launch_app(env):
+    """启动一次主程序，返回 (耗时毫秒, 峰值内存KB)"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, MAIN, "--exit-after-start"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = (time.perf_counter() - start) * 1000
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"main.py 退出码 {process.returncode}")
+    return elapsed, usage.ru_maxrss
+
+
+def measure_app(env, runs):
+    """首次启动（插件索引未缓存）和热启动的耗时，以及峰值内存的中位数"""
+    first, _ = launch_app(env)
+    samples = [launch_app(env) for _ in range(runs)]
+    return {
+        "first_ms": first,
+        "median_ms": statistics.median(elapsed for elapsed, _ in samples),
+        "rss_kb": statistics.median(rss for _, rss in samples),
+    }
+
+
+def plugin_scenario(base_env, count, runs):
+    """比较没有插件和安装count个插件时的主程序启动"""
+    env = dict(base_env, QT_QPA_PLATFORM="offscreen")
+    plain_env = dict(env, RANDOM_REMINDER_DATA_DIR=tempfile.mkdtemp(prefix="rr-app-"))
+    site_dir = tempfile.mkdtemp(prefix="rr-plugins-")
+    make_plugins(site_dir, count)
+    python_path = os.pathsep.join(filter(None, [site_dir, env.get("PYTHONPATH")]))
+    plugin_env = dict(
+        env, PYTHONPATH=python_path, RANDOM_REMINDER_DATA_DIR=tempfile.mkdtemp(prefix="rr-app-")
+    )
+
+    plain = measure_app(plain_env, runs)
+    heavy = measure_app(plugin_env, runs)
+    importtime = subprocess.run(
+        [sys.executable, "-X", "importtime", MAIN, "--exit-after-start"],
+        env=plugin_env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    imported = [line for line in importtime.stderr.splitlines() if PLUGIN_MODULE_PREFIX in line]
+    return {"plugins": count, "plain": plain, "heavy": heavy, "imported_plugins": len(imported)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="命令行启动速度测试")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--plugins", type=int, default=500, help="插件场景中安装的插件数，0表示跳过")
+    parser.add_argument("--app-runs", type=int, default=5, help="主程序每种场景的启动次数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="rr-cli-")
+    env = dict(os.environ, RANDOM_REMINDER_DATA_DIR=data_dir)
+    # 伪造一个正在运行的守护进程（用本进程的pid），让status走完整的读取和推算路径
+    status = {
+        "pid": os.getpid(),
+        "phase": "focus",
+        "started_at": time.time(),
+        "updated_at": time.time(),
+        "focused_seconds": 600,
+        "focus_seconds_total": 5400,
+        "next_event_in": 120,
+        "reminder_interval": 240,
+        "rest_total": 10,
+        "reminders": 3,
+    }
+    with open(os.path.join(data_dir, "daemon_status.json"), "w", encoding="utf-8") as f:
+        json.dump(status, f)
+
+    baseline = summarize(time_command([sys.executable, "-c", "pass"], env, args.runs))
+    status_times = summarize(time_command([sys.executable, CLI, "status"], env, args.runs))
+
+    importtime = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI, "status"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    qt_modules = [line for line in importtime.stderr.splitlines() if "PyQt6" in line]
+
+    result = {
+        "interpreter_ms": {"median": baseline[0], "p90": baseline[1]},
+        "status_ms": {"median": status_times[0], "p90": status_times[1]},
+        "budget_ms": STATUS_BUDGET_MS,
+        "imports_pyqt6": bool(qt_modules),
+    }
+    violations = []
+    if status_times[0] > STATUS_BUDGET_MS:
+        violations.append(f"status 中位数 {status_times[0]:.1f} ms 超出预算 {STATUS_BUDGET_MS} ms")
+    if qt_modules:
+        violations.append("status 导入了 PyQt6")
+
+    plugins = None
+    if args.plugins > 0:
+        try:
+            plugins = plugin_scenario(env, args.plugins, args.app_runs)
+        except RuntimeError as e:
+            violations.append(f"插件场景无法启动主程序: {e}")
+    if plugins is not None:
+        result["plugin_scenario"] = plugins
+        plain, heavy = plugins["plain"], plugins["heavy"]
+        limit = plain["median_ms"] * PLUGIN_STARTUP_RATIO + PLUGIN_STARTUP_SLACK_MS
+        if heavy["median_ms"] > limit:
+            violations.append(
+                f"安装 {args.plugins} 个插件后主程序启动 {heavy['median_ms']:.0f} ms，"
+                f"超出 {limit:.0f} ms（无插件 {plain['median_ms']:.0f} ms）"
+            )
+        if heavy["rss_kb"] - plain["rss_kb"] > PLUGIN_RSS_BUDGET_KB:
+            violations.append(
+                f"安装 {args.plugins} 个插件后峰值内存增加 "
+                f"{(heavy['rss_kb'] - plain['rss_kb']) / 1024:.1f} MB，"
+                f"超出 {PLUGIN_RSS_BUDGET_KB / 1024:.0f} MB"
+            )
+        if plugins["imported_plugins"]:
+            violations.append(f"启动时导入了 {plugins['imported_plugins']} 个插件模块")
+
+    if args.json:
+        result["violations"] = violations
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"解释器空启动: 中位数 {baseline[0]:.1f} ms, p90 {baseline[1]:.1f} ms")
+        print(f"cli.py status: 中位数 {status_times[0]:.1f} ms, p90 {status_times[1]:.1f} ms")
+        print(f"导入PyQt6: {'是' if qt_modules else '否'}")
+        if plugins is not None:
+            for label, key in (("无插件", "plain"), (f"{plugins['plugins']} 个插件", "heavy")):
+                item = plugins[key]
+                print(f"主程序（{label}）: 首次 {item['first_ms']:.0f} ms, "
+                      f"热启动中位数 {item['median_ms']:.0f} ms, 峰值内存 {item['rss_kb'] / 1024:.1f} MB")
+            print(f"启动时导入的插件模块: {plugins['imported_plugins']}")
+        for violation in violations:
+            print(f"超出预算: {violation}")
+        if not violations:
+            print("全部在预算内")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对话框构建测试（离屏平台运行，不需要显示器）
+
+1. 反复构建并显示休息窗口和专注完成对话框，测量每次从构建到显示完成的耗时（p50/p95）
+2. 对照：同样的窗口在构建后按旧的方式给各控件单独设置样式表
+3. 检查构建和显示过程中没有调用 setStyleSheet（不解析样式表），控件没有自己的样式表，
+   全局样式表中的字号确实生效，切换主题也不会重新设置样式表
+
+检查失败或使用全局样式表没有比对照更快时以非零状态码退出。
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/dialog_bench.py --runs 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QCoreApplication, QEvent  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QLabel, QPushButton, QWidget  # noqa: E402
+
+from break_window import BreakWindow  # noqa: E402
+from main_window import BreakPromptDialog  # noqa: E402
+from theme import apply_theme  # noqa: E402
+
+# 各控件原来单独设置的样式表（对照组）
+LEGACY_STYLES = {
+    "promptTitle": "font-size: 16pt; font-weight: bold; margin: 10px;",
+    "breakTitle": "font-size: 24pt; font-weight: bold; margin: 20px;",
+    "breakDescription": "font-size: 14pt; margin: 10px;",
+    "breakCountdown": "font-size: 32pt; font-weight: bold; margin: 20px;",
+}
+LEGACY_PRIMARY_BUTTON = "font-size: 14pt; padding: 8px;"
+
+# 对象名 -> 全局样式表中规定的字号
+EXPECTED_POINT_SIZES = {
+    "promptTitle": 16,
+    "breakTitle": 24,
+    "breakDescription": 14,
+    "breakCountdown": 32,
+}
+
+DIALOGS = {
+    "BreakPromptDialog": lambda: BreakPromptDialog(None, 90),
+    "BreakWindow": lambda: BreakWindow(None, debug_mode=True),
+}
+
+
+class StyleSheetCounter:
+    """统计 setStyleSheet 的调用次数（控件和应用分开统计）"""
+
+    def __init__(self):
+        self.widget_calls = 0
+        self.app_calls = 0
+        self._widget_set = QWidget.setStyleSheet
+        self._app_set = QApplication.setStyleSheet
+
+    def install(self):
+        counter = self
+
+        def widget_set(widget, sheet):
+            counter.widget_calls += 1
+            counter._widget_set(widget, sheet)
+
+        def app_set(app, sheet):
+            counter.app_calls += 1
+            counter._app_set(app, sheet)
+
+        QWidget.setStyleSheet = widget_set
+        QApplication.setStyleSheet = app_set
+
+
+def apply_legacy_styles(dialog):
+    """按旧的方式给各控件单独设置样式表"""
+    for label in dialog.findChildren(QLabel):
+        sheet = LEGACY_STYLES.get(label.objectName())
+        if sheet:
+            label.setStyleSheet(sheet)
+    for button in dialog.findChildren(QPushButton):
+        if button.property("primary"):
+            button.setStyleSheet(LEGACY_PRIMARY_BUTTON)
+
+
+def open_dialog(factory, legacy):
+    """构建并显示一次，返回 (耗时毫秒, 窗口)"""
+    start = time.perf_counter()
+    dialog = factory()
+    if legacy:
+        apply_legacy_styles(dialog)
+    dialog.show()
+    QApplication.processEvents()
+    return (time.perf_counter() - start) * 1000, dialog
+
+
+def close_dialog(dialog):
+    dialog.close()
+    dialog.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    QApplication.processEvents()
+
+
+def check_dialog(name, dialog, problems):
+    """控件没有自己的样式表，全局样式表中的字号生效"""
+    for widget in [dialog] + dialog.findChildren(QWidget):
+        if widget.styleSheet():
+            problems.append(f"{name}: {widget.objectName() or type(widget).__name__} 设置了自己的样式表")
+    for label in dialog.findChildren(QLabel):
+        expected = EXPECTED_POINT_SIZES.get(label.objectName())
+        if expected is not None and label.font().pointSize() != expected:
+            problems.append(
+                f"{name}: {label.objectName()} 字号为 {label.font().pointSize()}，应为 {expected}"
+            )
+    for button in dialog.findChildren(QPushButton):
+        if button.property("primary") and button.font().pointSize() != 14:
+            problems.append(f"{name}: 主要按钮的字号为 {button.font().pointSize()}，应为 14")
+
+
+def measure(factory, runs):
+    """交替构建两种方式的窗口，避免系统负载的变化只影响其中一种"""
+    timings = {False: [], True: []}
+    for _ in range(runs):
+        for legacy in (False, True):
+            elapsed, dialog = open_dialog(factory, legacy)
+            timings[legacy].append(elapsed)
+            close_dialog(dialog)
+    return {legacy: summarize(values) for legacy, values in timings.items()}
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {"p50": statistics.median(timings), "p95": timings[int(len(timings) * 0.95) - 1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对话框构建测试")
+    parser.add_argument("--runs", type=int, default=200, help="每种窗口的构建次数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    counter = StyleSheetCounter()
+    counter.install()
+    apply_theme(app, "light")
+    problems = []
+    if counter.app_calls != 1:
+        problems.append(f"启动时设置了 {counter.app_calls} 次全局样式表")
+
+    results = {}
+    for name, factory in DIALOGS.items():
+        # 预热一次，并检查控件的样式
+        _, dialog = open_dialog(factory, legacy=False)
+        check_dialog(name, dialog, problems)
+        close_dialog(dialog)
+
+        before = counter.widget_calls + counter.app_calls
+        _, dialog = open_dialog(factory, legacy=False)
+        close_dialog(dialog)
+        calls = counter.widget_calls + counter.app_calls - before
+        if calls:
+            problems.append(f"{name}: 构建和显示时调用了 {calls} 次 setStyleSheet")
+        timings = measure(factory, args.runs)
+        results[name] = {
+            "themed_ms": timings[False],
+            "legacy_ms": timings[True],
+            "set_stylesheet_calls": calls,
+        }
+
+    # 切换主题只更换调色板
+    app_calls = counter.app_calls
+    apply_theme(app, "dark")
+    apply_theme(app, "light")
+    if counter.app_calls != app_calls:
+        problems.append("切换主题时重新设置了全局样式表")
+
+    violations = list(problems)
+    for name, result in results.items():
+        if result["themed_ms"]["p50"] >= result["legacy_ms"]["p50"]:
+            violations.append(
+                f"{name}: 使用全局样式表 p50 {result['themed_ms']['p50']:.2f} ms，"
+                f"不快于单独设置样式表的 {result['legacy_ms']['p50']:.2f} ms"
+            )
+
+    if args.json:
+        print(json.dumps({"dialogs": results, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        for name, result in results.items():
+            themed, legacy = result["themed_ms"], result["legacy_ms"]
+            print(f"{name}: 全局样式表 p50 {themed['p50']:.2f} ms / p95 {themed['p95']:.2f} ms，"
+                  f"单独设置样式表 p50 {legacy['p50']:.2f} ms / p95 {legacy['p95']:.2f} ms，"
+                  f"setStyleSheet 调用 {result['set_stylesheet_calls']} 次")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""计时引擎基准测试（不需要显示器，也不导入Qt）
+
+1. 模拟吞吐量：用虚拟时钟连续运行若干个专注周期，统计每秒能模拟多少小时
+2. 并发一致性：计时线程以虚拟时钟逐秒推进，多个生产者线程并发提交暂停/恢复/修改设置，
+   多个读者线程持续读取快照并检查跨字段的一致性；探针线程测量命令从提交到生效的延迟
+3. 检查点开销：原子写入一条检查点的耗时、每步调用update()的额外开销，并校验读回和损坏检测
+
+出现不一致的快照或命令延迟超出预算时以非零状态码退出。
+
+用法: python benchmarks/engine_bench.py --seconds 3 --producers 4 --readers 4
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_checkpoint import (  # noqa: E402
+    CHECKPOINT_SIZE,
+    Checkpointer,
+    read_checkpoint,
+)
+from timer_engine import (  # noqa: E402
+    ACTIVE_PHASES,
+    PHASE_FOCUS,
+    PHASE_LONG_BREAK,
+    PHASE_PAUSED,
+    PHASE_RESTING,
+    PHASE_STOPPED,
+    TimerEngine,
+)
+
+# 命令从提交到出现在快照中的p99延迟预算（毫秒）
+COMMAND_LATENCY_BUDGET_MS = 50
+# 写入一条检查点的p99耗时预算（毫秒），默认每5秒写一次
+CHECKPOINT_WRITE_BUDGET_MS = 5
+
+PHASES = (PHASE_FOCUS, PHASE_RESTING, PHASE_LONG_BREAK, PHASE_PAUSED, PHASE_STOPPED)
+
+
+def make_engine():
+    engine = TimerEngine()
+    engine.configure(idle_detection=False)
+    return engine
+
+
+def bench_simulation(cycles):
+    """用虚拟时钟连续运行若干个专注周期"""
+    engine = make_engine()
+    engine.configure(focus_time=90, min_interval=180, max_interval=300, rest_total=10)
+    simulated = 0
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(cycles):
+        engine.begin()
+        while engine.phase in ACTIVE_PHASES:
+            seconds = engine.core.next_wake()
+            engine.step(seconds)
+            simulated += seconds
+            steps += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "cycles": cycles,
+        "steps": steps,
+        "simulated_hours_per_second": simulated / 3600 / elapsed,
+        "us_per_step": elapsed / steps * 1e6,
+    }
+
+
+def check_snapshot(snapshot):
+    """检查快照的跨字段一致性，返回问题描述或None"""
+    if snapshot.phase not in PHASES:
+        return f"未知阶段 {snapshot.phase}"
+    if snapshot.phase == PHASE_RESTING and snapshot.reminder_passed != 0:
+        return "休息中但提醒计时未清零"
+    if snapshot.phase == PHASE_FOCUS and snapshot.rest_seconds != 0:
+        return "专注中但休息计时未清零"
+    # 运行中修改设置后剩余计划立即调整，到期的事件立即触发（暂停时在恢复后处理）
+    if snapshot.phase == PHASE_FOCUS and snapshot.reminder_passed > snapshot.reminder_interval > 0:
+        return "提醒计时超过间隔"
+    if snapshot.phase == PHASE_RESTING and snapshot.rest_seconds > snapshot.rest_total:
+        return "休息计时超过休息时间"
+    if not 0 <= snapshot.seconds_counter < 60:
+        return "秒计数越界"
+    return None
+
+
+def bench_concurrency(seconds, producers, readers):
+    """并发提交命令和读取快照"""
+    engine = make_engine()
+    engine.configure(focus_time=10 ** 6, min_interval=30, max_interval=90, rest_total=5)
+    stop = threading.Event()
+    counters = {"steps": 0, "commands": 0, "reads": 0}
+    problems = []
+    latencies = []
+
+    def driver():
+        # 唯一的写者：虚拟时钟逐秒推进
+        engine.begin()
+        steps = 0
+        while not stop.is_set():
+            if engine.phase not in ACTIVE_PHASES:
+                engine.begin()
+            engine.step(1)
+            steps += 1
+        counters["steps"] = steps
+
+    def producer(seed):
+        rng = random.Random(seed)
+        count = 0
+        while not stop.is_set():
+            choice = rng.random()
+            if choice < 0.3:
+                engine.pause()
+            elif choice < 0.6:
+                engine.resume()
+            else:
+                low = rng.randint(10, 60)
+                engine.configure(min_interval=low, max_interval=low + rng.randint(0, 60))
+            count += 1
+            time.sleep(0)
+        counters["commands"] += count
+
+    def reader():
+        count = 0
+        last_version = 0
+        while not stop.is_set():
+            snapshot = engine.snapshot()
+            problem = check_snapshot(snapshot)
+            if problem:
+                problems.append(problem)
+            if snapshot.version < last_version:
+                problems.append("快照版本回退")
+            last_version = snapshot.version
+            count += 1
+            time.sleep(0)  # 让出GIL，模拟界面线程间歇读取
+        counters["reads"] += count
+
+    def probe():
+        # 只有探针修改rest_total，在两个值之间切换，用它测量命令生效的延迟
+        value = 5
+        while not stop.is_set():
+            value = 3 if value == 5 else 5
+            start = time.perf_counter()
+            engine.configure(rest_total=value)
+            while engine.snapshot().rest_total != value:
+                if stop.is_set():
+                    return
+                time.sleep(0)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=driver)]
+    threads += [threading.Thread(target=producer, args=(i,)) for i in range(producers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=probe))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    return {
+        "steps_per_second": counters["steps"] / seconds,
+        "commands_per_second": counters["commands"] / seconds,
+        "snapshot_reads_per_second": counters["reads"] / seconds,
+        "command_latency_ms": {"p50": p50, "p99": p99, "samples": len(latencies)},
+        "inconsistent_snapshots": len(problems),
+        "problems": sorted(set(problems)),
+    }
+
+
+def bench_checkpoint(writes):
+    """测量检查点的写入开销"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "session.ckpt")
+        engine = make_engine()
+        engine.configure(focus_time=10000, min_interval=30, max_interval=90)
+        engine.begin()
+
+        # 每次都写入：interval=0，并让状态每次都变化
+        checkpointer = Checkpointer(path, interval=0)
+        durations = []
+        for _ in range(writes):
+            engine.step(1)
+            start = time.perf_counter()
+            checkpointer.update(engine.snapshot(), engine.config)
+            durations.append((time.perf_counter() - start) * 1000)
+        durations.sort()
+
+        checkpoint = read_checkpoint(path)
+        snapshot = engine.snapshot()
+        if checkpoint is None:
+            problems.append("检查点无法读回")
+        elif (checkpoint.elapsed_time, checkpoint.seconds_counter) != (
+            snapshot.elapsed_minutes, snapshot.seconds_counter
+        ):
+            problems.append("读回的检查点与快照不一致")
+        with open(path, "r+b") as f:
+            f.seek(20)
+            f.write(b"\xff")
+        if read_checkpoint(path) is not None:
+            problems.append("损坏的检查点未被拒绝")
+
+        # 正常间隔下每步的额外开销：绝大多数调用只比较一次时间
+        steps = writes * 20
+        engine.configure(checkpointer=Checkpointer(path, interval=5))
+        start = time.perf_counter()
+        for _ in range(steps):
+            engine.step(1)
+        with_checkpoint = time.perf_counter() - start
+        engine.configure(checkpointer=None)
+        start = time.perf_counter()
+        for _ in range(steps):
+            engine.step(1)
+        without_checkpoint = time.perf_counter() - start
+
+    return {
+        "record_bytes": CHECKPOINT_SIZE,
+        "write_ms": {
+            "p50": durations[len(durations) // 2],
+            "p99": durations[int(len(durations) * 0.99)],
+        },
+        "step_overhead_us": (with_checkpoint - without_checkpoint) / steps * 1e6,
+        "problems": problems,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="计时引擎基准测试")
+    parser.add_argument("--cycles", type=int, default=200, help="模拟的专注周期数")
+    parser.add_argument("--seconds", type=float, default=3, help="并发测试时长（秒）")
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=500, help="检查点写入次数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    simulation = bench_simulation(args.cycles)
+    concurrency = bench_concurrency(args.seconds, args.producers, args.readers)
+    checkpoint = bench_checkpoint(args.writes)
+
+    violations = list(concurrency["problems"]) + checkpoint["problems"]
+    p99 = concurrency["command_latency_ms"]["p99"]
+    if p99 > COMMAND_LATENCY_BUDGET_MS:
+        violations.append(f"命令延迟p99 {p99:.2f} ms 超出预算 {COMMAND_LATENCY_BUDGET_MS} ms")
+    write_p99 = checkpoint["write_ms"]["p99"]
+    if write_p99 > CHECKPOINT_WRITE_BUDGET_MS:
+        violations.append(
+            f"检查点写入p99 {write_p99:.2f} ms 超出预算 {CHECKPOINT_WRITE_BUDGET_MS} ms"
+        )
+
+    if args.json:
+        print(json.dumps(
+            {
+                "simulation": simulation,
+                "concurrency": concurrency,
+                "checkpoint": checkpoint,
+                "violations": violations,
+            },
+            ensure_ascii=False, indent=2,
+        ))
+    else:
+        print(f"模拟: {simulation['cycles']} 个周期, {simulation['steps']} 步, "
+              f"每步 {simulation['us_per_step']:.1f} µs, "
+              f"每秒模拟 {simulation['simulated_hours_per_second']:.0f} 小时")
+        print(f"并发: 推进 {concurrency['steps_per_second']:.0f} 步/秒, "
+              f"命令 {concurrency['commands_per_second']:.0f} 条/秒, "
+              f"快照读取 {concurrency['snapshot_reads_per_second']:.0f} 次/秒")
+        latency = concurrency["command_latency_ms"]
+        print(f"命令生效延迟: p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms "
+              f"({latency['samples']} 次)")
+        print(f"不一致的快照: {concurrency['inconsistent_snapshots']}")
+        print(f"检查点: 每条 {checkpoint['record_bytes']} 字节, "
+              f"写入 p50 {checkpoint['write_ms']['p50']:.3f} ms, "
+              f"p99 {checkpoint['write_ms']['p99']:.3f} ms, "
+              f"每步额外开销 {checkpoint['step_overhead_us']:.2f} µs")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""历史图表测试（离屏平台运行，不需要显示器）
+
+1. 生成多年的模拟历史，测量读取并构建多级分桶的耗时
+2. 在离屏画布上连续平移、缩放，测量每帧的绘制耗时（p50/p95）
+3. 检查每条折线的点数不超过像素宽度，所选级别的分桶数不超过宽度的两倍
+4. 检查降采样后保留了原始数据中的峰值
+5. 检查面板的 reload 在后台线程读取历史，不阻塞界面线程
+6. 检查可见范围的合计与基础分桶在 [t0, t1) 上的精确求和一致
+
+超出预算或检查失败时以非零状态码退出。
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/history_chart_bench.py --years 3
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtGui import QImage  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from history_chart import HistoryChart, HistoryChartPanel, HistoryTiles, lttb  # noqa: E402
+from session_history import (  # noqa: E402
+    EVENT_REMINDER,
+    EVENT_REST_END,
+    EVENT_START,
+    EVENT_STOP,
+    RECORD,
+)
+
+# 读取并构建分桶的耗时预算（毫秒）
+BUILD_BUDGET_MS = 3000
+# 每帧绘制耗时的p95预算（毫秒）
+FRAME_BUDGET_MS = 16
+# 面板 reload 在界面线程上的耗时预算（毫秒）
+RELOAD_BUDGET_MS = 50
+
+WIDTH = 1280
+HEIGHT = 360
+
+
+def generate_history(path, years, seed=3):
+    """按工作日生成专注时段，每段内随机提醒和短休息，返回事件数"""
+    rng = random.Random(seed)
+    day = 86400
+    start = time.time() - years * 365 * day
+    start -= start % day
+    count = 0
+    with open(path, "wb") as f:
+        for index in range(years * 365):
+            if index % 7 >= 5 and rng.random() < 0.8:
+                continue
+            t = start + index * day + rng.uniform(8, 10) * 3600
+            for _ in range(rng.randrange(2, 6)):
+                f.write(RECORD.pack(t, EVENT_START, 90))
+                end = t + rng.uniform(30, 90) * 60
+                t += rng.uniform(180, 300)
+                while t < end:
+                    f.write(RECORD.pack(t, EVENT_REMINDER, 240))
+                    t += 10
+                    f.write(RECORD.pack(t, EVENT_REST_END, 10))
+                    t += rng.uniform(180, 300)
+                    count += 2
+                f.write(RECORD.pack(end, EVENT_STOP, 0))
+                count += 2
+                t = end + rng.uniform(10, 60) * 60
+    return count
+
+
+def frame_plan(chart, frames, rng):
+    """依次执行的平移和缩放操作，覆盖从几小时到全部历史的跨度"""
+    start, end = chart.tiles.start, chart.tiles.end
+    plan = []
+    for index in range(frames):
+        kind = index % 4
+        if kind == 0:
+            plan.append(("zoom", rng.choice((0.5, 0.8, 1.25, 2.0)), rng.uniform(start, end)))
+        else:
+            plan.append(("pan", rng.uniform(-0.3, 0.3)))
+    return plan
+
+
+def render_frames(chart, plan):
+    """逐帧执行操作并离屏绘制，返回每帧耗时（毫秒）和检查数据"""
+    image = QImage(chart.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    timings = []
+    max_points = 0
+    max_bins = 0
+    for step in plan:
+        start = time.perf_counter()
+        if step[0] == "zoom":
+            chart.zoom(step[1], step[2])
+        else:
+            t0, t1 = chart.view
+            chart.pan(step[1] * (t1 - t0))
+        chart.render(image)
+        timings.append((time.perf_counter() - start) * 1000)
+        max_points = max(max_points, chart.points_drawn)
+        t0, t1 = chart.view
+        first, last = chart.tiles.bin_range(chart.level_used, t0, t1)
+        max_bins = max(max_bins, last - first)
+        # 偶尔回到全部历史或最近几小时，保证两端都被覆盖
+        if len(timings) % 50 == 0:
+            chart.show_all() if len(timings) % 100 == 0 else chart.show_recent(6 * 3600)
+    return timings, max_points, max_bins
+
+
+def check_peaks(tiles, width, problems):
+    """降采样必须保留最细一级中的最大值（形状保持）"""
+    _, focus, _ = tiles.levels[0]
+    values = list(focus)
+    if not values:
+        problems.append("历史为空")
+        return
+    peak = max(range(len(values)), key=values.__getitem__)
+    selected = lttb(values, 0, len(values), width)
+    if len(selected) > width:
+        problems.append(f"LTTB输出 {len(selected)} 个点，多于宽度 {width}")
+    # 与峰值相同高度的点被选中即可
+    if max(values[i] for i in selected) < values[peak]:
+        problems.append("降采样丢失了峰值")
+
+
+def check_totals(tiles, rng, problems, samples=200):
+    """totals 应等于基础分桶在 [t0, t1) 上按重叠比例的求和"""
+    seconds, focus, rest = tiles.levels[0]
+    for _ in range(samples):
+        t0 = rng.uniform(tiles.start - 3600, tiles.end)
+        t1 = t0 + rng.choice((600, 86400, 7 * 86400, 90 * 86400)) * rng.random()
+        expected = 0.0
+        a, b = (t0 - tiles.origin) / seconds, (t1 - tiles.origin) / seconds
+        for index in range(max(0, int(a) - 1), min(len(focus), int(b) + 2)):
+            overlap = min(b, index + 1) - max(a, index)
+            if overlap > 0:
+                expected += focus[index] * overlap
+        actual = tiles.totals(t0, t1)[0]
+        if abs(actual - expected) > max(1.0, expected * 1e-4):
+            problems.append(f"totals({t0:.0f}, {t1:.0f}) 为 {actual:.0f}，应为 {expected:.0f}")
+            return
+
+
+def check_panel_reload(path, problems):
+    """面板的 reload 不应在界面线程读取历史"""
+    panel = HistoryChartPanel(path)
+    start = time.perf_counter()
+    panel.reload()
+    reload_ms = (time.perf_counter() - start) * 1000
+    if reload_ms > RELOAD_BUDGET_MS:
+        problems.append(f"reload 阻塞界面线程 {reload_ms:.0f} ms 超出预算 {RELOAD_BUDGET_MS} ms")
+    deadline = time.monotonic() + 60
+    while panel.loading and time.monotonic() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.005)
+    if panel.loading or not panel.chart.tiles.levels[0][1]:
+        problems.append("后台读取历史没有完成")
+    panel.deleteLater()
+    return reload_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="历史图表测试")
+    parser.add_argument("--years", type=int, default=3, help="模拟历史的年数")
+    parser.add_argument("--frames", type=int, default=300, help="平移和缩放的帧数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(5)
+    problems = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.bin")
+        events = generate_history(path, args.years)
+        start = time.perf_counter()
+        tiles = HistoryTiles.from_history(path)
+        build_ms = (time.perf_counter() - start) * 1000
+        reload_ms = check_panel_reload(path, problems)
+
+    chart = HistoryChart()
+    chart.resize(WIDTH, HEIGHT)
+    chart.set_tiles(tiles)
+    chart.show_all()
+    plot_width = int(chart.plot_rect().width())
+
+    timings, max_points, max_bins = render_frames(chart, frame_plan(chart, args.frames, rng))
+    check_peaks(tiles, plot_width, problems)
+    check_totals(tiles, rng, problems)
+    app.processEvents()
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    result = {
+        "events": events,
+        "base_bins": len(tiles.levels[0][1]),
+        "build_ms": build_ms,
+        "reload_ms": reload_ms,
+        "frame_ms": {"p50": p50, "p95": p95, "max": timings[-1]},
+        "plot_width": plot_width,
+        "max_points_per_series": max_points // 2,
+        "max_bins_in_view": max_bins,
+    }
+    violations = list(problems)
+    if build_ms > BUILD_BUDGET_MS:
+        violations.append(f"构建分桶耗时 {build_ms:.0f} ms 超出预算 {BUILD_BUDGET_MS} ms")
+    if p95 > FRAME_BUDGET_MS:
+        violations.append(f"每帧绘制 p95 {p95:.1f} ms 超出预算 {FRAME_BUDGET_MS} ms")
+    if max_points // 2 > plot_width:
+        violations.append(f"每条折线最多 {max_points // 2} 个点，多于宽度 {plot_width} 像素")
+    # 分桶范围两侧各多取一个
+    if max_bins > plot_width * 2 + 3:
+        violations.append(f"所选级别在可见范围内有 {max_bins} 个分桶，多于宽度的两倍")
+
+    if args.json:
+        print(json.dumps({**result, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        print(f"历史: {events} 条事件，{result['base_bins']} 个分钟分桶，构建耗时 {build_ms:.0f} ms，"
+              f"面板 reload 阻塞 {reload_ms:.1f} ms")
+        print(f"绘制 {len(timings)} 帧: p50 {p50:.2f} ms, p95 {p95:.2f} ms, 最长 {timings[-1]:.2f} ms")
+        print(f"每条折线最多 {max_points // 2} 个点（宽度 {plot_width} 像素），"
+              f"可见范围内最多 {max_bins} 个分桶")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""日志开销测试（不需要显示器，也不导入Qt）
+
+用 app_logging.setup_logging 配置日志，把标准错误换成每次写入都很慢的流
+（模拟被重定向到慢速管道或网络盘），统计调用方线程的开销:
+
+1. 未开启级别的调用（logger.debug 带参数）每次的耗时，应接近一次空函数调用
+2. 开启级别的调用只入队，耗时与输出有多慢无关
+3. 作为对照，测量同步 StreamHandler 直接写入同一个慢速流的耗时
+4. 停止日志后所有记录都已写出，没有丢失
+
+超出预算或记录丢失时以非零状态码退出。
+
+用法: python benchmarks/logging_bench.py --records 200 --write-delay 0.002
+"""
+
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app_logging import setup_logging, shutdown_logging  # noqa: E402
+
+# 未开启级别的调用耗时预算（纳秒）
+DISABLED_BUDGET_NS = 1000
+# 开启级别的调用耗时中位数预算（微秒），与输出流的速度无关。
+# 调用之间有休眠，每次调用时缓存是冷的，比连续调用慢数倍
+ENABLED_P50_BUDGET_US = 100
+# 异步写入的调用耗时中位数至少比同步写入快多少倍
+SPEEDUP_BUDGET = 10
+
+
+class SlowStream(io.StringIO):
+    """每次写入都要等待一段时间的流"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return super().write(text)
+
+
+def time_disabled(logger, count):
+    """未开启级别的调用，每次耗时（纳秒）"""
+    value = {"elapsed": 12, "interval": 300}
+    start = time.perf_counter_ns()
+    for index in range(count):
+        logger.debug("剩余 %s 秒，下次提醒 %s", index, value)
+    return (time.perf_counter_ns() - start) / count
+
+
+def time_enabled(logger, count, interval):
+    """开启级别的调用，按一定间隔记录，返回每次耗时（微秒）"""
+    durations = []
+    for index in range(count):
+        start = time.perf_counter()
+        logger.info("提醒 %s，休息 %s 秒", index, 10)
+        durations.append((time.perf_counter() - start) * 1e6)
+        time.sleep(interval)
+    durations.sort()
+    return durations
+
+
+def summary(durations):
+    return {
+        "p50": durations[len(durations) // 2],
+        "p99": durations[int(len(durations) * 0.99)],
+        "max": durations[-1],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="日志开销测试")
+    parser.add_argument("--records", type=int, default=200, help="开启级别时记录的条数")
+    parser.add_argument("--disabled-calls", type=int, default=200000, help="未开启级别时的调用次数")
+    parser.add_argument("--write-delay", type=float, default=0.002, help="慢速流每次写入的延迟（秒）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    logger = logging.getLogger("bench.logging")
+    stderr = sys.stderr
+    slow = SlowStream(args.write_delay)
+    sys.stderr = slow
+    try:
+        setup_logging("info", console=True, log_file=False)
+        disabled_ns = time_disabled(logger, args.disabled_calls)
+        queued = time_enabled(logger, args.records, args.write_delay / 4)
+        shutdown_start = time.perf_counter()
+        shutdown_logging()
+        shutdown_ms = (time.perf_counter() - shutdown_start) * 1000
+    finally:
+        shutdown_logging()
+        sys.stderr = stderr
+    written = slow.getvalue().count("\n")
+
+    # 对照组：同步写入同一个慢速流
+    sync_stream = SlowStream(args.write_delay)
+    sync_logger = logging.getLogger("bench.logging.sync")
+    sync_logger.propagate = False
+    sync_logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sync_stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    sync_logger.addHandler(handler)
+    synchronous = time_enabled(sync_logger, args.records, 0)
+    sync_logger.removeHandler(handler)
+
+    result = {
+        "records": args.records,
+        "disabled_ns": disabled_ns,
+        "queued_us": summary(queued),
+        "synchronous_us": summary(synchronous),
+        "written": written,
+        "shutdown_ms": shutdown_ms,
+    }
+
+    violations = []
+    if disabled_ns > DISABLED_BUDGET_NS:
+        violations.append(f"未开启级别的调用 {disabled_ns:.0f} ns 超出预算 {DISABLED_BUDGET_NS} ns")
+    queued_p50 = result["queued_us"]["p50"]
+    if queued_p50 > ENABLED_P50_BUDGET_US:
+        violations.append(f"开启级别的调用中位数 {queued_p50:.1f} µs 超出预算 {ENABLED_P50_BUDGET_US} µs")
+    speedup = result["synchronous_us"]["p50"] / max(queued_p50, 1e-3)
+    if speedup < SPEEDUP_BUDGET:
+        violations.append(f"异步写入只比同步写入快 {speedup:.1f} 倍，低于 {SPEEDUP_BUDGET} 倍")
+    if written != args.records:
+        violations.append(f"只写出了 {written}/{args.records} 条记录")
+
+    if args.json:
+        print(json.dumps({**result, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        print(f"未开启级别的调用: {disabled_ns:.0f} ns")
+        for label, key in (("队列写入", "queued_us"), ("同步写入（对照）", "synchronous_us")):
+            stats = result[key]
+            print(f"{label}: p50 {stats['p50']:.1f} µs, p99 {stats['p99']:.1f} µs, "
+                  f"最大 {stats['max']:.1f} µs")
+        print(f"写出 {written}/{args.records} 条，停止日志耗时 {shutdown_ms:.0f} ms")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
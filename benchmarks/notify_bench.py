@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""通知分发测试（不需要显示器，也不导入Qt）
+
+在本地启动一个Webhook桩服务：/fast 立即返回，/slow 延迟很久才返回，/error 返回500。
+模拟计时线程按固定间隔产生通知，同时分发到快速Webhook、慢速Webhook、
+报错的Webhook、快速脚本和卡住的脚本，统计:
+
+1. dispatch() 的耗时（计时线程为此付出的代价），最长耗时必须远小于慢速渠道的超时
+2. 快速渠道是否收到全部通知，不受慢速渠道影响
+3. 慢速渠道按各自的超时失败，积压不超过队列上限
+4. 关闭分发器的耗时不超过最长的渠道超时
+
+dispatch() 超出预算或上述检查失败时以非零状态码退出。
+
+用法: python benchmarks/notify_bench.py --events 100 --interval 0.01
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notifications import (  # noqa: E402
+    NotificationDispatcher,
+    ScriptChannel,
+    WebhookChannel,
+    timer_notification,
+)
+from timer_core import NOTIFY_REMINDER  # noqa: E402
+
+# dispatch() 耗时中位数的预算（毫秒）
+DISPATCH_P50_BUDGET_MS = 0.5
+# dispatch() 最长耗时的预算（毫秒）：工作线程忙于CPU时可能要等一个GIL切换间隔（5毫秒），
+# 但必须远小于慢速渠道的超时，说明计时线程从不等待渠道的I/O
+DISPATCH_MAX_BUDGET_MS = 20
+# 慢速Webhook的响应延迟（秒），远大于渠道超时
+SLOW_DELAY = 3.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Webhook桩服务"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        json.loads(body)
+        if self.path == "/slow":
+            time.sleep(SLOW_DELAY)
+        status = 500 if self.path == "/error" else 204
+        with self.server.lock:
+            self.server.received[self.path] = self.server.received.get(self.path, 0) + 1
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.received = {}
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def named(channel, name):
+    channel.name = name
+    return channel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="通知分发测试")
+    parser.add_argument("--events", type=int, default=100, help="产生的通知数")
+    parser.add_argument("--interval", type=float, default=0.01, help="通知间隔（秒）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    # 慢速和报错渠道的失败是预期的，只看统计
+    logging.getLogger("notifications").setLevel(logging.ERROR)
+    server = start_stub_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    channels = [
+        named(WebhookChannel(f"{base}/fast", timeout=2), "webhook-fast"),
+        named(WebhookChannel(f"{base}/slow", timeout=0.2), "webhook-slow"),
+        named(WebhookChannel(f"{base}/error", timeout=1), "webhook-error"),
+        named(ScriptChannel([sys.executable, "-c", "pass"], timeout=5), "script-fast"),
+        named(ScriptChannel([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.3),
+              "script-hung"),
+    ]
+    # 快速脚本每次需要启动解释器，给足队列让它追上
+    channels[3].queue_size = args.events
+    dispatcher = NotificationDispatcher(channels)
+
+    # 模拟计时线程：按固定间隔产生通知，记录dispatch()耗时和节拍延迟
+    durations = []
+    lateness = []
+    start = time.perf_counter()
+    for index in range(args.events):
+        due = start + index * args.interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        lateness.append((time.perf_counter() - due) * 1000)
+        notification = timer_notification(NOTIFY_REMINDER, 10, 90)
+        begin = time.perf_counter()
+        dispatcher.dispatch(notification)
+        durations.append((time.perf_counter() - begin) * 1000)
+
+    # 等待快速渠道发送完成
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        stats = dispatcher.stats()
+        if all(
+            stats[name]["pending"] == 0 and stats[name]["sent"] + stats[name]["failed"] >= args.events
+            for name in ("webhook-fast", "script-fast")
+        ):
+            break
+        time.sleep(0.05)
+
+    close_start = time.perf_counter()
+    dispatcher.close()
+    # 等待工作线程退出：正在发送的通知最多持续该渠道的超时
+    for thread in threading.enumerate():
+        if thread.name.startswith("notify"):
+            thread.join()
+    close_ms = (time.perf_counter() - close_start) * 1000
+    stats = dispatcher.stats()
+    server.shutdown()
+
+    durations.sort()
+    lateness.sort()
+    result = {
+        "events": args.events,
+        "dispatch_ms": {
+            "p50": durations[len(durations) // 2],
+            "p99": durations[int(len(durations) * 0.99)],
+            "max": durations[-1],
+        },
+        "tick_lateness_ms": {"p99": lateness[int(len(lateness) * 0.99)]},
+        "close_ms": close_ms,
+        "received": dict(server.received),
+        "channels": stats,
+    }
+
+    violations = []
+    p50 = result["dispatch_ms"]["p50"]
+    if p50 > DISPATCH_P50_BUDGET_MS:
+        violations.append(f"dispatch() 中位数 {p50:.3f} ms 超出预算 {DISPATCH_P50_BUDGET_MS} ms")
+    longest = result["dispatch_ms"]["max"]
+    if longest > DISPATCH_MAX_BUDGET_MS:
+        violations.append(f"dispatch() 最长 {longest:.3f} ms 超出预算 {DISPATCH_MAX_BUDGET_MS} ms")
+    for name in ("webhook-fast", "script-fast"):
+        if stats[name]["sent"] != args.events:
+            violations.append(f"{name} 只发送了 {stats[name]['sent']}/{args.events} 条")
+    if server.received.get("/fast", 0) != args.events:
+        violations.append(f"桩服务只收到 {server.received.get('/fast', 0)} 条快速通知")
+    for name in ("webhook-slow", "script-hung"):
+        if stats[name]["timeouts"] == 0:
+            violations.append(f"{name} 没有按超时失败")
+        if stats[name]["sent"]:
+            violations.append(f"{name} 不应发送成功")
+        if stats[name]["dropped"] == 0:
+            violations.append(f"{name} 的积压没有被队列上限限制")
+    if stats["webhook-error"]["failed"] == 0:
+        violations.append("webhook-error 的失败没有被记录")
+    longest_timeout = max(channel.timeout for channel in channels if channel.name != "script-fast")
+    if close_ms > (longest_timeout + 1) * 1000:
+        violations.append(f"关闭耗时 {close_ms:.0f} ms 超过渠道超时")
+
+    if args.json:
+        print(json.dumps({**result, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        dispatch = result["dispatch_ms"]
+        print(f"dispatch(): p50 {dispatch['p50'] * 1000:.1f} µs, p99 {dispatch['p99'] * 1000:.1f} µs, "
+              f"最大 {dispatch['max'] * 1000:.1f} µs; 节拍延迟p99 "
+              f"{result['tick_lateness_ms']['p99']:.3f} ms")
+        for name, channel in stats.items():
+            print(f"{name}: 成功 {channel['sent']}, 失败 {channel['failed']}, "
+                  f"超时 {channel['timeouts']}, 丢弃 {channel['dropped']}, "
+                  f"最长 {channel['max_ms']:.1f} ms")
+        print(f"关闭耗时: {close_ms:.0f} ms")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
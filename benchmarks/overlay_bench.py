@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""全屏休息遮罩的多屏渲染测试
+
+在离屏平台下用配置文件模拟多个虚拟屏幕（可以有不同的设备像素比），
+逐秒推进BreakOverlay的倒计时并同步完成所有屏幕的重绘，统计每秒的渲染次数和耗时:
+
+1. 每秒的渲染次数必须等于不同设备像素比的数量，与屏幕数量无关
+2. 多屏时每秒耗时相对单屏的增长不超过预算
+3. 作为对照，同时测量每个屏幕各自渲染一次的耗时
+
+每种屏幕配置在独立的子进程中运行（屏幕在QApplication创建时确定）。
+超出预算时以非零状态码退出。
+
+用法: python benchmarks/overlay_bench.py --screens 4 --ticks 120
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 多屏（相同设备像素比）每秒耗时的中位数最多是单屏的多少倍
+SCALING_BUDGET = 2.0
+# 小于这个耗时（毫秒）的差异视为测量噪声
+NOISE_FLOOR_MS = 0.3
+
+
+def run_child(args):
+    """在当前进程中创建虚拟屏幕上的遮罩并逐秒推进"""
+    import time
+
+    sys.path.insert(0, str(ROOT))
+    from PyQt6.QtWidgets import QApplication
+
+    from break_window import BreakOverlay
+
+    app = QApplication(sys.argv[:1])
+    overlay = BreakOverlay()
+    overlay.show()
+    app.processEvents()
+
+    problems = []
+    screens = app.screens()
+    if len(overlay.overlays) != len(screens):
+        problems.append(f"{len(screens)} 个屏幕只有 {len(overlay.overlays)} 个遮罩")
+    for screen, widget in overlay.overlays.items():
+        if widget.geometry() != screen.geometry():
+            problems.append(f"屏幕 {screen.name()} 的遮罩没有覆盖整个屏幕")
+        if widget.devicePixelRatioF() != screen.devicePixelRatio():
+            problems.append(f"屏幕 {screen.name()} 的遮罩设备像素比不一致")
+
+    renderer = overlay.renderer
+    if args.per_screen:
+        # 对照组：每个屏幕各自渲染
+        renderer.frame = renderer.render
+
+    widgets = list(overlay.overlays.values())
+    samples = []
+    renders_before = renderer.render_count
+    paints_before = sum(widget.paint_count for widget in widgets)
+    for _ in range(args.ticks):
+        start = time.perf_counter()
+        overlay.consume_seconds(1)
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    renders = renderer.render_count - renders_before
+    paints = sum(widget.paint_count for widget in widgets) - paints_before
+    if paints < args.ticks * len(widgets):
+        problems.append(f"{args.ticks} 秒内各屏幕只重绘了 {paints} 次")
+
+    samples.sort()
+    result = {
+        "screens": len(screens),
+        "dprs": sorted({screen.devicePixelRatio() for screen in screens}),
+        "per_screen": args.per_screen,
+        "ticks": args.ticks,
+        "renders_per_tick": renders / args.ticks,
+        "paints_per_tick": paints / args.ticks,
+        "tick_ms": {
+            "p50": statistics.median(samples),
+            "p99": samples[int(len(samples) * 0.99)],
+        },
+        "problems": problems,
+    }
+    overlay.close()
+    print(json.dumps(result))
+    return 0
+
+
+def screen_config(dprs, width, height):
+    """生成离屏平台的虚拟屏幕配置
+
+    离屏平台不会把配置文件中的dpr应用到窗口，设备像素比改用 QT_SCREEN_SCALE_FACTORS 设置，
+    屏幕的物理尺寸按比例放大，逻辑尺寸都是 width x height。
+
+    Returns:
+        (配置, QT_SCREEN_SCALE_FACTORS的值)
+    """
+    screens = []
+    factors = []
+    x = 0
+    for index, dpr in enumerate(dprs):
+        name = f"virtual-{index}"
+        screens.append({
+            "name": name,
+            "x": x,
+            "y": 0,
+            "width": int(width * dpr),
+            "height": int(height * dpr),
+            "logicalDpi": 96,
+            "logicalBaseDpi": 96,
+            "dpr": 1,
+        })
+        factors.append(f"{name}={dpr:g}")
+        x += int(width * dpr)
+    return {"screens": screens}, ";".join(factors)
+
+
+def run_case(dprs, args, per_screen=False):
+    """在子进程中运行一种屏幕配置"""
+    with tempfile.TemporaryDirectory() as tmp:
+        config, factors = screen_config(dprs, args.width, args.height)
+        path = Path(tmp) / "screens.json"
+        path.write_text(json.dumps(config))
+        env = dict(
+            os.environ,
+            QT_QPA_PLATFORM=f"offscreen:configfile={path}",
+            QT_SCREEN_SCALE_FACTORS=factors,
+        )
+        command = [sys.executable, __file__, "--child", "--ticks", str(args.ticks)]
+        if per_screen:
+            command.append("--per-screen")
+        output = subprocess.run(
+            command, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="全屏休息遮罩多屏渲染测试")
+    parser.add_argument("--screens", type=int, default=4, help="多屏测试的屏幕数量")
+    parser.add_argument("--ticks", type=int, default=120, help="推进的秒数")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--per-screen", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args)
+
+    cases = {
+        "single": run_case([1], args),
+        "multi": run_case([1] * args.screens, args),
+        "multi_per_screen": run_case([1] * args.screens, args, per_screen=True),
+        "mixed_dpr": run_case([1, 2, 1.5, 1][: max(2, args.screens)], args),
+    }
+
+    violations = []
+    for name, case in cases.items():
+        violations += [f"{name}: {problem}" for problem in case["problems"]]
+        if not case["per_screen"] and case["renders_per_tick"] > len(case["dprs"]):
+            violations.append(
+                f"{name}: 每秒渲染 {case['renders_per_tick']:.2f} 次，"
+                f"超过设备像素比数量 {len(case['dprs'])}"
+            )
+    single = cases["single"]["tick_ms"]["p50"]
+    multi = cases["multi"]["tick_ms"]["p50"]
+    if multi > max(single * SCALING_BUDGET, single + NOISE_FLOOR_MS):
+        violations.append(
+            f"{args.screens} 个屏幕每秒耗时 {multi:.3f} ms，超过单屏 {single:.3f} ms 的 "
+            f"{SCALING_BUDGET} 倍"
+        )
+
+    if args.json:
+        print(json.dumps({"cases": cases, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        labels = {
+            "single": "单屏",
+            "multi": f"{args.screens} 屏共享渲染",
+            "multi_per_screen": f"{args.screens} 屏逐屏渲染（对照）",
+            "mixed_dpr": "混合设备像素比",
+        }
+        for name, case in cases.items():
+            dprs = "/".join(f"{dpr:g}" for dpr in case["dprs"])
+            print(f"{labels[name]}: {case['screens']} 个屏幕 (DPR {dprs}), "
+                  f"每秒渲染 {case['renders_per_tick']:.2f} 次, "
+                  f"重绘 {case['paints_per_tick']:.2f} 次, "
+                  f"耗时 p50 {case['tick_ms']['p50']:.3f} ms, p99 {case['tick_ms']['p99']:.3f} ms")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""免打扰时段测试（不需要显示器，也不导入Qt）
+
+1. 生成包含大量重复事件的日历，测量后台线程解析和展开（重建索引）的耗时；
+   构建期间和日历文件变化后，查询方（计时线程）都不等待构建，只查现有的索引
+2. 在不同规模的区间索引上测量 blocked()/next_free() 的单次查询耗时，
+   规模扩大上百倍时耗时的增长不超过预算（O(log n)），并与线性扫描对照
+3. 随机抽查查询结果与线性扫描一致
+4. 用虚拟时钟驱动计时核心，检查免打扰时段内没有提醒，推迟的提醒在时段结束时发出
+
+超出预算或检查失败时以非零状态码退出。
+
+用法: python benchmarks/quiet_hours_bench.py --events 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quiet_hours import (  # noqa: E402
+    RELOAD_INTERVAL,
+    IntervalIndex,
+    QuietHours,
+    expand_events,
+    parse_rule,
+)
+from timer_core import NOTIFY_REMINDER, TimerCore  # noqa: E402
+
+# 解析并展开日历的耗时预算（毫秒）
+REBUILD_BUDGET_MS = 2000
+# 单次查询（含是否需要重新展开的检查）的耗时预算（微秒）
+QUERY_BUDGET_US = 5
+# 后台构建期间查询方单次调用的最长耗时预算（毫秒）：查询不等待构建（同步展开需要数百毫秒），
+# 只会因为与后台线程争用GIL和CPU（单核机器上）偶尔多等几个调度周期
+BLOCKING_BUDGET_MS = 50
+# 区间数扩大后单次查询耗时最多增长的倍数
+SCALING_BUDGET = 2.0
+
+SMALL_INDEX = 1000
+LARGE_INDEX = 200000
+
+
+def generate_ics(events, start, seed=1):
+    """生成包含大量重复事件的日历文本"""
+    rng = random.Random(seed)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    rules = [
+        "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+        "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU",
+        "FREQ=DAILY",
+        "FREQ=MONTHLY;BYDAY=-1FR",
+        "FREQ=MONTHLY;BYMONTHDAY=15;COUNT=24",
+        None,
+    ]
+    for index in range(events):
+        begin = start - timedelta(days=rng.randrange(0, 720)) + timedelta(days=rng.randrange(0, 760))
+        begin = begin.replace(hour=rng.randrange(7, 20), minute=rng.choice((0, 15, 30, 45)))
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:event-{index}",
+            f"DTSTART:{begin:%Y%m%dT%H%M%S}",
+            f"DURATION:PT{rng.choice((15, 30, 45, 60, 90))}M",
+        ]
+        rule = rules[index % len(rules)]
+        if rule:
+            lines.append(f"RRULE:{rule}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def random_intervals(count, rng):
+    """随机生成区间，少数相邻的区间互相重叠"""
+    intervals = []
+    t = 0.0
+    for _ in range(count):
+        t += rng.uniform(60, 1200)
+        intervals.append((t, t + rng.uniform(60, 900)))
+    return intervals
+
+
+def linear_blocked(intervals, t):
+    return any(start <= t < end for start, end in intervals)
+
+
+def linear_next_free(intervals, t):
+    """线性扫描：反复跳到包含t的区间的末尾"""
+    moved = True
+    while moved:
+        moved = False
+        for start, end in intervals:
+            if start <= t < end:
+                t = end
+                moved = True
+    return t
+
+
+def time_queries(quiet, points):
+    """每次 blocked() + next_free() 的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for t in points:
+        quiet.blocked(t)
+        quiet.next_free(t)
+    return (time.perf_counter() - start) / len(points) / 2 * 1e6
+
+
+def index_hours(intervals):
+    """用现成的区间构建免打扰时段（不读取日历）"""
+    quiet = QuietHours(horizon=float("inf"))
+    quiet._state = (IntervalIndex(intervals), (float("-inf"), float("inf")), float("inf"))
+    return quiet
+
+
+def check_core(problems):
+    """用虚拟时钟驱动计时核心，检查推迟和跳过"""
+    base = datetime(2026, 1, 5, 11, 50).timestamp()  # 周一 11:50
+    clock = {"now": base}
+    rules = [parse_rule({"days": "mon-fri", "start": "12:00", "end": "13:00"})]
+    results = {}
+    for mode in ("defer", "suppress"):
+        clock["now"] = base
+        reminders = []
+        core = TimerCore(lambda name, *args: name == NOTIFY_REMINDER and reminders.append(clock["now"]))
+        core.quiet_hours = QuietHours(rules=rules, mode=mode, clock=lambda: clock["now"])
+        # 虚拟时钟比后台线程快得多，先同步构建一次
+        core.quiet_hours.update()
+        core.state.focus_time = 240
+        core.state.min_interval = core.state.max_interval = 300
+        core.start()
+        for _ in range(3 * 3600):
+            clock["now"] += 1
+            core.advance(1)
+        blocked = [t for t in reminders if core.quiet_hours.blocked(t)]
+        if blocked:
+            problems.append(f"{mode}: 免打扰时段内发出了 {len(blocked)} 次提醒")
+        results[mode] = reminders
+    quiet_end = datetime(2026, 1, 5, 13).timestamp()
+    # 推迟模式下12:00后到期的提醒在13:00整发出
+    if quiet_end not in results["defer"]:
+        problems.append("defer: 推迟的提醒没有在免打扰结束时发出")
+    # 跳过模式下免打扰结束后的一个间隔内恢复提醒
+    resumed = [t for t in results["suppress"] if t >= quiet_end]
+    if not resumed or resumed[0] - quiet_end > 300:
+        problems.append("suppress: 免打扰结束后没有按间隔恢复提醒")
+    return {
+        mode: [time.strftime("%H:%M:%S", time.localtime(t)) for t in reminders]
+        for mode, reminders in results.items()
+    }
+
+
+def slowest_query_ms(quiet, t, until):
+    """在until()为真之前反复查询，返回单次查询的最长耗时"""
+    slowest = 0.0
+    deadline = time.perf_counter() + 30
+    while not until() and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        quiet.blocked(t)
+        quiet.next_free(t)
+        slowest = max(slowest, (time.perf_counter() - start) * 1000)
+    return slowest
+
+
+def check_background(path, now, problems):
+    """第一次查询和日历变化后的查询都不等待后台构建，返回查询方的最长耗时"""
+    t = now.timestamp()
+    quiet = QuietHours([str(path)], clock=lambda: t)
+    quiet.start()
+    quiet.blocked(t)
+    if quiet._ready.is_set():
+        problems.append("第一次查询等待了后台构建")
+    first = slowest_query_ms(quiet, t, quiet._ready.is_set)
+    if not quiet.wait_ready(30) or not len(quiet.index):
+        problems.append("后台线程没有完成第一次构建")
+
+    # 修改日历文件后，到了检查时间的查询只唤醒后台线程
+    path.write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
+    later = t + RELOAD_INTERVAL + 1
+    count = quiet.expand_count
+    changed = slowest_query_ms(quiet, later, lambda: quiet.expand_count > count)
+    if quiet.expand_count == count:
+        problems.append("日历文件变化后没有在后台重新展开")
+    quiet.close()
+    return max(first, changed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="免打扰时段测试")
+    parser.add_argument("--events", type=int, default=5000, help="日历中的事件数")
+    parser.add_argument("--queries", type=int, default=100000, help="每种规模的查询次数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    problems = []
+
+    # 1. 解析并展开日历
+    now = datetime(2026, 10, 19, 12)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "calendar.ics"
+        path.write_text(generate_ics(args.events, now), encoding="utf-8")
+        quiet = QuietHours([str(path)], clock=lambda: now.timestamp())
+        start = time.perf_counter()
+        quiet.update()
+        rebuild_ms = (time.perf_counter() - start) * 1000
+        calendar_intervals = len(quiet.index)
+        window_start, window_end = quiet._state[1]
+        occurrences = sum(
+            len(expand_events(events, window_start, window_end))
+            for _, events in quiet._events.values()
+        )
+        # 再次查询不应重新展开
+        quiet.blocked(now.timestamp() + 60)
+        if quiet.expand_count != 1:
+            problems.append(f"连续查询时重新展开了 {quiet.expand_count} 次")
+
+        blocking_ms = check_background(path, now, problems)
+
+    # 2. 不同规模的查询耗时
+    timings = {}
+    merged = {}
+    for size in (SMALL_INDEX, LARGE_INDEX):
+        intervals = random_intervals(size, rng)
+        hours = index_hours(intervals)
+        merged[size] = len(hours.index)
+        span = intervals[-1][1]
+        points = [rng.uniform(0, span) for _ in range(args.queries)]
+        timings[size] = time_queries(hours, points)
+
+        # 3. 抽查与线性扫描一致
+        sample = intervals if size == SMALL_INDEX else intervals[:2000]
+        sample_hours = index_hours(sample)
+        for t in (rng.uniform(0, sample[-1][1]) for _ in range(500)):
+            if sample_hours.blocked(t) != linear_blocked(sample, t):
+                problems.append(f"blocked({t:.1f}) 与线性扫描不一致")
+                break
+            if sample_hours.next_free(t) != linear_next_free(sample, t):
+                problems.append(f"next_free({t:.1f}) 与线性扫描不一致")
+                break
+
+    # 线性扫描对照（只在大规模上测少量查询）
+    large = random_intervals(LARGE_INDEX, rng)
+    start = time.perf_counter()
+    for t in (rng.uniform(0, large[-1][1]) for _ in range(20)):
+        linear_blocked(large, t)
+    linear_us = (time.perf_counter() - start) / 20 * 1e6
+
+    # 4. 计时核心
+    reminders = check_core(problems)
+
+    result = {
+        "events": args.events,
+        "occurrences": occurrences,
+        "calendar_intervals": calendar_intervals,
+        "rebuild_ms": rebuild_ms,
+        "blocking_ms": blocking_ms,
+        "query_us": {str(merged[size]): value for size, value in timings.items()},
+        "linear_scan_us": linear_us,
+        "reminders": reminders,
+    }
+    violations = list(problems)
+    if rebuild_ms > REBUILD_BUDGET_MS:
+        violations.append(f"展开 {args.events} 个事件耗时 {rebuild_ms:.0f} ms 超出预算 {REBUILD_BUDGET_MS} ms")
+    if blocking_ms > BLOCKING_BUDGET_MS:
+        violations.append(f"后台构建期间查询最长 {blocking_ms:.1f} ms，超出预算 {BLOCKING_BUDGET_MS} ms")
+    for size, value in timings.items():
+        if value > QUERY_BUDGET_US:
+            violations.append(f"{size} 个区间时单次查询 {value:.2f} µs 超出预算 {QUERY_BUDGET_US} µs")
+    scaling = timings[LARGE_INDEX] / timings[SMALL_INDEX]
+    if scaling > SCALING_BUDGET:
+        violations.append(
+            f"区间数从 {SMALL_INDEX} 增加到 {LARGE_INDEX} 时查询耗时增长 {scaling:.2f} 倍，"
+            f"超过 {SCALING_BUDGET} 倍"
+        )
+
+    if args.json:
+        print(json.dumps({**result, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        print(f"日历: {args.events} 个事件在窗口内发生 {occurrences} 次，合并为 {calendar_intervals} 个区间，"
+              f"读取并展开耗时 {rebuild_ms:.1f} ms（后台线程）")
+        print(f"后台构建期间查询方单次调用最长 {blocking_ms:.2f} ms")
+        for size, value in timings.items():
+            print(f"{merged[size]} 个区间: 单次查询 {value:.2f} µs")
+        print(f"线性扫描对照（{LARGE_INDEX} 个区间）: 单次查询 {linear_us:.0f} µs")
+        print(f"推迟模式的提醒时刻: {', '.join(reminders['defer'])}")
+        print(f"跳过模式的提醒时刻: {', '.join(reminders['suppress'])}")
+        for violation in violations:
+            print(f"问题: {violation}")
+        if not violations:
+            print("全部通过")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""团队统计服务负载生成器
+
+在本机启动一个统计服务（或连接 --url 指定的服务），模拟大量客户端按批上报事件。
+客户端通过有限个长连接的连接池复用连接，统计吞吐量和请求延迟，
+最后核对聚合结果与发送的事件数是否一致。
+
+用法: python benchmarks/team_loadgen.py --clients 5000 --batches 4 --batch-size 50
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_history import EVENT_NAMES  # noqa: E402
+from team_server import TeamServer  # noqa: E402
+
+
+class ConnectionPool:
+    """HTTP长连接池"""
+
+    def __init__(self, host, port, size):
+        self.host = host
+        self.port = port
+        self._pool = queue.LifoQueue()
+        for _ in range(size):
+            self._pool.put(None)
+
+    def request(self, method, path, body=None, headers=None):
+        conn = self._pool.get()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, data
+        except (OSError, http.client.HTTPException):
+            if conn is not None:
+                conn.close()
+            conn = None
+            raise
+        finally:
+            self._pool.put(conn)
+
+
+def make_batch(user, size, start_time):
+    """生成一批模拟事件"""
+    events = [
+        (start_time + i * 37.0, random.choice(list(EVENT_NAMES)), random.randint(0, 600))
+        for i in range(size)
+    ]
+    body = json.dumps({"user": user, "events": events}).encode("utf-8")
+    return gzip.compress(body, compresslevel=1)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="团队统计服务负载生成器")
+    parser.add_argument("--url", help="已运行的服务地址，不指定时在本机启动一个")
+    parser.add_argument("--clients", type=int, default=2000, help="模拟的客户端数")
+    parser.add_argument("--batches", type=int, default=3, help="每个客户端上报的批次数")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批事件数")
+    parser.add_argument("--connections", type=int, default=32, help="连接池大小")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        snapshot = str(Path(tempfile.mkdtemp(prefix="rr-team-")) / "rollups.json")
+        server = TeamServer(port=0, snapshot_path=snapshot, snapshot_interval=1)
+        server.start()
+        host, port = server.server_address[:2]
+        print(f"已在本机启动统计服务: {server.url}")
+
+    # 预先生成请求体，避免把压缩耗时算进吞吐量
+    print(f"生成 {args.clients * args.batches} 个批次...")
+    now = time.time()
+    jobs = queue.Queue()
+    for batch_index in range(args.batches):
+        for client in range(args.clients):
+            user = f"user{client:05d}"
+            jobs.put(make_batch(user, args.batch_size, now + batch_index * 3600))
+
+    pool = ConnectionPool(host, port, args.connections)
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        while True:
+            try:
+                body = jobs.get_nowait()
+            except queue.Empty:
+                break
+            start = time.perf_counter()
+            try:
+                status, _ = pool.request("POST", "/ingest", body, headers)
+                if status != 200:
+                    errors.append(status)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total_events = args.clients * args.batches * args.batch_size
+    print(f"请求数: {len(latencies)}  错误: {len(errors)}  耗时: {elapsed:.2f} 秒")
+    print(f"吞吐量: {len(latencies) / elapsed:.0f} 请求/秒, {total_events / elapsed:.0f} 事件/秒")
+    print(
+        f"延迟: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms"
+    )
+
+    # 看板查询直接读取聚合结果
+    query_start = time.perf_counter()
+    status, data = pool.request("GET", "/rollups")
+    rollups = json.loads(data)["rollups"]
+    query_ms = (time.perf_counter() - query_start) * 1000
+    aggregated = sum(row["events"] for row in rollups)
+    print(f"聚合查询: {len(rollups)} 行, {query_ms:.1f} ms, 合计事件 {aggregated}")
+
+    ok = not errors and (args.url or aggregated == total_events)
+    if server is not None:
+        server.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
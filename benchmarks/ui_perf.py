@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""离屏界面性能测试
+
+在 QT_QPA_PLATFORM=offscreen 下驱动 MainWindow 完整经历
+开始 → 提醒 → 短休息 → 专注完成 → 长休息 → 重新开始 的循环，
+使用快速时钟逐秒推进计时器，记录每帧重绘次数、布局次数、槽函数耗时和峰值内存，
+超出预算时以非零状态码退出。
+
+用法: python benchmarks/ui_perf.py [--cycles N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# 历史记录等用户数据写入临时目录，不污染真实数据
+os.environ.setdefault("RANDOM_REMINDER_DATA_DIR", tempfile.mkdtemp(prefix="rr-perf-"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QEvent, QObject, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from break_window import BreakWindow  # noqa: E402
+from main_window import BreakPromptDialog, MainWindow  # noqa: E402
+from progress_display import ProgressDisplay  # noqa: E402
+from theme import apply_theme  # noqa: E402
+
+# 每个组件的性能预算：单帧最多重绘/布局次数，单次槽函数最长耗时（毫秒）
+BUDGETS = {
+    "MainWindow": {"paints_per_frame": 40, "layouts_per_frame": 10, "slot_ms": 50},
+    "ProgressDisplay": {"paints_per_frame": 24, "layouts_per_frame": 4, "slot_ms": 10},
+    "BreakWindow": {"paints_per_frame": 12, "layouts_per_frame": 4, "slot_ms": 20},
+}
+PEAK_RSS_BUDGET_MB = 250
+
+# 需要计时的槽函数及其所属组件
+TIMED_SLOTS = {
+    MainWindow: [
+        "play_reminder_sound",
+        "play_short_break_end_sound",
+        "update_progress",
+        "show_break_time",
+        "show_break_window",
+        "on_break_finished",
+        "restart_timer",
+        "start_timer",
+    ],
+    ProgressDisplay: [
+        "update_focus_progress",
+        "update_reminder_progress",
+        "update_break_progress",
+        "clear_all_progress",
+    ],
+    BreakWindow: ["update_timer"],
+}
+
+
+def peak_rss_mb():
+    """峰值常驻内存（MB），平台不支持时返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class PerfRecorder(QObject):
+    """应用级事件过滤器，按组件统计重绘与布局事件"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frame_paints = defaultdict(int)
+        self.frame_layouts = defaultdict(int)
+        self.max_paints = defaultdict(int)
+        self.max_layouts = defaultdict(int)
+        self.total_paints = defaultdict(int)
+        self.total_layouts = defaultdict(int)
+        self.slot_times = defaultdict(list)
+        self.frames = 0
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if event_type in (QEvent.Type.Paint, QEvent.Type.LayoutRequest):
+            component = self._component_of(obj)
+            if component is not None:
+                if event_type == QEvent.Type.Paint:
+                    self.frame_paints[component] += 1
+                else:
+                    self.frame_layouts[component] += 1
+        return False
+
+    @staticmethod
+    def _component_of(obj):
+        """找到事件对象所属的被测组件"""
+        while obj is not None:
+            for cls in (ProgressDisplay, BreakWindow, MainWindow):
+                if isinstance(obj, cls):
+                    return cls.__name__
+            obj = obj.parent() if isinstance(obj, QObject) else None
+        return None
+
+    def end_frame(self):
+        """结束一帧：处理挂起的事件并记录该帧的统计"""
+        QApplication.processEvents()
+        for component, count in self.frame_paints.items():
+            self.max_paints[component] = max(self.max_paints[component], count)
+            self.total_paints[component] += count
+        for component, count in self.frame_layouts.items():
+            self.max_layouts[component] = max(self.max_layouts[component], count)
+            self.total_layouts[component] += count
+        self.frame_paints.clear()
+        self.frame_layouts.clear()
+        self.frames += 1
+
+    def wrap_slots(self):
+        """为被测槽函数加上计时"""
+        for cls, names in TIMED_SLOTS.items():
+            for name in names:
+                original = getattr(cls, name)
+                setattr(cls, name, self._timed(cls.__name__, original))
+
+    def _timed(self, component, func):
+        recorder = self
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                recorder.slot_times[(component, func.__name__)].append(elapsed_ms)
+
+        wrapper.__name__ = func.__name__
+        return wrapper
+
+
+class FastClockDriver:
+    """快速时钟：不启动后台线程，在主线程中逐秒推进计时器"""
+
+    def __init__(self, window):
+        self.window = window
+        self.timer_thread = window.timer_thread
+        # 用同步推进替换线程的启动与运行状态查询
+        self.timer_thread.start = self._start
+        self.timer_thread.isRunning = lambda: self.timer_thread.running
+
+    def _start(self):
+        self.timer_thread.reset_state()
+        self.timer_thread.engine.begin()
+
+    def tick(self):
+        """推进一秒（暂停时只执行排队的命令）"""
+        if self.timer_thread.running:
+            self.timer_thread.engine.step(1)
+
+
+def accept_break_prompt(action):
+    """在提示对话框的事件循环中自动做出选择"""
+
+    def choose():
+        for widget in QApplication.topLevelWidgets():
+            if isinstance(widget, BreakPromptDialog) and widget.isVisible():
+                if action == "rest":
+                    widget.choose_rest()
+                else:
+                    widget.choose_restart()
+                return
+        # 对话框尚未显示，稍后重试
+        QTimer.singleShot(1, choose)
+
+    QTimer.singleShot(0, choose)
+
+
+def run_cycles(window, driver, recorder, cycles):
+    """驱动完整的专注/休息循环，返回各阶段计数"""
+    counts = defaultdict(int)
+    thread = window.timer_thread
+    thread.signal_play_sound.connect(lambda: counts.__setitem__("reminder", counts["reminder"] + 1))
+    thread.signal_play_short_break_end_sound.connect(
+        lambda: counts.__setitem__("rest_end", counts["rest_end"] + 1)
+    )
+
+    window.start_timer()
+    recorder.end_frame()
+
+    for _ in range(cycles):
+        # 专注阶段：逐秒推进直到专注周期完成
+        accept_break_prompt("rest")
+        while thread.running:
+            driver.tick()
+            recorder.end_frame()
+        counts["focus_complete"] += 1
+
+        # 长休息阶段：接管休息窗口的定时器逐秒推进
+        break_window = window.break_window
+        break_window.timer.stop()
+        while break_window.remaining_seconds > 0:
+            break_window.update_timer()
+            recorder.end_frame()
+        counts["break"] += 1
+
+        # 重新开始
+        break_window.request_restart()
+        recorder.end_frame()
+        counts["restart"] += 1
+
+    window.stop_timer()
+    recorder.end_frame()
+    return counts
+
+
+def check_budgets(recorder, rss_mb):
+    """对照预算检查，返回违规描述列表"""
+    violations = []
+    for component, budget in BUDGETS.items():
+        paints = recorder.max_paints.get(component, 0)
+        if paints > budget["paints_per_frame"]:
+            violations.append(
+                f"{component}: 单帧重绘 {paints} 次，超过预算 {budget['paints_per_frame']}"
+            )
+        layouts = recorder.max_layouts.get(component, 0)
+        if layouts > budget["layouts_per_frame"]:
+            violations.append(
+                f"{component}: 单帧布局 {layouts} 次，超过预算 {budget['layouts_per_frame']}"
+            )
+    for (component, slot), times in recorder.slot_times.items():
+        # 模态对话框的槽函数包含等待时间，不计入预算
+        if slot == "show_break_time":
+            continue
+        worst = max(times)
+        if worst > BUDGETS[component]["slot_ms"]:
+            violations.append(
+                f"{component}.{slot}: 最长耗时 {worst:.2f} ms，超过预算 {BUDGETS[component]['slot_ms']} ms"
+            )
+    if rss_mb is not None and rss_mb > PEAK_RSS_BUDGET_MB:
+        violations.append(f"峰值内存 {rss_mb:.1f} MB，超过预算 {PEAK_RSS_BUDGET_MB} MB")
+    return violations
+
+
+def build_report(recorder, counts, rss_mb, violations):
+    """汇总测试结果"""
+    slots = {}
+    for (component, slot), times in sorted(recorder.slot_times.items()):
+        slots[f"{component}.{slot}"] = {
+            "calls": len(times),
+            "mean_ms": round(sum(times) / len(times), 3),
+            "max_ms": round(max(times), 3),
+        }
+    return {
+        "frames": recorder.frames,
+        "phases": dict(counts),
+        "paints": {
+            component: {
+                "total": recorder.total_paints.get(component, 0),
+                "max_per_frame": recorder.max_paints.get(component, 0),
+            }
+            for component in BUDGETS
+        },
+        "layouts": {
+            component: {
+                "total": recorder.total_layouts.get(component, 0),
+                "max_per_frame": recorder.max_layouts.get(component, 0),
+            }
+            for component in BUDGETS
+        },
+        "slots": slots,
+        "peak_rss_mb": None if rss_mb is None else round(rss_mb, 1),
+        "violations": violations,
+    }
+
+
+def print_report(report):
+    """以文本形式输出结果"""
+    print(f"帧数: {report['frames']}  阶段: {report['phases']}")
+    print("组件             重绘(总/单帧最大)   布局(总/单帧最大)")
+    for component in BUDGETS:
+        paints = report["paints"][component]
+        layouts = report["layouts"][component]
+        print(
+            f"{component:<16} {paints['total']:>6} / {paints['max_per_frame']:<6}"
+            f"     {layouts['total']:>6} / {layouts['max_per_frame']:<6}"
+        )
+    print("槽函数                                      调用   平均(ms)   最大(ms)")
+    for name, stats in report["slots"].items():
+        print(f"{name:<42} {stats['calls']:>6} {stats['mean_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+    print(f"峰值内存: {report['peak_rss_mb']} MB")
+    if report["violations"]:
+        print("超出预算:")
+        for violation in report["violations"]:
+            print(f"  - {violation}")
+    else:
+        print("全部在预算内")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离屏界面性能测试")
+    parser.add_argument("--cycles", type=int, default=2, help="完整循环次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    # 与main.py一样使用全局样式表
+    apply_theme(app)
+    recorder = PerfRecorder()
+    recorder.wrap_slots()
+    app.installEventFilter(recorder)
+
+    window = MainWindow()
+    # 调试模式：专注1分钟、提醒间隔5~8秒、短休息3秒、长休息10秒
+    window.debug_checkbox.setChecked(True)
+    window.show()
+    recorder.end_frame()
+
+    driver = FastClockDriver(window)
+    counts = run_cycles(window, driver, recorder, args.cycles)
+
+    rss_mb = peak_rss_mb()
+    violations = check_budgets(recorder, rss_mb)
+    report = build_report(recorder, counts, rss_mb, violations)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    window.close()
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
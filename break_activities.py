@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""长休息时的引导活动
+
+休息窗口依次显示眼保健操、拉伸等活动，每项配有图片或短动画。活动来自用户数据目录下的
+内容包 activities/activities.json:
+
+    {"activities": [
+        {"title": "远眺", "text": "看向6米外的物体20秒", "image": "far.gif", "seconds": 60}
+    ]}
+
+image 为相对内容包目录的路径，可以省略；没有内容包时使用内置的纯文字活动。
+
+图片在工作线程中按显示尺寸（乘以设备像素比）直接解码，不在界面线程解码原图；
+转换好的图像放入按字节数限制的LRU缓存，键为 (路径, 宽, 高, 设备像素比)。
+显示当前活动时预取下一项，内容包再大，内存也只与缓存上限和一两项正在解码的图像有关。
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict, namedtuple
+
+from PyQt6.QtCore import QObject, QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+from PyQt6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from app_paths import user_data_path
+
+logger = logging.getLogger(__name__)
+
+Activity = namedtuple("Activity", ["title", "text", "image", "seconds"])
+
+MANIFEST_NAME = "activities.json"
+ACTIVITY_SECONDS = 60  # 每项活动默认持续的秒数
+CACHE_BYTES = 24 * 1024 * 1024  # 缓存的像素数据上限
+MAX_FRAMES = 120  # 每个动画最多解码的帧数
+MIN_FRAME_DELAY = 20  # 动画每帧的最短显示时间（毫秒）
+IMAGE_BOX = QSize(320, 180)  # 图片区域的逻辑尺寸
+
+DEFAULT_ACTIVITIES = (
+    Activity("远眺", "看向6米以外的物体，保持20秒，让眼睛的睫状肌放松。", None, ACTIVITY_SECONDS),
+    Activity("转动眼球", "闭上眼睛，顺时针、逆时针各缓慢转动眼球5圈。", None, ACTIVITY_SECONDS),
+    Activity("颈部拉伸", "坐直，头慢慢向左肩倾斜，保持15秒后换另一侧。", None, ACTIVITY_SECONDS),
+    Activity("肩部放松", "双肩向上耸起，停留两秒后放下，重复10次。", None, ACTIVITY_SECONDS),
+    Activity("起身走动", "离开座位走一走，接一杯水。", None, ACTIVITY_SECONDS),
+)
+
+
+def default_pack_dir():
+    """默认的内容包目录"""
+    return user_data_path("activities")
+
+
+def load_content_pack(path=None):
+    """读取内容包，返回活动列表；没有内容包或格式错误时返回内置活动"""
+    path = path or default_pack_dir()
+    manifest = os.path.join(path, MANIFEST_NAME)
+    try:
+        with open(manifest, "r", encoding="utf-8") as f:
+            entries = json.load(f)["activities"]
+    except FileNotFoundError:
+        return list(DEFAULT_ACTIVITIES)
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("无法读取内容包 %s，使用内置活动", manifest, exc_info=True)
+        return list(DEFAULT_ACTIVITIES)
+
+    activities = []
+    for entry in entries:
+        try:
+            image = entry.get("image")
+            if image:
+                image = os.path.join(path, image)
+                if not os.path.isfile(image):
+                    logger.warning("内容包中的图片 %s 不存在", image)
+                    image = None
+            activities.append(Activity(
+                str(entry["title"]),
+                str(entry.get("text", "")),
+                image,
+                max(1, int(entry.get("seconds", ACTIVITY_SECONDS))),
+            ))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            logger.warning("忽略内容包中格式错误的活动: %r", entry)
+    return activities or list(DEFAULT_ACTIVITIES)
+
+
+def decode_image(path, width, height, max_bytes=CACHE_BYTES):
+    """按不超过 width x height 像素的尺寸解码图片或动画，返回 [(QImage, 延迟毫秒)]
+
+    QImageReader可以直接按目标尺寸解码，不需要先解出原图。动画最多解码MAX_FRAMES帧，
+    帧数据累计超过max_bytes时截断。可以在任意线程调用。
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    target = QSize(width, height)
+    size = reader.size()
+    if size.isValid() and (size.width() > width or size.height() > height):
+        reader.setScaledSize(size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio))
+
+    frames = []
+    total = 0
+    while len(frames) < MAX_FRAMES:
+        image = reader.read()
+        if image.isNull():
+            break
+        if image.width() > width or image.height() > height:
+            # 无法预先得到原图尺寸的格式
+            image = image.scaled(
+                target,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        # 转成屏幕的像素格式，界面线程生成QPixmap时不再转换
+        if image.hasAlphaChannel():
+            image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        else:
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        total += image.sizeInBytes()
+        if frames and total > max_bytes:
+            logger.info("动画 %s 超过缓存上限，只保留前 %d 帧", path, len(frames))
+            break
+        frames.append((image, max(MIN_FRAME_DELAY, reader.nextImageDelay())))
+        if not reader.supportsAnimation():
+            break
+    if not frames:
+        logger.warning("无法解码图片 %s: %s", path, reader.errorString())
+    return frames
+
+
+def frames_cost(frames):
+    """一组帧的像素数据字节数"""
+    return sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap, _ in frames)
+
+
+class PixmapCache:
+    """按像素数据字节数限制的LRU缓存，只在界面线程中使用"""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # 键 -> (帧列表, 字节数)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """取出缓存的帧列表并标记为最近使用，没有时返回None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, frames):
+        """放入缓存，超出上限时淘汰最久未使用的项；单项超过上限时不缓存"""
+        cost = frames_cost(frames)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if cost > self.max_bytes:
+            return False
+        while self._entries and self.bytes + cost > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        self._entries[key] = (frames, cost)
+        self.bytes += cost
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+
+class ImageLoader(QObject):
+    """在工作线程中解码图片，解码结果通过信号回到界面线程
+
+    同一个键在解码完成前重复请求只解码一次。工作线程在第一次请求时启动，close()后退出。
+    """
+
+    decoded = pyqtSignal(object, object)  # 键, [(QImage, 延迟毫秒)]
+
+    def __init__(self, max_bytes=CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.decode_count = 0
+        self._queue = queue.Queue()
+        self._pending = set()  # 只在界面线程中读写
+        self._thread = None
+        self._closed = False
+        self.decoded.connect(self._on_decoded)
+
+    def request(self, key):
+        """请求解码，key为 (路径, 宽, 高, 设备像素比)"""
+        if self._closed or key in self._pending:
+            return
+        self._pending.add(key)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="image-loader", daemon=True)
+            self._thread.start()
+        self._queue.put(key)
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            path, width, height, _ = key
+            try:
+                frames = decode_image(path, width, height, self.max_bytes)
+            except Exception:
+                logger.exception("解码图片 %s 出错", path)
+                frames = []
+            self.decode_count += 1
+            try:
+                self.decoded.emit(key, frames)
+            except RuntimeError:
+                # 窗口已经销毁
+                return
+
+    def _on_decoded(self, key, frames):
+        self._pending.discard(key)
+
+    def close(self):
+        """丢弃未开始的请求并让工作线程退出"""
+        self._closed = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(None)
+        self._pending.clear()
+
+
+class ActivityView(QWidget):
+    """休息窗口中的活动区域：标题、图片或动画、说明
+
+    由休息窗口的倒计时驱动 advance()，每项活动持续其 seconds 秒后切换到下一项。
+    """
+
+    def __init__(self, activities, seconds=None, cache_bytes=CACHE_BYTES, parent=None):
+        """
+        参数:
+            activities: Activity列表
+            seconds: 覆盖每项活动的持续秒数（调试模式使用）
+            cache_bytes: 缓存的像素数据上限
+        """
+        super().__init__(parent)
+        self.activities = list(activities) or list(DEFAULT_ACTIVITIES)
+        self.seconds = seconds
+        self.index = 0
+        self.elapsed = 0
+        self.switches = 0  # 切换次数
+        self.ready_on_switch = 0  # 切换时图片已在缓存中的次数
+        self.cache = PixmapCache(cache_bytes)
+        self.loader = ImageLoader(cache_bytes, self)
+        self.loader.decoded.connect(self._on_decoded)
+        self._current_key = None
+        self._frames = None
+        self._frame_index = 0
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self._next_frame)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.title_label = QLabel()
+        self.title_label.setObjectName("activityTitle")
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.title_label)
+        self.image_label = QLabel()
+        self.image_label.setFixedSize(IMAGE_BOX)
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.image_label, 0, Qt.AlignmentFlag.AlignHCenter)
+        self.text_label = QLabel()
+        self.text_label.setObjectName("activityText")
+        self.text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.text_label.setWordWrap(True)
+        layout.addWidget(self.text_label)
+
+        self.show_activity(0)
+
+    @property
+    def current(self):
+        return self.activities[self.index]
+
+    def duration(self, activity):
+        return self.seconds or activity.seconds
+
+    def image_key(self, activity):
+        """缓存键：路径和按设备像素比换算后的像素尺寸"""
+        if not activity.image:
+            return None
+        dpr = self.devicePixelRatioF()
+        return (
+            activity.image,
+            round(IMAGE_BOX.width() * dpr),
+            round(IMAGE_BOX.height() * dpr),
+            dpr,
+        )
+
+    def advance(self, seconds):
+        """倒计时经过若干秒，到时间时切换到下一项"""
+        self.elapsed += seconds
+        while self.elapsed >= self.duration(self.current):
+            self.elapsed -= self.duration(self.current)
+            self.switches += 1
+            self.show_activity((self.index + 1) % len(self.activities))
+
+    def show_activity(self, index):
+        """显示一项活动，图片已在缓存中时立即显示，否则先显示文字并请求解码"""
+        self.index = index
+        activity = self.current
+        self.title_label.setText(activity.title)
+        self.text_label.setText(activity.text)
+        self.frame_timer.stop()
+        self._frames = None
+
+        key = self._current_key = self.image_key(activity)
+        self.image_label.setVisible(key is not None)
+        self.image_label.clear()
+        frames = None
+        if key is not None:
+            frames = self.cache.get(key)
+            if frames is not None:
+                self._display(frames)
+            else:
+                self.loader.request(key)
+        if self.switches and (key is None or frames is not None):
+            # 切换时不需要等待解码（没有图片的活动也算）
+            self.ready_on_switch += 1
+        self._prefetch()
+
+    def _prefetch(self):
+        """预取下一项活动的图片"""
+        if len(self.activities) < 2:
+            return
+        key = self.image_key(self.activities[(self.index + 1) % len(self.activities)])
+        if key is not None and key not in self.cache:
+            self.loader.request(key)
+
+    def _on_decoded(self, key, images):
+        """工作线程解码完成，在界面线程中生成QPixmap并放入缓存"""
+        if not images:
+            return
+        dpr = key[3]
+        frames = []
+        for image, delay in images:
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(dpr)
+            frames.append((pixmap, delay))
+        self.cache.put(key, frames)
+        if key == self._current_key and self._frames is None:
+            self._display(frames)
+
+    def _display(self, frames):
+        self._frames = frames
+        self._frame_index = 0
+        self.image_label.setPixmap(frames[0][0])
+        if len(frames) > 1 and self.isVisible():
+            self.frame_timer.start(frames[0][1])
+
+    def _next_frame(self):
+        frames = self._frames
+        if not frames:
+            return
+        self._frame_index = (self._frame_index + 1) % len(frames)
+        pixmap, delay = frames[self._frame_index]
+        self.image_label.setPixmap(pixmap)
+        self.frame_timer.start(delay)
+
+    def showEvent(self, event):
+        """重新可见时继续播放动画"""
+        super().showEvent(event)
+        if self._frames and len(self._frames) > 1 and not self.frame_timer.isActive():
+            self.frame_timer.start(self._frames[self._frame_index][1])
+
+    def hideEvent(self, event):
+        """不可见时暂停动画"""
+        super().hideEvent(event)
+        self.frame_timer.stop()
+
+    def close_loader(self):
+        """停止动画和工作线程，释放缓存"""
+        self.frame_timer.stop()
+        self.loader.close()
+        self.cache.clear()
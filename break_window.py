@@ -2,8 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import math
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QPainter, QColor, QPen, QFont
+import time
+from PyQt6.QtCore import Qt, QEvent, QObject, QRect, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QGuiApplication, QImage, QPainter, QPen
 from PyQt6.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -13,6 +14,8 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from break_activities import IMAGE_BOX, ActivityView, load_content_pack
+
 
 class CircularProgressBar(QWidget):
     """圆形进度条"""
@@ -42,40 +45,52 @@ class CircularProgressBar(QWidget):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-        # 绘制背景圆 - 将浮点数转换为整数
-        pen = QPen(QColor(200, 200, 200))
-        pen.setWidth(10)
-        painter.setPen(pen)
-
         # 使用QRect对象，避免浮点数问题
         x = int(width/2 - size/2 + 15)
         y = int(height/2 - size/2 + 15)
         w = int(size - 30)
         h = int(size - 30)
-
-        painter.drawEllipse(x, y, w, h)
-
-        # 绘制进度圆弧
-        pen = QPen(QColor(76, 175, 80))  # 绿色
-        pen.setWidth(10)
-        painter.setPen(pen)
-
-        # 计算角度 (从90度开始，逆时针)
-        start_angle = 90 * 16
-        span_angle = int(-self.value / 100 * 360 * 16)
-
-        painter.drawArc(x, y, w, h, start_angle, span_angle)
-
-        # 绘制中心文字
-        painter.setPen(QColor(50, 50, 50))
-        font = QFont()
-        font.setPointSize(24)  # 增大字体
-        font.setBold(True)    # 设置为粗体
-        painter.setFont(font)
-
-        # 计算文本矩形并居中绘制
-        rect = painter.boundingRect(x, y, w, h, Qt.AlignmentFlag.AlignCenter, self.text)
-        painter.drawText(x, y, w, h, Qt.AlignmentFlag.AlignCenter, self.text)
+        paint_circular_progress(
+            painter, QRect(x, y, w, h), self.value, self.text,
+            text_color=self.palette().windowText().color(),
+        )
+
+
+def paint_circular_progress(painter, rect, value, text, text_color=QColor(50, 50, 50)):
+    """在rect中绘制圆形进度：背景圆、进度圆弧和中心文字
+
+    圆形进度条和全屏休息遮罩共用这一份绘制代码。
+
+    Args:
+        painter: 已开始绘制的QPainter
+        rect: 圆所在的矩形
+        value: 进度值 (0-100)
+        text: 中心文字
+        text_color: 文字颜色
+    """
+    # 绘制背景圆
+    pen = QPen(QColor(200, 200, 200))
+    pen.setWidth(10)
+    painter.setPen(pen)
+    painter.drawEllipse(rect)
+
+    # 绘制进度圆弧
+    pen = QPen(QColor(76, 175, 80))  # 绿色
+    pen.setWidth(10)
+    painter.setPen(pen)
+
+    # 计算角度 (从90度开始，逆时针)
+    start_angle = 90 * 16
+    span_angle = int(-value / 100 * 360 * 16)
+    painter.drawArc(rect, start_angle, span_angle)
+
+    # 绘制中心文字
+    painter.setPen(text_color)
+    font = QFont()
+    font.setPointSize(24)  # 增大字体
+    font.setBold(True)    # 设置为粗体
+    painter.setFont(font)
+    painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
 
 
 class BreakWindow(QDialog):
@@ -84,7 +99,7 @@ class BreakWindow(QDialog):
     break_finished = pyqtSignal()  # 休息结束信号
     restart_requested = pyqtSignal()  # 请求重新开始信号
 
-    def __init__(self, parent=None, debug_mode=False):
+    def __init__(self, parent=None, debug_mode=False, timer_slack=0, activities=None):
         super().__init__(parent)
         self.setWindowTitle("休息时间")
         self.setMinimumSize(400, 500)
@@ -94,6 +109,11 @@ class BreakWindow(QDialog):
         self.debug_mode = debug_mode
         self.total_seconds = 10 if debug_mode else 1200
         self.remaining_seconds = self.total_seconds
+        # 省电模式：窗口不可见时按松弛窗口合并刷新
+        self.timer_slack = timer_slack
+        self.tick_seconds = 1
+        # 引导活动，默认读取用户的内容包
+        self.activities = load_content_pack() if activities is None else activities
 
         self.setup_ui()
         self.setup_timer()
@@ -105,7 +125,8 @@ class BreakWindow(QDialog):
         # 标题
         title_label = QLabel("休息时间")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("font-size: 24pt; font-weight: bold; margin: 20px;")
+        title_label.setObjectName("breakTitle")
+        title_label.setProperty("role", "title")
         main_layout.addWidget(title_label)
 
         # 说明
@@ -116,9 +137,13 @@ class BreakWindow(QDialog):
 
         desc_label = QLabel(desc_text)
         desc_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        desc_label.setStyleSheet("font-size: 14pt; margin: 10px;")
+        desc_label.setObjectName("breakDescription")
         main_layout.addWidget(desc_label)
 
+        # 引导活动，随倒计时切换（调试模式下每项2秒）
+        self.activity_view = ActivityView(self.activities, seconds=2 if self.debug_mode else None)
+        main_layout.addWidget(self.activity_view)
+
         # 圆形进度条
         self.progress_bar = CircularProgressBar()
 
@@ -133,7 +158,7 @@ class BreakWindow(QDialog):
         # 计时器显示
         self.time_label = QLabel(initial_time_text)
         self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.time_label.setStyleSheet("font-size: 32pt; font-weight: bold; margin: 20px;")
+        self.time_label.setObjectName("breakCountdown")
         main_layout.addWidget(self.time_label)
 
         # 按钮布局
@@ -153,18 +178,51 @@ class BreakWindow(QDialog):
     def setup_timer(self):
         """设置定时器"""
         self.timer = QTimer(self)
+        # 倒计时只精确到秒，使用粗粒度定时器便于系统合并唤醒
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)
         self.timer.timeout.connect(self.update_timer)
         self.timer.start(1000)  # 每秒更新一次
+        self._last_tick_time = time.monotonic()
+
+    def _update_tick_interval(self):
+        """根据窗口可见性调整刷新间隔"""
+        hidden = not self.isVisible() or self.isMinimized()
+        tick_seconds = self.timer_slack if self.timer_slack > 0 and hidden else 1
+        if tick_seconds == self.tick_seconds or not self.timer.isActive():
+            return
+
+        # 切换间隔会重启定时器，先补上当前间隔内已经过去的整秒
+        passed = int(time.monotonic() - self._last_tick_time)
+        if passed > 0:
+            self._last_tick_time = time.monotonic()
+            self.consume_seconds(passed)
+            if not self.timer.isActive():
+                return
+
+        self.tick_seconds = tick_seconds
+        if tick_seconds > 1:
+            self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        else:
+            self.timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.timer.start(tick_seconds * 1000)
+        self._last_tick_time = time.monotonic()
 
     def update_timer(self):
         """更新计时器显示"""
-        self.remaining_seconds -= 1
+        self._last_tick_time = time.monotonic()
+        self.consume_seconds(self.tick_seconds)
+
+    def consume_seconds(self, seconds):
+        """倒计时减少若干秒并刷新显示"""
+        self.remaining_seconds -= seconds
 
         if self.remaining_seconds <= 0:
             self.timer.stop()
             self.break_finished.emit()
             return
 
+        self.activity_view.advance(seconds)
+
         # 更新进度条
         progress = (self.remaining_seconds / self.total_seconds) * 100
         self.progress_bar.setValue(progress)
@@ -183,7 +241,328 @@ class BreakWindow(QDialog):
         self.restart_requested.emit()
         self.close()
 
+    def showEvent(self, event):
+        """窗口显示时恢复逐秒刷新"""
+        super().showEvent(event)
+        self._update_tick_interval()
+
+    def hideEvent(self, event):
+        """窗口隐藏时合并刷新"""
+        super().hideEvent(event)
+        self._update_tick_interval()
+
+    def changeEvent(self, event):
+        """窗口最小化或还原时调整刷新间隔"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_tick_interval()
+
     def closeEvent(self, event):
         """窗口关闭事件"""
         self.timer.stop()
-        event.accept()
\ No newline at end of file
+        self.activity_view.close_loader()
+        event.accept()
+
+
+# 全屏休息遮罩的背景色
+OVERLAY_COLOR = QColor(24, 28, 32)
+# 遮罩上引导活动区域的高度：标题、图片和两三行说明，切换活动时不改变位置
+OVERLAY_ACTIVITY_HEIGHT = IMAGE_BOX.height() + 120
+
+
+class CountdownRenderer:
+    """把休息倒计时渲染为共享图像
+
+    倒计时变化时每种设备像素比只渲染一次，各屏幕的遮罩直接绘制同一张图像，
+    增加显示器不会增加渲染次数。只在GUI线程中使用。
+    """
+
+    SIZE = QSize(480, 420)  # 逻辑尺寸
+
+    def __init__(self, title, description):
+        self.title = title
+        self.description = description
+        self.value = 100
+        self.text = ""
+        self.render_count = 0  # 实际渲染次数
+        self._frames = {}  # 设备像素比 -> 当前倒计时的图像
+
+    def set_state(self, value, text):
+        """更新倒计时，返回是否需要重绘"""
+        if (value, text) == (self.value, self.text):
+            return False
+        self.value = value
+        self.text = text
+        self._frames.clear()
+        return True
+
+    def frame(self, dpr):
+        """获取指定设备像素比的倒计时图像，没有缓存时渲染一次"""
+        image = self._frames.get(dpr)
+        if image is None:
+            image = self.render(dpr)
+            self._frames[dpr] = image
+        return image
+
+    def render(self, dpr):
+        """渲染一帧倒计时图像"""
+        size = self.SIZE
+        image = QImage(
+            int(size.width() * dpr), int(size.height() * dpr), QImage.Format.Format_RGB32
+        )
+        image.setDevicePixelRatio(dpr)
+        # 不透明背景，遮罩绘制时是直接复制而不需要混合
+        image.fill(OVERLAY_COLOR)
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        width = size.width()
+
+        # 标题和说明
+        painter.setPen(QColor(255, 255, 255))
+        font = QFont()
+        font.setPointSize(24)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(QRect(0, 0, width, 60), Qt.AlignmentFlag.AlignCenter, self.title)
+
+        painter.setPen(QColor(200, 200, 200))
+        font = QFont()
+        font.setPointSize(14)
+        painter.setFont(font)
+        painter.drawText(QRect(0, 60, width, 40), Qt.AlignmentFlag.AlignCenter, self.description)
+
+        # 圆形进度
+        circle = QRect((width - 300) // 2, 110, 300, 300)
+        paint_circular_progress(
+            painter, circle, self.value, self.text, text_color=QColor(255, 255, 255)
+        )
+        painter.end()
+
+        self.render_count += 1
+        return image
+
+
+class ScreenOverlay(QWidget):
+    """单个屏幕上的全屏遮罩，只绘制共享的倒计时图像"""
+
+    dismissed = pyqtSignal()  # 遮罩被窗口管理器关闭
+
+    def __init__(self, renderer, screen):
+        super().__init__(
+            None,
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool,
+        )
+        self.renderer = renderer
+        self.controls = None
+        self.activity_view = None
+        self.paint_count = 0
+        self.setWindowTitle("休息时间")
+        # 每次重绘都会覆盖整个脏区域，不需要先擦除背景
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setScreen(screen)
+        self.setGeometry(screen.geometry())
+
+    def set_controls(self, controls, activity_view=None):
+        """放置按钮和引导活动（只在一个屏幕上显示）"""
+        self.controls = controls
+        controls.setParent(self)
+        self.activity_view = activity_view
+        if activity_view is not None:
+            activity_view.setParent(self)
+        self._place_controls()
+        controls.show()
+        if activity_view is not None:
+            activity_view.show()
+
+    def take_activity_view(self):
+        """移走引导活动（按钮换到其它屏幕时），返回它以便放到新的遮罩上"""
+        view, self.activity_view = self.activity_view, None
+        if view is not None:
+            view.hide()
+            view.setParent(None)
+        return view
+
+    def frame_rect(self):
+        """倒计时图像所在的区域（居中）"""
+        size = CountdownRenderer.SIZE
+        return QRect(
+            (self.width() - size.width()) // 2,
+            (self.height() - size.height()) // 2,
+            size.width(),
+            size.height(),
+        )
+
+    def refresh_frame(self):
+        """倒计时变化时只重绘图像所在的区域"""
+        self.update(self.frame_rect())
+
+    def _place_controls(self):
+        if self.controls is None:
+            return
+        self.controls.adjustSize()
+        rect = self.frame_rect()
+        self.controls.move(
+            rect.center().x() - self.controls.width() // 2, rect.bottom() + 30
+        )
+        if self.activity_view is not None:
+            # 引导活动放在倒计时上方，屏幕较矮时贴住顶部
+            self.activity_view.move(
+                rect.center().x() - self.activity_view.width() // 2,
+                max(0, rect.top() - self.activity_view.height() - 20),
+            )
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._place_controls()
+
+    def paintEvent(self, event):
+        """填充脏区域的背景并绘制共享图像"""
+        self.paint_count += 1
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), OVERLAY_COLOR)
+        rect = self.frame_rect()
+        if rect.intersects(event.rect()):
+            painter.drawImage(rect.topLeft(), self.renderer.frame(self.devicePixelRatioF()))
+
+    def closeEvent(self, event):
+        self.dismissed.emit()
+        event.accept()
+
+
+class BreakOverlay(QObject):
+    """在所有屏幕上显示全屏休息遮罩
+
+    信号和 show()/close() 接口与BreakWindow一致。倒计时每秒变化时，
+    CountdownRenderer为每种设备像素比渲染一次，各屏幕只重绘倒计时区域并绘制共享图像。
+    屏幕接入或移除时自动增减遮罩，按钮和引导活动显示在主屏幕上。休息结束后自动关闭。
+    """
+
+    break_finished = pyqtSignal()  # 休息结束信号
+    restart_requested = pyqtSignal()  # 请求重新开始信号
+
+    def __init__(self, parent=None, debug_mode=False, activities=None):
+        super().__init__(parent)
+        self.debug_mode = debug_mode
+        self.total_seconds = 10 if debug_mode else 1200
+        self.remaining_seconds = self.total_seconds
+        self.overlays = {}  # 屏幕 -> 遮罩
+        self.closed = False
+
+        if debug_mode:
+            desc_text = "调试模式：休息10秒钟"
+        else:
+            desc_text = "请休息20分钟，让大脑得到充分放松"
+        self.renderer = CountdownRenderer("休息时间", desc_text)
+        self.renderer.set_state(100, self.format_time(self.remaining_seconds))
+        # 引导活动只有一份，随按钮放在主屏幕的遮罩上（调试模式下每项2秒）
+        self.activity_view = ActivityView(
+            load_content_pack() if activities is None else activities,
+            seconds=2 if debug_mode else None,
+        )
+        self.activity_view.setFixedSize(CountdownRenderer.SIZE.width(), OVERLAY_ACTIVITY_HEIGHT)
+
+        self.timer = QTimer(self)
+        # 倒计时只精确到秒，使用粗粒度定时器便于系统合并唤醒
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.timer.timeout.connect(self.update_timer)
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self.add_screen)
+        app.screenRemoved.connect(self.remove_screen)
+
+    @staticmethod
+    def format_time(seconds):
+        return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+    def show(self):
+        """在每个屏幕上显示遮罩并开始倒计时"""
+        for screen in QGuiApplication.screens():
+            self.add_screen(screen)
+        self.timer.start(1000)  # 每秒更新一次
+
+    def add_screen(self, screen):
+        """为新接入的屏幕创建遮罩"""
+        if self.closed or screen in self.overlays:
+            return
+        overlay = ScreenOverlay(self.renderer, screen)
+        overlay.dismissed.connect(self.close)
+        if screen == QGuiApplication.primaryScreen() or not self.overlays:
+            self._move_controls_to(overlay)
+        self.overlays[screen] = overlay
+        overlay.showFullScreen()
+
+    def remove_screen(self, screen):
+        """屏幕移除时关闭对应的遮罩，按钮移到其它屏幕"""
+        overlay = self.overlays.pop(screen, None)
+        if overlay is None:
+            return
+        overlay.dismissed.disconnect(self.close)
+        # 引导活动不随遮罩销毁，留给其它屏幕或之后接入的屏幕
+        overlay.take_activity_view()
+        if overlay.controls is not None and self.overlays:
+            self._move_controls_to(next(iter(self.overlays.values())))
+        overlay.close()
+        overlay.deleteLater()
+
+    def _move_controls_to(self, overlay):
+        """把按钮放到指定的遮罩上"""
+        for other in self.overlays.values():
+            if other.controls is not None:
+                other.take_activity_view()
+                other.controls.deleteLater()
+                other.controls = None
+        controls = QWidget()
+        layout = QHBoxLayout(controls)
+        exit_btn = QPushButton("结束休息")
+        exit_btn.clicked.connect(self.close)
+        restart_btn = QPushButton("重新开始")
+        restart_btn.clicked.connect(self.request_restart)
+        layout.addWidget(exit_btn)
+        layout.addWidget(restart_btn)
+        overlay.set_controls(controls, self.activity_view)
+
+    def update_timer(self):
+        """每秒更新倒计时"""
+        self.consume_seconds(1)
+
+    def consume_seconds(self, seconds):
+        """倒计时减少若干秒，倒计时变化时通知各屏幕重绘"""
+        self.remaining_seconds -= seconds
+
+        if self.remaining_seconds <= 0:
+            self.timer.stop()
+            self.break_finished.emit()
+            self.close()
+            return
+
+        self.activity_view.advance(seconds)
+        progress = (self.remaining_seconds / self.total_seconds) * 100
+        if self.renderer.set_state(progress, self.format_time(self.remaining_seconds)):
+            for overlay in self.overlays.values():
+                overlay.refresh_frame()
+
+    def request_restart(self):
+        """请求重新开始"""
+        self.restart_requested.emit()
+        self.close()
+
+    def close(self):
+        """关闭所有遮罩并释放自身"""
+        if self.closed:
+            return
+        self.closed = True
+        self.timer.stop()
+        self.activity_view.close_loader()
+        app = QGuiApplication.instance()
+        app.screenAdded.disconnect(self.add_screen)
+        app.screenRemoved.disconnect(self.remove_screen)
+        overlays = list(self.overlays.values())
+        self.overlays.clear()
+        for overlay in overlays:
+            overlay.dismissed.disconnect(self.close)
+            overlay.close()
+            overlay.deleteLater()
+        self.deleteLater()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""随机提醒命令行
+
+不加载PyQt6的命令行入口，适合脚本调用和后台运行:
+    python cli.py start [--detach]   在终端（或后台）运行计时
+    python cli.py stop               停止后台计时
+    python cli.py status             查看计时状态
+    python cli.py stats [--days 7]   按天统计会话历史
+    python cli.py simulate           用虚拟时钟模拟一个专注周期
+    python cli.py gui                启动图形界面
+
+status只读取守护进程写出的状态文件，不经过argparse也不导入计时核心，
+启动后几十毫秒内即可返回。其它子命令用到的模块都在函数内按需导入。
+"""
+
+import json
+import os
+import sys
+import time
+
+from app_paths import user_data_path
+
+STATUS_FILE = "daemon_status.json"
+
+PHASE_NAMES = {
+    "focus": "专注中",
+    "resting": "短休息",
+    "finished": "专注完成",
+}
+
+
+def status_path():
+    return user_data_path(STATUS_FILE)
+
+
+def read_status():
+    """读取状态文件，守护进程不在运行时返回None"""
+    try:
+        with open(status_path(), encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not _pid_alive(status.get("pid", 0)):
+        return None
+    return status
+
+
+def write_status(status):
+    """原子写入状态文件"""
+    path = status_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    """检查进程是否存在"""
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def format_seconds(seconds):
+    seconds = max(0, int(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def add_timer_arguments(parser):
+    """计时设置参数，start和simulate共用"""
+    parser.add_argument("--focus", type=int, default=90, help="专注时间（分钟）")
+    parser.add_argument("--min", type=int, default=180, dest="min_interval", help="最小提醒间隔（秒）")
+    parser.add_argument("--max", type=int, default=300, dest="max_interval", help="最大提醒间隔（秒）")
+    parser.add_argument("--rest", type=int, default=10, help="短休息时间（秒）")
+    parser.add_argument("--distribution", default="uniform", help="间隔分布: uniform/exponential/normal/jitter")
+    parser.add_argument("--min-gap", type=int, default=0, help="两次提醒至少间隔的秒数，0表示不限")
+
+
+def build_core(args, notify):
+    """按命令行参数构建计时核心"""
+    from interval_distribution import build_distribution
+    from timer_core import TimerCore
+
+    core = TimerCore(notify)
+    core.state.focus_time = args.focus
+    core.state.min_interval = args.min_interval
+    core.state.max_interval = max(args.min_interval, args.max_interval)
+    core.state.rest_total = args.rest
+    core.interval_distribution = build_distribution(args.distribution, args.min_gap)
+    return core
+
+
+def core_status(core, started_at, reminders):
+    """生成状态文件内容，status命令据此按经过的时间推算当前进度"""
+    state = core.state
+    if not core.running:
+        phase = "finished"
+    elif state.is_resting:
+        phase = "resting"
+    else:
+        phase = "focus"
+    return {
+        "pid": os.getpid(),
+        "phase": phase,
+        "started_at": started_at,
+        "updated_at": time.time(),
+        "focused_seconds": core.focused_seconds(),
+        "focus_seconds_total": state.focus_time * 60,
+        "next_event_in": core.seconds_to_next_event(),
+        "reminder_interval": state.reminder_interval_seconds,
+        "rest_total": state.rest_total,
+        "reminders": reminders,
+    }
+
+
+def cmd_start(args, argv):
+    if read_status() is not None:
+        print("计时已在运行，先执行 stop")
+        return 1
+    if args.detach:
+        return _spawn_detached([a for a in argv if a != "--detach"])
+
+    import signal
+    import threading
+
+    from app_logging import setup_logging
+    from notifications import (
+        NotificationDispatcher,
+        build_channels,
+        load_config,
+        timer_notification,
+    )
+    from quiet_hours import load_quiet_hours
+    from session_history import EVENT_STOP, HistoryRecorder
+    from timer_core import NOTIFY_BREAK_TIME, NOTIFY_REMINDER, NOTIFY_REST_END, NOTIFY_SILENCED
+
+    setup_logging()
+    stop_event = threading.Event()
+    counters = {"reminders": 0}
+    # 终端只有响铃，桌面通知、Webhook和脚本按通知配置发送
+    notifier = NotificationDispatcher(build_channels(load_config()))
+
+    def notify(name, *values):
+        notification = timer_notification(name, core.state.rest_total, core.state.focus_time)
+        if notification is not None:
+            notifier.dispatch(notification)
+        stamp = time.strftime("%H:%M:%S")
+        if name == NOTIFY_REMINDER:
+            counters["reminders"] += 1
+            print(f"\a[{stamp}] 休息一下，{core.state.rest_total}秒", flush=True)
+        elif name == NOTIFY_REST_END:
+            print(f"\a[{stamp}] 继续专注", flush=True)
+        elif name == NOTIFY_BREAK_TIME:
+            print(f"\a[{stamp}] 专注周期完成，请长时间休息", flush=True)
+        elif name == NOTIFY_SILENCED:
+            # 免打扰时段不响铃
+            text = "专注周期完成" if values[0] == NOTIFY_BREAK_TIME else "休息结束"
+            print(f"[{stamp}] {text}（免打扰时段）", flush=True)
+
+    core = build_core(args, notify)
+    core.history = HistoryRecorder()
+    core.quiet_hours = load_quiet_hours()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    started_at = time.time()
+    core.start()
+    write_status(core_status(core, started_at, 0))
+    print(f"开始专注 {args.focus} 分钟，按 Ctrl+C 停止", flush=True)
+
+    carry = 0.0
+    try:
+        while core.running:
+            # 只在下一次事件时唤醒，状态文件记录时间戳供status推算
+            wait_start = time.monotonic()
+            if stop_event.wait(core.next_wake()):
+                core.record_if_ignored()
+                core.record(EVENT_STOP, core.focused_seconds())
+                break
+            waited = time.monotonic() - wait_start + carry
+            seconds = int(waited)
+            carry = waited - seconds
+            core.advance(seconds)
+            write_status(core_status(core, started_at, counters["reminders"]))
+    finally:
+        core.history.close()
+        if core.quiet_hours is not None:
+            core.quiet_hours.close()
+        try:
+            os.remove(status_path())
+        except OSError:
+            pass
+        notifier.close()
+    return 0
+
+
+def _spawn_detached(argv):
+    """在后台启动计时进程"""
+    import subprocess
+
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__)] + argv,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs,
+    )
+    print(f"已在后台启动，进程号 {process.pid}")
+    return 0
+
+
+def cmd_stop(args):
+    status = read_status()
+    if status is None:
+        print("计时未在运行")
+        return 1
+    import signal
+
+    os.kill(status["pid"], signal.SIGTERM)
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline:
+        if read_status() is None:
+            print("已停止")
+            return 0
+        time.sleep(0.05)
+    print("停止超时")
+    return 1
+
+
+def cmd_status(as_json=False):
+    status = read_status()
+    if status is None:
+        if as_json:
+            print(json.dumps({"running": False}))
+        else:
+            print("计时未在运行")
+        return 1
+
+    # 按状态文件写出后经过的时间推算当前进度
+    passed = time.time() - status["updated_at"]
+    focused = min(status["focused_seconds"] + passed, status["focus_seconds_total"])
+    next_event = max(0, status["next_event_in"] - passed)
+    if as_json:
+        status.update(running=True, focused_seconds=int(focused), next_event_in=int(next_event))
+        print(json.dumps(status, ensure_ascii=False))
+        return 0
+
+    phase = status["phase"]
+    print(f"状态: {PHASE_NAMES.get(phase, phase)}")
+    print(f"已专注: {format_seconds(focused)} / {format_seconds(status['focus_seconds_total'])}")
+    if phase == "resting":
+        print(f"休息剩余: {format_seconds(next_event)}")
+    elif phase == "focus":
+        print(f"下次提醒: {format_seconds(next_event)} 后")
+    print(f"本次提醒: {status['reminders']} 次")
+    return 0
+
+
+def cmd_stats(args):
+    from session_history import (
+        EVENT_FOCUS_COMPLETE,
+        EVENT_PAUSE,
+        EVENT_REMINDER,
+        EVENT_STOP,
+        iter_history_chunks,
+    )
+
+    since = time.time() - args.days * 86400
+    days = {}
+    for timestamps, events, values in iter_history_chunks(args.history):
+        for timestamp, event, value in zip(timestamps, events, values):
+            if timestamp < since:
+                continue
+            day = time.strftime("%Y-%m-%d", time.localtime(timestamp))
+            row = days.setdefault(day, [0, 0, 0, 0])
+            if event == EVENT_REMINDER:
+                row[0] += 1
+            elif event == EVENT_FOCUS_COMPLETE:
+                row[1] += 1
+                row[3] += value * 60
+            elif event == EVENT_PAUSE:
+                row[2] += 1
+            elif event == EVENT_STOP:
+                row[3] += value
+
+    if not days:
+        print(f"最近 {args.days} 天没有记录")
+        return 0
+    print("日期\t\t提醒\t完成\t暂停\t专注")
+    for day in sorted(days):
+        reminders, completed, pauses, focused = days[day]
+        print(f"{day}\t{reminders}\t{completed}\t{pauses}\t{format_seconds(focused)}")
+    return 0
+
+
+def cmd_simulate(args):
+    import random
+
+    from timer_core import NOTIFY_BREAK_TIME, NOTIFY_REMINDER, NOTIFY_REST_END
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    intervals = []
+
+    def notify(name, *values):
+        if name == NOTIFY_REMINDER:
+            intervals.append(core.state.reminder_interval_seconds)
+            if args.verbose:
+                print(f"{format_seconds(core.focused_seconds())}  提醒（间隔 {intervals[-1]} 秒）")
+        elif name == NOTIFY_REST_END and args.verbose:
+            print(f"{format_seconds(core.focused_seconds())}  休息结束")
+        elif name == NOTIFY_BREAK_TIME and args.verbose:
+            print(f"{format_seconds(core.focused_seconds())}  专注完成")
+
+    core = build_core(args, notify)
+    start = time.perf_counter()
+    core.start()
+    wakeups = 0
+    while core.running:
+        core.advance(core.next_wake())
+        wakeups += 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"专注 {args.focus} 分钟，提醒 {len(intervals)} 次，唤醒 {wakeups} 次")
+    if intervals:
+        mean = sum(intervals) / len(intervals)
+        print(f"提醒间隔: 最短 {min(intervals)} 秒，最长 {max(intervals)} 秒，平均 {mean:.0f} 秒")
+    print(f"模拟耗时 {elapsed_ms:.1f} ms")
+    return 0
+
+
+def cmd_gui(qt_args):
+    from main import main as gui_main
+
+    sys.argv = sys.argv[:1] + qt_args
+    gui_main()
+    return 0
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="随机提醒命令行")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = subparsers.add_parser("start", help="开始专注")
+    add_timer_arguments(start_parser)
+    start_parser.add_argument("--detach", action="store_true", help="在后台运行")
+
+    subparsers.add_parser("stop", help="停止后台计时")
+
+    status_parser = subparsers.add_parser("status", help="查看计时状态")
+    status_parser.add_argument("--json", action="store_true", help="以JSON输出")
+
+    stats_parser = subparsers.add_parser("stats", help="按天统计会话历史")
+    stats_parser.add_argument("--days", type=int, default=7)
+    stats_parser.add_argument("--history", help="历史文件路径，默认为用户数据目录")
+
+    simulate_parser = subparsers.add_parser("simulate", help="用虚拟时钟模拟一个专注周期")
+    add_timer_arguments(simulate_parser)
+    simulate_parser.add_argument("--seed", type=int)
+    simulate_parser.add_argument("-v", "--verbose", action="store_true")
+
+    subparsers.add_parser("gui", help="启动图形界面（其余参数传给Qt）")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # status是最常用的脚本调用，跳过argparse直接处理
+    if argv == ["status"] or argv == ["status", "--json"]:
+        return cmd_status(as_json=len(argv) == 2)
+
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "gui":
+        return cmd_gui(extra)
+    if extra:
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+
+    if args.command == "start":
+        return cmd_start(args, argv)
+    if args.command == "stop":
+        return cmd_stop(args)
+    if args.command == "status":
+        return cmd_status(args.json)
+    if args.command == "stats":
+        return cmd_stats(args)
+    return cmd_simulate(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""专注历史图表
+
+从事件历史推算出专注和短休息的时间段，按分钟累计到基础分桶中，
+再逐级汇总为5分钟、15分钟、1小时、4小时、1天、1周的多级分桶（预先聚合的瓦片）。
+
+绘制时按可见的时间范围选择分桶数不超过像素宽度两倍的最细一级，
+再用LTTB（Largest-Triangle-Three-Buckets）算法降采样到每个像素一个点，
+保留峰谷形状。拖动和缩放时每帧只处理与像素数同一量级的数据，
+与历史的总长度无关。
+"""
+
+import array
+import logging
+import math
+import threading
+import time
+
+from PyQt6.QtCore import QPointF, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from session_history import (
+    EVENT_AWAY,
+    EVENT_BACK,
+    EVENT_FOCUS_COMPLETE,
+    EVENT_PAUSE,
+    EVENT_REMINDER,
+    EVENT_REST_END,
+    EVENT_RESUME,
+    EVENT_START,
+    EVENT_STOP,
+    iter_history_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_BIN = 60  # 基础分桶的秒数
+LEVEL_FACTORS = (5, 3, 4, 4, 6, 7)  # 每一级相对上一级的倍数：5分钟、15分钟、1小时、4小时、1天、1周
+POINTS_PER_PIXEL = 2  # 所选级别的分桶数最多是像素宽度的多少倍
+
+KIND_FOCUS = 0
+KIND_REST = 1
+
+# 没有结束事件的时间段（例如进程崩溃）最长计入的秒数
+MAX_SEGMENT = {KIND_FOCUS: 3 * 3600, KIND_REST: 600}
+
+FOCUS_COLOR = QColor(76, 175, 80)
+REST_COLOR = QColor(33, 150, 243)
+
+# 各种跨度下的刻度间隔（秒）
+TICK_STEPS = (
+    3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 2 * 86400, 7 * 86400, 14 * 86400, 30 * 86400, 91 * 86400, 182 * 86400, 365 * 86400,
+)
+
+RANGES = {"day": 86400, "week": 7 * 86400, "month": 30 * 86400}
+
+
+def activity_segments(chunks, now=None):
+    """把事件历史转换为 (开始, 结束, 类型) 时间段
+
+    开始、恢复、返回、短休息结束时进入专注；提醒时进入短休息；
+    暂停、停止、离开、专注完成时结束当前时间段。
+    """
+    now = time.time() if now is None else now
+    current = None  # (类型, 开始时间)
+    for timestamps, events, _ in chunks:
+        for timestamp, event in zip(timestamps, events):
+            if current is not None:
+                kind, start = current
+                end = min(timestamp, start + MAX_SEGMENT[kind])
+                if end > start:
+                    yield start, end, kind
+                current = None
+            if event in (EVENT_START, EVENT_RESUME, EVENT_BACK, EVENT_REST_END):
+                current = (KIND_FOCUS, timestamp)
+            elif event == EVENT_REMINDER:
+                current = (KIND_REST, timestamp)
+            elif event in (EVENT_PAUSE, EVENT_STOP, EVENT_AWAY, EVENT_FOCUS_COMPLETE):
+                current = None
+    if current is not None:
+        kind, start = current
+        end = min(now, start + MAX_SEGMENT[kind])
+        if end > start:
+            yield start, end, kind
+
+
+def _add_segment(bins, origin, start, end):
+    """把一个时间段的秒数累计到基础分桶"""
+    first = int((start - origin) // BASE_BIN)
+    last = int((end - origin) // BASE_BIN)
+    if first == last:
+        bins[first] += end - start
+        return
+    bins[first] += origin + (first + 1) * BASE_BIN - start
+    if last > first + 1:
+        # 同一类型的时间段不重叠，中间的整桶直接填满
+        bins[first + 1:last] = array.array("f", [BASE_BIN]) * (last - first - 1)
+    if last < len(bins):
+        bins[last] += end - (origin + last * BASE_BIN)
+
+
+def _aggregate(values, factor):
+    """每factor个分桶求和为上一级的一个分桶"""
+    return array.array("f", (sum(values[i:i + factor]) for i in range(0, len(values), factor)))
+
+
+def lttb(values, start, stop, threshold):
+    """对 values[start:stop] 做LTTB降采样
+
+    横坐标是分桶下标，返回保留下来的下标列表（首尾一定保留）。
+    每个输出桶选择与前一个选中点、下一个桶平均点构成的三角形面积最大的点，
+    峰谷因此能被保留下来。
+    """
+    count = stop - start
+    if threshold >= count or threshold < 3:
+        return list(range(start, stop))
+    selected = [start]
+    every = (count - 2) / (threshold - 2)
+    a = start
+    for i in range(threshold - 2):
+        bucket_start = start + 1 + int(i * every)
+        bucket_end = start + 1 + int((i + 1) * every)
+        next_start = bucket_end
+        next_end = min(start + 1 + int((i + 2) * every), stop)
+        if next_start >= next_end:
+            next_start, next_end = stop - 1, stop
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+        ay = values[a]
+        # 三角形面积的两倍 |(a-avg_x)*(v_j-ay) - (a-j)*(avg_y-ay)| 是 j 和 v_j 的线性函数，
+        # 系数在桶内不变，先算出来以减少循环内的运算
+        kv = a - avg_x
+        kj = avg_y - ay
+        c = -kv * ay - a * kj
+        best = bucket_start
+        best_area = -1.0
+        j = bucket_start
+        for value in values[bucket_start:bucket_end]:
+            area = abs(kv * value + kj * j + c)
+            if area > best_area:
+                best_area = area
+                best = j
+            j += 1
+        selected.append(best)
+        a = best
+    selected.append(stop - 1)
+    return selected
+
+
+class HistoryTiles:
+    """多级分桶
+
+    levels[k] 为 (每桶秒数, 专注秒数数组, 休息秒数数组)，所有级别共用同一个起点。
+    """
+
+    def __init__(self, origin, levels):
+        self.origin = origin
+        self.levels = levels
+
+    @classmethod
+    def from_segments(cls, segments):
+        segments = list(segments)
+        if not segments:
+            return cls(time.time(), [(BASE_BIN, array.array("f"), array.array("f"))])
+        # 起点对齐到本地时间的周一零点，较粗的级别按天、按周对齐
+        first = time.localtime(min(start for start, _, _ in segments))
+        origin = time.mktime((first.tm_year, first.tm_mon, first.tm_mday - first.tm_wday,
+                              0, 0, 0, 0, 0, -1))
+        end = max(end for _, end, _ in segments)
+        size = int((end - origin) // BASE_BIN) + 1
+        focus = array.array("f", [0.0]) * size
+        rest = array.array("f", [0.0]) * size
+        for start, stop, kind in segments:
+            _add_segment(focus if kind == KIND_FOCUS else rest, origin, start, stop)
+
+        levels = [(BASE_BIN, focus, rest)]
+        for factor in LEVEL_FACTORS:
+            seconds, focus, rest = levels[-1]
+            levels.append((seconds * factor, _aggregate(focus, factor), _aggregate(rest, factor)))
+        return cls(origin, levels)
+
+    @classmethod
+    def from_history(cls, path=None, now=None):
+        """读取历史文件并构建"""
+        return cls.from_segments(activity_segments(iter_history_chunks(path), now))
+
+    @property
+    def start(self):
+        return self.origin
+
+    @property
+    def end(self):
+        seconds, focus, _ = self.levels[0]
+        return self.origin + len(focus) * seconds
+
+    def choose_level(self, t0, t1, width):
+        """可见范围内分桶数不超过 width*POINTS_PER_PIXEL 的最细级别"""
+        limit = max(1, width) * POINTS_PER_PIXEL
+        for index, (seconds, _, _) in enumerate(self.levels):
+            if (t1 - t0) / seconds <= limit:
+                return index
+        return len(self.levels) - 1
+
+    def bin_range(self, level, t0, t1):
+        """可见范围覆盖的分桶下标 [first, last)，两侧各多取一个以便连线延伸到边缘"""
+        seconds, focus, _ = self.levels[level]
+        first = max(0, int((t0 - self.origin) // seconds) - 1)
+        last = min(len(focus), int((t1 - self.origin) // seconds) + 2)
+        return first, max(first, last)
+
+    def totals(self, t0, t1):
+        """[t0, t1) 内的专注和休息秒数
+
+        完整落在范围内的分桶用尽量粗的级别求和，两端不足一个分桶的部分逐级换到更细的级别，
+        到基础分桶时按重叠的比例计入。
+        """
+        return self._sum(len(self.levels) - 1, t0, t1)
+
+    def _sum(self, level, t0, t1):
+        if t1 <= t0:
+            return 0.0, 0.0
+        seconds, focus, rest = self.levels[level]
+        a = (t0 - self.origin) / seconds
+        b = (t1 - self.origin) / seconds
+        if level == 0:
+            focus_sum = rest_sum = 0.0
+            for index in range(max(0, math.floor(a)), min(len(focus), math.ceil(b))):
+                overlap = min(b, index + 1) - max(a, index)
+                focus_sum += focus[index] * overlap
+                rest_sum += rest[index] * overlap
+            return focus_sum, rest_sum
+        first, last = math.ceil(a), math.floor(b)
+        if first >= last:
+            return self._sum(level - 1, t0, t1)
+        left = self._sum(level - 1, t0, self.origin + first * seconds)
+        right = self._sum(level - 1, self.origin + last * seconds, t1)
+        first, last = max(0, first), min(len(focus), last)
+        return (
+            left[0] + sum(focus[first:last]) + right[0],
+            left[1] + sum(rest[first:last]) + right[1],
+        )
+
+
+class HistoryChart(QWidget):
+    """专注/休息比例随时间变化的折线图
+
+    滚轮缩放（以鼠标位置为中心），拖动平移，双击回到最近一周。
+    纵轴为每个分桶中专注或休息时间所占的比例。
+    """
+
+    MARGIN_LEFT = 40
+    MARGIN_RIGHT = 10
+    MARGIN_TOP = 10
+    MARGIN_BOTTOM = 24
+    MIN_SPAN = 3600
+
+    view_changed = pyqtSignal(float, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(360, 180)
+        self.setMouseTracking(False)
+        self.tiles = HistoryTiles.from_segments([])
+        now = time.time()
+        self.view = (now - RANGES["week"], now)
+        self._drag_x = None
+        self._cache_key = None
+        self._cache = ([], [])
+        self.level_used = 0  # 最近一次绘制使用的级别
+        self.points_drawn = 0  # 最近一次绘制的点数（两条折线之和）
+
+    def set_tiles(self, tiles):
+        self.tiles = tiles
+        self._cache_key = None
+        self.update()
+
+    def plot_rect(self):
+        return QRectF(
+            self.MARGIN_LEFT,
+            self.MARGIN_TOP,
+            max(1, self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT),
+            max(1, self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM),
+        )
+
+    def set_view(self, t0, t1):
+        """设置可见的时间范围"""
+        span = max(self.MIN_SPAN, t1 - t0)
+        # 最多缩小到能看到全部历史再多一周
+        span = min(span, self.tiles.end - self.tiles.start + RANGES["week"])
+        center = (t0 + t1) / 2
+        self.view = (center - span / 2, center + span / 2)
+        self.update()
+        self.view_changed.emit(*self.view)
+
+    def show_recent(self, seconds):
+        """显示截至当前的一段时间"""
+        now = time.time()
+        self.set_view(now - seconds, now)
+
+    def show_all(self):
+        self.set_view(self.tiles.start, max(self.tiles.end, time.time()))
+
+    def zoom(self, factor, anchor):
+        """以anchor时刻为中心缩放，factor小于1时放大"""
+        t0, t1 = self.view
+        self.set_view(anchor - (anchor - t0) * factor, anchor + (t1 - anchor) * factor)
+
+    def pan(self, seconds):
+        t0, t1 = self.view
+        self.view = (t0 + seconds, t1 + seconds)
+        self.update()
+        self.view_changed.emit(*self.view)
+
+    def time_at(self, x):
+        rect = self.plot_rect()
+        t0, t1 = self.view
+        return t0 + (x - rect.left()) / rect.width() * (t1 - t0)
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps:
+            self.zoom(0.8 ** steps, self.time_at(event.position().x()))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        x = event.position().x()
+        t0, t1 = self.view
+        self.pan((self._drag_x - x) / self.plot_rect().width() * (t1 - t0))
+        self._drag_x = x
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.show_recent(RANGES["week"])
+
+    def series_points(self, rect):
+        """计算两条折线的点，范围和尺寸不变时直接使用缓存"""
+        t0, t1 = self.view
+        width = int(rect.width())
+        level = self.tiles.choose_level(t0, t1, width)
+        first, last = self.tiles.bin_range(level, t0, t1)
+        key = (id(self.tiles), level, first, last, t0, t1, width, rect.height())
+        if key == self._cache_key:
+            return self._cache
+        seconds, focus, rest = self.tiles.levels[level]
+        origin = self.tiles.origin
+        scale_x = rect.width() / (t1 - t0)
+        offset = origin + seconds / 2 - t0
+        bottom = rect.bottom()
+        scale_y = rect.height() / seconds
+        polygons = []
+        for values in (focus, rest):
+            polygon = QPolygonF()
+            for i in lttb(values, first, last, width):
+                polygon.append(QPointF(
+                    rect.left() + (offset + i * seconds) * scale_x,
+                    bottom - values[i] * scale_y,
+                ))
+            polygons.append(polygon)
+        self.level_used = level
+        self._cache_key = key
+        self._cache = polygons
+        return polygons
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        rect = self.plot_rect()
+        self._paint_axes(painter, rect)
+
+        painter.setClipRect(rect)
+        focus, rest = self.series_points(rect)
+        self.points_drawn = len(focus) + len(rest)
+        # 每条折线的点数超过像素数的八分之一时，锯齿状折线的抗锯齿描边开销远大于收益，
+        # 改用一像素宽的非抗锯齿线
+        dense = max(len(focus), len(rest)) > rect.width() / 8
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, not dense)
+        for color, polygon in ((REST_COLOR, rest), (FOCUS_COLOR, focus)):
+            pen = QPen(color, 0 if dense else 1.5)
+            painter.setPen(pen)
+            painter.drawPolyline(polygon)
+
+    def _paint_axes(self, painter, rect):
+        """网格线、纵轴百分比和时间刻度"""
+        text_color = self.palette().text().color()
+        grid = QColor(text_color)
+        grid.setAlpha(40)
+        painter.setPen(QPen(grid, 1))
+        for ratio in (0.0, 0.5, 1.0):
+            y = rect.bottom() - ratio * rect.height()
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+
+        painter.setPen(text_color)
+        metrics = painter.fontMetrics()
+        for ratio in (0.0, 0.5, 1.0):
+            y = rect.bottom() - ratio * rect.height()
+            label = f"{int(ratio * 100)}%"
+            painter.drawText(
+                QRectF(0, y - metrics.height() / 2, self.MARGIN_LEFT - 4, metrics.height()),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                label,
+            )
+
+        t0, t1 = self.view
+        span = t1 - t0
+        step = next((s for s in TICK_STEPS if span / s <= 8), TICK_STEPS[-1])
+        if step < 86400:
+            fmt = "%H:%M"
+        elif span <= 120 * 86400:
+            fmt = "%m-%d"
+        else:
+            fmt = "%Y-%m"
+        # 刻度对齐到本地时间
+        offset = -time.localtime(t0).tm_gmtoff
+        tick = math.ceil((t0 - offset) / step) * step + offset
+        while tick <= t1:
+            x = rect.left() + (tick - t0) / span * rect.width()
+            painter.setPen(QPen(grid, 1))
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+            painter.setPen(text_color)
+            painter.drawText(
+                QRectF(x - 40, rect.bottom() + 2, 80, self.MARGIN_BOTTOM - 2),
+                Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop,
+                time.strftime(fmt, time.localtime(tick)),
+            )
+            tick += step
+
+
+class HistoryChartPanel(QWidget):
+    """图表和范围按钮，主窗口中按需创建
+
+    历史文件在后台线程中读取和汇总，完成后在界面线程替换图表的数据。
+    """
+
+    tiles_loaded = pyqtSignal(int, object)  # 请求序号, HistoryTiles（读取失败时为None）
+
+    def __init__(self, history_path=None, parent=None):
+        super().__init__(parent)
+        self.history_path = history_path
+        self._generation = 0  # 只采用最近一次读取的结果
+        self._loading_generation = None
+        self.tiles_loaded.connect(self._on_tiles_loaded)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        buttons = QHBoxLayout()
+        for label, seconds in (("日", RANGES["day"]), ("周", RANGES["week"]), ("月", RANGES["month"])):
+            button = QPushButton(label)
+            button.clicked.connect(lambda _, s=seconds: self.chart.show_recent(s))
+            buttons.addWidget(button)
+        all_button = QPushButton("全部")
+        all_button.clicked.connect(lambda: self.chart.show_all())
+        buttons.addWidget(all_button)
+        buttons.addStretch(1)
+        refresh_button = QPushButton("刷新")
+        refresh_button.clicked.connect(self.reload)
+        buttons.addWidget(refresh_button)
+        layout.addLayout(buttons)
+
+        self.chart = HistoryChart()
+        self.chart.view_changed.connect(self.update_summary)
+        layout.addWidget(self.chart, 1)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.summary_label)
+
+    @property
+    def loading(self):
+        """是否有尚未完成的读取"""
+        return self._loading_generation == self._generation
+
+    def reload(self):
+        """在后台线程重新读取历史文件，不等待读取完成"""
+        self._generation += 1
+        self._loading_generation = self._generation
+        self.summary_label.setText("正在读取历史…")
+        threading.Thread(
+            target=self._load, args=(self._generation, self.history_path), daemon=True
+        ).start()
+
+    def _load(self, generation, path):
+        try:
+            tiles = HistoryTiles.from_history(path)
+        except (OSError, ValueError):
+            logger.warning("读取历史 %s 失败", path, exc_info=True)
+            tiles = None
+        try:
+            self.tiles_loaded.emit(generation, tiles)
+        except RuntimeError:
+            # 面板已经销毁
+            pass
+
+    def _on_tiles_loaded(self, generation, tiles):
+        if generation != self._generation:
+            return
+        self._loading_generation = None
+        if tiles is not None:
+            self.chart.set_tiles(tiles)
+        self.update_summary()
+
+    def update_summary(self, *_):
+        if self.loading:
+            return
+        focus, rest = self.chart.tiles.totals(*self.chart.view)
+        self.summary_label.setText(
+            f"可见范围内专注 {focus / 3600:.1f} 小时，短休息 {rest / 60:.0f} 分钟"
+        )
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ctypes
+import ctypes.util
+import logging
+import platform
+import re
+import shutil
+import subprocess
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _suspend_clock():
+    """返回计入休眠时间的单调时钟，平台不支持时返回None
+
+    Linux 上是 CLOCK_BOOTTIME；macOS 上 clock_gettime 的 CLOCK_MONOTONIC 计入休眠
+    （time.monotonic 使用的 mach_absolute_time 不计入）；Windows 上 time.monotonic 本身就计入休眠。
+    这些时钟都不受校时和手动修改系统时间的影响。
+    """
+    system = platform.system()
+    if system == "Windows":
+        return time.monotonic
+    clock_id = None
+    if system == "Linux":
+        clock_id = getattr(time, "CLOCK_BOOTTIME", None)
+    elif system == "Darwin":
+        clock_id = getattr(time, "CLOCK_MONOTONIC", None)
+    if clock_id is None:
+        return None
+    try:
+        time.clock_gettime(clock_id)
+    except OSError:
+        return None
+    return lambda: time.clock_gettime(clock_id)
+
+
+class IdleDetector:
+    """空闲与休眠检测器
+
+    通过计入休眠时间的单调时钟的增量判断系统是否经历过休眠（墙上时钟只作对照），
+    并可选地查询系统级的用户空闲时间（X11/Wayland/macOS/Windows），
+    供计时器线程判断用户是否在场。
+    """
+
+    ACTIVE = "active"  # 用户在场
+    IDLE = "idle"  # 用户长时间无输入
+    SUSPENDED = "suspended"  # 系统刚从休眠中恢复
+
+    def __init__(self, idle_threshold=300, suspend_threshold=5, use_system_idle=True):
+        """
+        Args:
+            idle_threshold: 无输入多少秒后视为离开
+            suspend_threshold: 两次检查之间多出多少秒视为休眠
+            use_system_idle: 是否查询系统级空闲时间（不可用时自动降级）
+        """
+        self.idle_threshold = idle_threshold
+        self.suspend_threshold = suspend_threshold
+        self.use_system_idle = use_system_idle
+        self.system_idle_poll = 10  # 系统空闲时间查询的最小间隔（秒）
+        self.last_gap = 0  # 最近一次检测到的休眠时长（秒）
+
+        self._suspend_clock = _suspend_clock()
+        self._last_mono = None
+        self._last_boot = None
+        self._last_wall = None
+        self._last_idle_poll = None
+        self._last_idle_seconds = 0
+        self._idle_query = None  # 延迟选择的系统空闲查询函数
+        self._idle_query_resolved = False
+
+    def reset(self):
+        """重置时钟基准，应在计时开始或恢复时调用"""
+        self._last_mono = time.monotonic()
+        self._last_boot = self._suspend_clock() if self._suspend_clock else None
+        self._last_wall = time.time()
+        self._last_idle_poll = None
+        self._last_idle_seconds = 0
+        self.last_gap = 0
+
+    def check(self, expected_interval=1.0):
+        """检查当前状态
+
+        Args:
+            expected_interval: 距离上次检查预期经过的秒数
+
+        Returns:
+            ACTIVE、IDLE 或 SUSPENDED 之一；SUSPENDED 时 last_gap 为缺失的秒数
+        """
+        mono = time.monotonic()
+        boot = self._suspend_clock() if self._suspend_clock else None
+        wall = time.time()
+
+        if self._last_mono is None:
+            self._last_mono = mono
+            self._last_boot = boot
+            self._last_wall = wall
+            return self.ACTIVE
+
+        d_mono = mono - self._last_mono
+        d_wall = wall - self._last_wall
+        d_boot = boot - self._last_boot if boot is not None and self._last_boot is not None else None
+        self._last_mono = mono
+        self._last_boot = boot
+        self._last_wall = wall
+
+        if d_boot is not None:
+            # 只以计入休眠的时钟为准：校时或手动修改系统时间引起的墙上时钟跳变不算休眠
+            gap = d_boot - expected_interval
+            if d_wall - expected_interval > self.suspend_threshold and gap <= self.suspend_threshold:
+                logger.info("系统时间跳变 %.0f 秒，不视为休眠", d_wall - d_mono)
+        else:
+            # 没有计入休眠的时钟时退回旧的判断：单调时钟在休眠期间停止，而墙上时钟继续走
+            gap = max(d_wall, d_mono) - expected_interval
+        if gap > self.suspend_threshold:
+            self.last_gap = int(gap)
+            return self.SUSPENDED
+
+        if self.is_user_idle(mono):
+            return self.IDLE
+        return self.ACTIVE
+
+    def is_user_idle(self, now=None):
+        """用户是否已超过阈值没有任何输入"""
+        if not self.use_system_idle or self.idle_threshold <= 0:
+            return False
+
+        now = time.monotonic() if now is None else now
+        if (
+            self._last_idle_poll is None
+            or now - self._last_idle_poll >= self.system_idle_poll
+        ):
+            self._last_idle_poll = now
+            idle_seconds = self.system_idle_seconds()
+            self._last_idle_seconds = idle_seconds if idle_seconds is not None else 0
+
+        return self._last_idle_seconds >= self.idle_threshold
+
+    def system_idle_seconds(self):
+        """查询系统级空闲秒数，不支持时返回None"""
+        if not self._idle_query_resolved:
+            self._idle_query = self._resolve_idle_query()
+            self._idle_query_resolved = True
+        if self._idle_query is None:
+            return None
+        try:
+            return self._idle_query()
+        except Exception:
+            return None
+
+    def _resolve_idle_query(self):
+        """根据平台选择可用的空闲查询方式"""
+        system = platform.system()
+        if system == "Windows":
+            return _windows_idle_seconds
+        if system == "Darwin":
+            return _macos_idle_seconds if shutil.which("ioreg") else None
+        if system == "Linux":
+            xss = _load_xss()
+            if xss is not None:
+                return xss
+            if shutil.which("xprintidle"):
+                return _xprintidle_seconds
+            if shutil.which("gdbus"):
+                return _mutter_idle_seconds
+        return None
+
+
+def _windows_idle_seconds():
+    """Windows: GetLastInputInfo"""
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    millis = ctypes.windll.kernel32.GetTickCount() - info.dwTime
+    return millis / 1000
+
+
+def _macos_idle_seconds():
+    """macOS: 读取IOHIDSystem的HIDIdleTime（纳秒）"""
+    output = subprocess.run(
+        ["ioreg", "-c", "IOHIDSystem", "-d", "4"],
+        capture_output=True, text=True, timeout=2,
+    ).stdout
+    match = re.search(r'"HIDIdleTime" = (\d+)', output)
+    if not match:
+        return None
+    return int(match.group(1)) / 1_000_000_000
+
+
+def _load_xss():
+    """X11: 通过libXss的XScreenSaverQueryInfo查询空闲时间"""
+    xlib_name = ctypes.util.find_library("X11")
+    xss_name = ctypes.util.find_library("Xss")
+    if not xlib_name or not xss_name:
+        return None
+
+    try:
+        xlib = ctypes.cdll.LoadLibrary(xlib_name)
+        xss = ctypes.cdll.LoadLibrary(xss_name)
+    except OSError:
+        return None
+
+    class XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [
+            ("window", ctypes.c_ulong),
+            ("state", ctypes.c_int),
+            ("kind", ctypes.c_int),
+            ("til_or_since", ctypes.c_ulong),
+            ("idle", ctypes.c_ulong),
+            ("eventMask", ctypes.c_ulong),
+        ]
+
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    xss.XScreenSaverQueryInfo.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)
+    ]
+
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        # Wayland会话下没有X显示，交给其它方式处理
+        return None
+    root = xlib.XDefaultRootWindow(display)
+    info = xss.XScreenSaverAllocInfo()
+
+    def query():
+        if not xss.XScreenSaverQueryInfo(display, root, info):
+            return None
+        return info.contents.idle / 1000
+
+    return query
+
+
+def _xprintidle_seconds():
+    """X11: 使用xprintidle命令（毫秒）"""
+    output = subprocess.run(
+        ["xprintidle"], capture_output=True, text=True, timeout=2
+    ).stdout.strip()
+    return int(output) / 1000 if output.isdigit() else None
+
+
+def _mutter_idle_seconds():
+    """GNOME Wayland: 通过Mutter的IdleMonitor D-Bus接口查询（毫秒）"""
+    output = subprocess.run(
+        [
+            "gdbus", "call", "--session",
+            "--dest", "org.gnome.Mutter.IdleMonitor",
+            "--object-path", "/org/gnome/Mutter/IdleMonitor/Core",
+            "--method", "org.gnome.Mutter.IdleMonitor.GetIdletime",
+        ],
+        capture_output=True, text=True, timeout=2,
+    ).stdout
+    match = re.search(r"(\d+)", output)
+    return int(match.group(1)) / 1000 if match else None
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import json
+import math
+import random
+
+# 逆累积分布查找表的分段数
+TABLE_SIZE = 1024
+
+
+class IntervalDistribution:
+    """提醒间隔分布基类
+
+    分布定义在归一化区间[0, 1]上，采样时再线性映射到[最小间隔, 最大间隔]，
+    因此查找表只需在分布设置变化时构建一次，修改间隔范围不需要重建。
+    """
+
+    name = ""
+    label = ""
+
+    def sample_unit(self, rng):
+        """在[0, 1]上采样，子类实现，必须为O(1)"""
+        raise NotImplementedError
+
+    def cdf(self, x):
+        """[0, 1]上的累积分布，子类实现，必须为O(1)"""
+        raise NotImplementedError
+
+    def quantile(self, u):
+        """[0, 1]上的分位函数，子类实现，必须为O(1)"""
+        raise NotImplementedError
+
+    def sample(self, low, high, rng=random):
+        """采样一个提醒间隔（秒）"""
+        if high <= low:
+            return low
+        return int(round(low + self.sample_unit(rng) * (high - low)))
+
+    def sample_unit_above(self, x_min, rng):
+        """以 x >= x_min 为条件在[0, 1]上采样（x_min为归一化位置）
+
+        只查预先构建的累积分布表和分位表各一次，不构建新表。
+        """
+        u_min = self.cdf(x_min)
+        return self.quantile(u_min + rng.random() * (1 - u_min))
+
+
+class UniformInterval(IntervalDistribution):
+    """均匀分布，与原来的randint行为一致"""
+
+    name = "uniform"
+    label = "均匀"
+
+    def sample_unit(self, rng):
+        return rng.random()
+
+    def cdf(self, x):
+        return min(1.0, max(0.0, x))
+
+    def quantile(self, u):
+        return min(1.0, max(0.0, u))
+
+    def sample(self, low, high, rng=random):
+        if high <= low:
+            return low
+        return rng.randint(low, high)
+
+
+class QuantileTableInterval(IntervalDistribution):
+    """基于逆累积分布查找表的分布，采样为一次查表加线性插值"""
+
+    def __init__(self, table):
+        self.table = table  # TABLE_SIZE+1 个单调不减的分位点
+        # 等距网格上的累积分布，条件采样时O(1)查表
+        self.cdf_table = [self._search_cdf(i / TABLE_SIZE) for i in range(TABLE_SIZE + 1)]
+
+    @classmethod
+    def from_quantile(cls, quantile):
+        """由分位函数构建查找表"""
+        table = [min(1.0, max(0.0, quantile(i / TABLE_SIZE))) for i in range(TABLE_SIZE + 1)]
+        return cls(table)
+
+    @classmethod
+    def from_cdf(cls, cdf):
+        """由累积分布函数数值求逆构建查找表（仅在设置变化时调用）"""
+        table = [0.0]
+        x_low = 0.0
+        for i in range(1, TABLE_SIZE):
+            target = i / TABLE_SIZE
+            lo, hi = x_low, 1.0
+            for _ in range(40):
+                mid = (lo + hi) / 2
+                if cdf(mid) < target:
+                    lo = mid
+                else:
+                    hi = mid
+            x_low = hi
+            table.append(hi)
+        table.append(1.0)
+        return cls(table)
+
+    def sample_unit(self, rng):
+        position = rng.random() * TABLE_SIZE
+        index = int(position)
+        if index >= TABLE_SIZE:
+            return self.table[TABLE_SIZE]
+        low = self.table[index]
+        return low + (self.table[index + 1] - low) * (position - index)
+
+    def _search_cdf(self, x):
+        """在分位表上二分查找累积分布（只在构建时使用）"""
+        index = bisect.bisect_right(self.table, x) - 1
+        if index < 0:
+            return 0.0
+        if index >= TABLE_SIZE:
+            return 1.0
+        low, high = self.table[index], self.table[index + 1]
+        frac = (x - low) / (high - low) if high > low else 0.0
+        return (index + frac) / TABLE_SIZE
+
+    def cdf(self, x):
+        """累积分布，在等距网格上线性插值"""
+        position = min(1.0, max(0.0, x)) * TABLE_SIZE
+        index = min(int(position), TABLE_SIZE - 1)
+        low = self.cdf_table[index]
+        return low + (self.cdf_table[index + 1] - low) * (position - index)
+
+    def quantile(self, u):
+        """查找表上的分位函数"""
+        position = min(1.0, max(0.0, u)) * TABLE_SIZE
+        index = min(int(position), TABLE_SIZE - 1)
+        low = self.table[index]
+        return low + (self.table[index + 1] - low) * (position - index)
+
+
+class ExponentialInterval(QuantileTableInterval):
+    """截断指数分布：短间隔更常见，偶尔出现长间隔"""
+
+    name = "exponential"
+    label = "指数"
+
+    def __init__(self, mean=0.3):
+        """
+        Args:
+            mean: 未截断时的均值占间隔范围的比例
+        """
+        self.mean = mean
+        rate = 1 / mean
+        tail = 1 - math.exp(-rate)
+        table = QuantileTableInterval.from_quantile(
+            lambda u: -math.log(1 - u * tail) / rate
+        ).table
+        super().__init__(table)
+
+
+class TruncatedNormalInterval(QuantileTableInterval):
+    """截断正态分布：集中在范围中部"""
+
+    name = "normal"
+    label = "截断正态"
+
+    def __init__(self, mean=0.5, std=0.2):
+        """
+        Args:
+            mean: 均值在间隔范围中的位置（0~1）
+            std: 标准差占间隔范围的比例
+        """
+        self.mean = mean
+        self.std = std
+
+        def phi(x):
+            return 0.5 * (1 + math.erf((x - mean) / (std * math.sqrt(2))))
+
+        lower, upper = phi(0.0), phi(1.0)
+        table = QuantileTableInterval.from_cdf(
+            lambda x: (phi(x) - lower) / (upper - lower)
+        ).table
+        super().__init__(table)
+
+
+class JitteredFixedInterval(QuantileTableInterval):
+    """固定间隔加抖动：以范围中点为准，上下浮动一定比例"""
+
+    name = "jitter"
+    label = "固定+抖动"
+
+    def __init__(self, jitter=0.2):
+        """
+        Args:
+            jitter: 抖动宽度占间隔范围的比例（0~1）
+        """
+        self.jitter = jitter
+        start = 0.5 - jitter / 2
+        table = QuantileTableInterval.from_quantile(lambda u: start + u * jitter).table
+        super().__init__(table)
+
+
+class HistogramInterval(IntervalDistribution):
+    """用户自定义直方图分布
+
+    使用Vose别名表采样，任意桶数都只需一次随机数和一次查表，
+    桶内再均匀取值。条件采样用累积权重和索引表（guide table）求逆，期望O(1)。
+    """
+
+    name = "histogram"
+    label = "自定义直方图"
+
+    def __init__(self, weights):
+        weights = [max(0.0, float(w)) for w in weights]
+        total = sum(weights)
+        if not weights or total <= 0:
+            raise ValueError("直方图至少需要一个正权重")
+        self.weights = weights
+        self.prob, self.alias = self._build_alias_table(
+            [w * len(weights) / total for w in weights]
+        )
+        self.cumulative, self.guide = self._build_guide_table(weights, total)
+
+    @staticmethod
+    def _build_alias_table(scaled):
+        """Vose别名方法，O(n)构建"""
+        n = len(scaled)
+        prob = [0.0] * n
+        alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        scaled = list(scaled)
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] = scaled[g] + scaled[s] - 1.0
+            (small if scaled[g] < 1.0 else large).append(g)
+        for i in large + small:
+            prob[i] = 1.0
+        return prob, alias
+
+    @staticmethod
+    def _build_guide_table(weights, total):
+        """累积权重（归一化）和索引表：guide[k] 为累积权重超过 k/n 的第一个桶"""
+        n = len(weights)
+        cumulative = [0.0] * (n + 1)
+        running = 0.0
+        for i, w in enumerate(weights):
+            running += w
+            cumulative[i + 1] = running / total
+        cumulative[n] = 1.0
+        guide = [0] * n
+        bucket = 0
+        for k in range(n):
+            while bucket < n - 1 and cumulative[bucket + 1] <= k / n:
+                bucket += 1
+            guide[k] = bucket
+        return cumulative, guide
+
+    @classmethod
+    def from_file(cls, path):
+        """从JSON数组或每行一个权重的文本文件读取直方图"""
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        try:
+            weights = json.loads(content)
+        except json.JSONDecodeError:
+            weights = [line.split(",")[-1] for line in content.split() if line.strip()]
+        return cls(weights)
+
+    def sample_unit(self, rng):
+        n = len(self.prob)
+        position = rng.random() * n
+        bucket = int(position)
+        if bucket >= n:
+            bucket = n - 1
+        # 复用随机数的小数部分决定取本桶还是别名桶
+        if position - bucket >= self.prob[bucket]:
+            bucket = self.alias[bucket]
+        return (bucket + rng.random()) / n
+
+    def cdf(self, x):
+        n = len(self.weights)
+        position = min(1.0, max(0.0, x)) * n
+        bucket = min(int(position), n - 1)
+        low = self.cumulative[bucket]
+        return low + (self.cumulative[bucket + 1] - low) * (position - bucket)
+
+    def quantile(self, u):
+        n = len(self.weights)
+        cumulative = self.cumulative
+        bucket = self.guide[min(int(u * n), n - 1)]
+        # 从索引表给出的桶向后找，平均不超过两步；权重为0的桶被跳过
+        while bucket < n - 1 and cumulative[bucket + 1] <= u:
+            bucket += 1
+        low, high = cumulative[bucket], cumulative[bucket + 1]
+        frac = (u - low) / (high - low) if high > low else 0.0
+        return (bucket + min(1.0, max(0.0, frac))) / n
+
+
+class MinGapInterval(IntervalDistribution):
+    """包装任意分布，保证两次提醒的间隔不小于给定秒数
+
+    以 间隔 >= min_gap 为条件从基础分布采样，只查基础分布在设置变化时构建好的表，
+    不按间隔范围重建查找表，自适应间隔每小时改变范围时采样也是O(1)。
+
+    最短间隔优先于间隔范围：min_gap 不小于最大间隔时（包括范围退化为一个值时）
+    总是返回 max(min_gap, low)，即使超出最大间隔。
+    """
+
+    def __init__(self, base, min_gap):
+        self.base = base
+        self.min_gap = min_gap
+        # 沿用基础分布的名称，界面按名称选中下拉框
+        self.name = base.name
+        self.label = f"{base.label}(≥{min_gap}秒)"
+
+    def sample_unit(self, rng):
+        return self.base.sample_unit(rng)
+
+    def cdf(self, x):
+        return self.base.cdf(x)
+
+    def quantile(self, u):
+        return self.base.quantile(u)
+
+    def sample(self, low, high, rng=random):
+        if high <= low or self.min_gap >= high:
+            return max(low, self.min_gap)
+        x_min = (self.min_gap - low) / (high - low)
+        if x_min <= 0:
+            return self.base.sample(low, high, rng)
+        return int(round(low + self.base.sample_unit_above(x_min, rng) * (high - low)))
+
+
+# 可在界面中选择的分布
+DISTRIBUTIONS = {
+    cls.name: cls
+    for cls in (UniformInterval, ExponentialInterval, TruncatedNormalInterval, JitteredFixedInterval)
+}
+
+
+def build_distribution(name, min_gap=0, **params):
+    """按名称构建分布
+
+    Args:
+        name: uniform、exponential、normal、jitter 或 histogram
+        min_gap: 大于0时保证提醒间隔不小于该秒数
+        params: 传给分布构造函数的参数，histogram需要weights或path
+    """
+    if name == HistogramInterval.name:
+        if "path" in params:
+            distribution = HistogramInterval.from_file(params["path"])
+        else:
+            distribution = HistogramInterval(params["weights"])
+    elif name in DISTRIBUTIONS:
+        distribution = DISTRIBUTIONS[name](**params)
+    else:
+        raise ValueError(f"未知的间隔分布: {name}")
+
+    return with_min_gap(distribution, min_gap)
+
+
+def with_min_gap(distribution, min_gap):
+    """给分布加上（或去掉，min_gap为0时）最短间隔的保证，不重建基础分布的查找表"""
+    if isinstance(distribution, MinGapInterval):
+        distribution = distribution.base
+    if min_gap > 0:
+        distribution = MinGapInterval(distribution, min_gap)
+    return distribution
+
+
+def min_gap_of(distribution):
+    """分布保证的最短间隔（秒），没有时为0"""
+    return distribution.min_gap if isinstance(distribution, MinGapInterval) else 0
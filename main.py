@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import getpass
 import sys
 import os
+import time
 from pathlib import Path
-from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication, QMessageBox, QSystemTrayIcon
+from app_logging import parse_levels, setup_logging
 from main_window import MainWindow
+from memory_report import MemoryReport
+from session_checkpoint import clear_checkpoint, read_checkpoint
 from sound_manager import resource_path
+from team_server import TeamReporter
+from theme import apply_theme, theme_names
+from tray_icon import TrayController
 
 
 def ensure_static_dir():
@@ -18,20 +28,132 @@ def ensure_static_dir():
     # 在实际应用中，这里应该复制预置的音效文件
 
 
+def offer_resume(window):
+    """上次的专注周期异常中断时，询问是否从中断处继续"""
+    checkpoint = read_checkpoint()
+    if checkpoint is None:
+        return
+    minutes_ago = max(0, int(time.time() - checkpoint.saved_at) // 60)
+    reply = QMessageBox.question(
+        window,
+        "继续专注",
+        f"上次的专注在 {minutes_ago} 分钟前意外中断，"
+        f"已专注 {checkpoint.elapsed_time}/{checkpoint.focus_time} 分钟。\n"
+        "是否从中断处继续？中断期间的时间不计入专注，提醒从现在起重新安排。",
+    )
+    if reply == QMessageBox.StandardButton.Yes:
+        window.resume_session(checkpoint)
+    else:
+        clear_checkpoint()
+
+
+def log_levels(spec):
+    """--log-level 的参数类型，格式错误时由argparse给出用法错误"""
+    try:
+        parse_levels(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return spec
+
+
+def parse_args(argv):
+    """解析命令行参数，未识别的参数留给Qt处理"""
+    parser = argparse.ArgumentParser(description="随机提醒")
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="低内存模式：释放不可见的组件、用完的窗口和闲置的音效缓冲区",
+    )
+    parser.add_argument(
+        "--tray",
+        action="store_true",
+        help="托盘模式：关闭主窗口后在系统托盘继续运行",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="退出时输出常驻内存报告",
+    )
+    parser.add_argument(
+        "--log-level",
+        metavar="LEVELS",
+        type=log_levels,
+        help="日志级别，可按模块设置，例如 info,sound_manager=debug（默认读取环境变量 RANDOM_REMINDER_LOG）",
+    )
+    parser.add_argument(
+        "--theme",
+        choices=theme_names(),
+        help="界面主题（默认读取环境变量 RANDOM_REMINDER_THEME，未设置时跟随系统）",
+    )
+    parser.add_argument(
+        "--exit-after-start",
+        action="store_true",
+        help="主窗口显示后立即退出，用于测量启动耗时",
+    )
+    parser.add_argument(
+        "--team-server",
+        metavar="URL",
+        help="把专注事件批量上报到团队统计服务，例如 http://127.0.0.1:8765",
+    )
+    return parser.parse_known_args(argv)
+
+
 def main():
     """应用程序主入口"""
+    args, qt_args = parse_args(sys.argv[1:])
+    setup_logging(args.log_level)
+
     # 确保必要的目录和文件存在
     ensure_static_dir()
 
+    memory_report = MemoryReport() if args.memory_report else None
+    if memory_report:
+        memory_report.mark("进程启动")
+
     # 创建应用程序
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
+    # 全局样式表只在这里解析一次
+    apply_theme(app, args.theme)
 
     # 创建并显示主窗口
-    window = MainWindow()
-    window.show()
+    if args.tray and QSystemTrayIcon.isSystemTrayAvailable():
+        # 托盘持有计时器，关闭主窗口不会退出应用
+        app.setQuitOnLastWindowClosed(False)
+        tray = TrayController(low_memory=args.low_memory, memory_report=memory_report)
+        tray.show_window()
+        window = tray.window
+        timer_thread = tray.timer_thread
+    else:
+        window = MainWindow(low_memory=args.low_memory, memory_report=memory_report)
+        window.show()
+        timer_thread = window.timer_thread
+
+    if args.exit_after_start:
+        # 处理完首次显示的事件后退出，不弹出恢复提示
+        QTimer.singleShot(0, app.quit)
+    else:
+        # 上次异常退出时从检查点继续
+        offer_resume(window)
+
+    # 团队统计：事件写入本地历史的同时进入上报缓冲区
+    reporter = None
+    if args.team_server and timer_thread.history is not None:
+        reporter = TeamReporter(args.team_server, getpass.getuser())
+        timer_thread.history.add_listener(reporter.add_event)
+
+    if memory_report:
+        memory_report.mark("主窗口显示")
 
     # 进入事件循环
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    if reporter:
+        reporter.close()
+
+    if memory_report:
+        memory_report.mark("退出前")
+        print(memory_report.format())
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
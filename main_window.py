@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QEvent, QTimer
 from PyQt6.QtWidgets import (
+    QApplication,
     QCheckBox,
+    QComboBox,
+    QFileDialog,
     QHBoxLayout,
     QLabel,
     QMainWindow,
@@ -16,9 +19,24 @@ from PyQt6.QtWidgets import (
 )
 
 from timer_thread import TimerThread
-from sound_manager import SoundManager
+from quiet_hours import load_quiet_hours
+from session_checkpoint import Checkpointer
+from session_history import HistoryRecorder, default_history_path
+from timer_engine import DEFAULT_TIMER_SLACK, PHASE_RESTING
+from timer_core import NOTIFY_BREAK_TIME
+from sound_manager import SoundManager, build_notifier
 from progress_display import ProgressDisplay
-from break_window import BreakWindow
+from adaptive_scheduler import AdaptiveIntervalEstimator
+from break_window import BreakOverlay, BreakWindow
+from interval_distribution import (
+    DISTRIBUTIONS,
+    HistogramInterval,
+    build_distribution,
+    min_gap_of,
+    with_min_gap,
+)
+from memory_report import current_rss
+from plugin_host import EVENT_BREAK_END, EVENT_BREAK_START, load_plugins
 
 
 class BreakPromptDialog(QDialog):
@@ -36,7 +54,8 @@ class BreakPromptDialog(QDialog):
 
         # 标题
         title_label = QLabel(f"恭喜您完成了{focus_time}分钟的专注!")
-        title_label.setStyleSheet("font-size: 16pt; font-weight: bold; margin: 10px;")
+        title_label.setObjectName("promptTitle")
+        title_label.setProperty("role", "title")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title_label)
 
@@ -49,7 +68,7 @@ class BreakPromptDialog(QDialog):
         button_layout = QHBoxLayout()
 
         self.rest_btn = QPushButton("去休息")
-        self.rest_btn.setStyleSheet("font-size: 14pt; padding: 8px;")
+        self.rest_btn.setProperty("primary", True)
         self.rest_btn.clicked.connect(self.choose_rest)
 
         self.restart_btn = QPushButton("重新开始")
@@ -73,12 +92,57 @@ class BreakPromptDialog(QDialog):
 class MainWindow(QMainWindow):
     """随机提醒应用主窗口"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        low_memory=False,
+        memory_report=None,
+        timer_thread=None,
+        sound_manager=None,
+        plugins=None,
+    ):
+        """
+        Args:
+            low_memory: 低内存模式，释放不可见的组件和闲置的音效缓冲区
+            memory_report: 可选的MemoryReport，记录释放操作节省的内存
+            timer_thread: 外部持有的计时器线程（托盘模式），为None时自行创建
+            sound_manager: 外部持有的声音管理器，为None时自行创建
+            plugins: 外部持有的插件宿主，自行创建计时器时为None则自行加载
+        """
         super().__init__()
-
-        # 初始化组件
-        self.timer_thread = TimerThread()
-        self.sound_manager = SoundManager()
+        self.low_memory = low_memory
+        self.memory_report = memory_report
+        self.break_window = None
+
+        # 进度显示的最新数值，进度组件被释放后用于重建
+        self.progress_values = {"focus": (0, 90), "reminder": (0, 0), "break": (0, 10)}
+
+        # 初始化组件，外部传入的计时器在窗口关闭后继续运行
+        self.owns_timer = timer_thread is None
+        self.timer_thread = timer_thread or TimerThread()
+        self._closing = False
+        # 托盘持有计时器时，窗口最小化或隐藏后在下一轮事件循环中关闭（即销毁）
+        self._release_timer = QTimer(self)
+        self._release_timer.setSingleShot(True)
+        self._release_timer.setInterval(0)
+        self._release_timer.timeout.connect(self.release_to_tray)
+        if self.owns_timer:
+            self.timer_thread.set_history(HistoryRecorder())
+            self.timer_thread.set_checkpointer(Checkpointer())
+            self.timer_thread.set_quiet_hours(load_quiet_hours())
+        self.sound_manager = sound_manager or SoundManager(
+            release_after=60 if low_memory else 0
+        )
+        self.notifier = None
+        self.history_panel = None
+        if self.owns_timer:
+            # 提醒等事件由计时线程放入通知队列，在工作线程中发送
+            self.notifier = build_notifier(self.sound_manager)
+            self.timer_thread.set_notifier(self.notifier)
+        self.plugins = plugins
+        if self.plugins is None and self.owns_timer:
+            # 只连接有插件订阅的计时事件，插件在事件第一次发生时才导入
+            self.plugins = load_plugins()
+            self.plugins.connect_timer(self.timer_thread)
 
         # 设置UI
         self.setup_ui()
@@ -102,7 +166,8 @@ class MainWindow(QMainWindow):
         # 标题
         title_label = QLabel("随机提醒应用")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("font-size: 18pt; font-weight: bold; margin: 10px;")
+        title_label.setObjectName("appTitle")
+        title_label.setProperty("role", "title")
 
         # 调试模式复选框
         self.debug_checkbox = QCheckBox("调试模式")
@@ -164,6 +229,30 @@ class MainWindow(QMainWindow):
         interval_layout.addWidget(self.max_interval_spinbox)
         settings_layout.addLayout(interval_layout)
 
+        # 提醒间隔分布
+        distribution_layout = QHBoxLayout()
+        distribution_label = QLabel("间隔分布:")
+        self.distribution_combo = QComboBox()
+        for name, cls in DISTRIBUTIONS.items():
+            self.distribution_combo.addItem(cls.label, name)
+        self.distribution_combo.addItem(HistogramInterval.label + "...", HistogramInterval.name)
+        self.distribution_combo.activated.connect(self.update_interval_distribution)
+
+        # 最短间隔：任意分布下两次提醒都不会比它更近（自适应间隔缩小范围时也成立）
+        min_gap_label = QLabel("至少")
+        self.min_gap_spinbox = QSpinBox()
+        self.min_gap_spinbox.setRange(0, 3600)
+        self.min_gap_spinbox.setSuffix(" 秒")
+        self.min_gap_spinbox.setSpecialValueText("不限")
+        self.min_gap_spinbox.setKeyboardTracking(False)
+        self.min_gap_spinbox.valueChanged.connect(self.update_min_gap)
+
+        distribution_layout.addWidget(distribution_label)
+        distribution_layout.addWidget(self.distribution_combo, 1)
+        distribution_layout.addWidget(min_gap_label)
+        distribution_layout.addWidget(self.min_gap_spinbox)
+        settings_layout.addLayout(distribution_layout)
+
         # 短休息时间设置
         rest_layout = QHBoxLayout()
         rest_label = QLabel("短休息时间(秒):")
@@ -177,6 +266,41 @@ class MainWindow(QMainWindow):
         rest_layout.addWidget(self.rest_spinbox)
         settings_layout.addLayout(rest_layout)
 
+        # 离开检测设置
+        self.idle_checkbox = QCheckBox("离开或休眠时自动暂停")
+        self.idle_checkbox.setChecked(True)
+        self.idle_checkbox.stateChanged.connect(self.update_idle_detection)
+        settings_layout.addWidget(self.idle_checkbox)
+
+        # 自适应间隔：根据各时段的使用情况自动调整提醒间隔
+        self.adaptive_checkbox = QCheckBox("按时段自适应调整提醒间隔")
+        self.adaptive_checkbox.setChecked(False)
+        self.adaptive_checkbox.stateChanged.connect(self.update_adaptive_interval)
+        settings_layout.addWidget(self.adaptive_checkbox)
+
+        # 长休息时在所有屏幕上显示全屏遮罩
+        self.fullscreen_break_checkbox = QCheckBox("长休息时全屏覆盖所有屏幕")
+        self.fullscreen_break_checkbox.setChecked(False)
+        settings_layout.addWidget(self.fullscreen_break_checkbox)
+
+        # 省电模式设置：窗口不可见时允许将提醒推迟若干秒以合并唤醒
+        slack_layout = QHBoxLayout()
+        slack_label = QLabel("省电合并窗口(秒):")
+        self.slack_spinbox = QSpinBox()
+        self.slack_spinbox.setRange(0, 120)  # 0表示关闭
+        self.slack_spinbox.setValue(DEFAULT_TIMER_SLACK)
+        self.slack_spinbox.setKeyboardTracking(False)  # 禁用键盘输入实时追踪
+        self.slack_spinbox.setToolTip("窗口最小化或隐藏时，提醒最多推迟的秒数，0为关闭")
+        self.slack_spinbox.valueChanged.connect(self.update_timer_slack)
+
+        # 窗口重新显示时更新本次运行节省的唤醒次数
+        self.wakeup_label = QLabel()
+
+        slack_layout.addWidget(slack_label)
+        slack_layout.addWidget(self.slack_spinbox)
+        slack_layout.addWidget(self.wakeup_label)
+        settings_layout.addLayout(slack_layout)
+
         main_layout.addLayout(settings_layout)
 
         # 专注时间设置
@@ -195,6 +319,8 @@ class MainWindow(QMainWindow):
         # 进度显示区域
         self.progress_display = ProgressDisplay()
         main_layout.addWidget(self.progress_display)
+        self.main_layout = main_layout
+        self.progress_index = main_layout.indexOf(self.progress_display)
 
         # 状态标签
         self.status_label = QLabel("准备就绪")
@@ -211,43 +337,39 @@ class MainWindow(QMainWindow):
         self.stop_btn = QPushButton("停止")
         self.stop_btn.clicked.connect(self.stop_timer)
         self.stop_btn.setEnabled(False)
+        self.history_btn = QPushButton("历史")
+        self.history_btn.setCheckable(True)
+        self.history_btn.toggled.connect(self.toggle_history_chart)
 
         control_layout.addWidget(self.start_btn)
         control_layout.addWidget(self.pause_btn)
         control_layout.addWidget(self.stop_btn)
+        control_layout.addWidget(self.history_btn)
         main_layout.addLayout(control_layout)
 
         self.setCentralWidget(central_widget)
 
-        # 初始化显示
-        self.update_focus_time()
-        self.update_rest_time()
-
-        # 将配置控件保存到列表中，方便统一管理
-        self.config_widgets = [
-            self.focus_spinbox,
-            self.min_interval_spinbox,
-            self.max_interval_spinbox,
-            self.rest_spinbox,
-            self.debug_checkbox,
-            self.short_sound_radio,
-            self.long_sound_radio,
-            test_sound_btn
-        ]
+        # 初始化显示；外部持有的计时器可能正在运行，由sync_with_timer反向同步
+        if self.owns_timer:
+            self.update_focus_time()
+            self.update_rest_time()
 
     def setup_connections(self):
         """设置信号连接"""
-        self.timer_thread.signal_play_sound.connect(self.play_reminder_sound)
-        self.timer_thread.signal_play_short_break_end_sound.connect(self.play_short_break_end_sound)
-        self.timer_thread.signal_update_progress.connect(self.update_progress)
-        self.timer_thread.signal_break_time.connect(self.show_break_time)
-        self.timer_thread.signal_update_reminder_progress.connect(
-            self.update_reminder_progress
-        )
-        self.timer_thread.signal_update_break_progress.connect(
-            self.update_break_progress
-        )
-        self.timer_thread.signal_state_reset.connect(self.handle_state_reset)
+        # 记录计时器信号的连接，窗口先于计时器销毁时需要断开
+        self.timer_connections = [
+            (self.timer_thread.signal_play_sound, self.play_reminder_sound),
+            (self.timer_thread.signal_play_short_break_end_sound, self.play_short_break_end_sound),
+            (self.timer_thread.signal_update_progress, self.update_progress),
+            (self.timer_thread.signal_break_time, self.show_break_time),
+            (self.timer_thread.signal_update_reminder_progress, self.update_reminder_progress),
+            (self.timer_thread.signal_update_break_progress, self.update_break_progress),
+            (self.timer_thread.signal_state_reset, self.handle_state_reset),
+            (self.timer_thread.signal_presence_changed, self.handle_presence_changed),
+            (self.timer_thread.signal_silenced, self.handle_silenced),
+        ]
+        for signal, slot in self.timer_connections:
+            signal.connect(slot)
 
         # 使用editingFinished而不是valueChanged，这样在输入完成后才会检查和更新
         self.min_interval_spinbox.editingFinished.connect(self.update_reminder_interval)
@@ -262,6 +384,7 @@ class MainWindow(QMainWindow):
             self.min_interval_spinbox.setValue(5)  # 5秒
             self.max_interval_spinbox.setValue(8)  # 8秒
             self.rest_spinbox.setValue(3)  # 3秒休息时间
+            self.update_reminder_interval()
         else:
             self.is_debug_mode = False
             # 恢复默认值
@@ -269,6 +392,7 @@ class MainWindow(QMainWindow):
             self.min_interval_spinbox.setValue(180)  # 3分钟
             self.max_interval_spinbox.setValue(300)  # 5分钟
             self.rest_spinbox.setValue(10)  # 10秒休息时间
+            self.update_reminder_interval()
 
     def use_short_sound(self):
         """使用短音效"""
@@ -290,9 +414,9 @@ class MainWindow(QMainWindow):
         """更新专注时间设置"""
         focus_time = self.focus_spinbox.value()
         self.timer_thread.set_focus_time(focus_time)
-        self.progress_display.focus_progress["progress_bar"].setMaximum(focus_time)
-        # 更新初始显示的剩余时间
-        self.progress_display.update_focus_progress(0, focus_time)
+        # 专注期间修改时保留已专注的时间，只更新总时长
+        elapsed = self.timer_thread.snapshot().elapsed_minutes if self.timer_thread.running else 0
+        self.show_progress("focus", elapsed, focus_time)
 
     def update_reminder_interval(self):
         """更新提醒间隔设置"""
@@ -306,20 +430,106 @@ class MainWindow(QMainWindow):
 
         self.timer_thread.set_reminder_interval(min_interval, max_interval)
 
+    def update_interval_distribution(self):
+        """更新提醒间隔分布，查找表只在这里构建一次"""
+        name = self.distribution_combo.currentData()
+        params = {}
+        if name == HistogramInterval.name:
+            path, _ = QFileDialog.getOpenFileName(
+                self, "选择直方图文件", "", "直方图 (*.json *.txt *.csv)"
+            )
+            if not path:
+                # 取消选择时恢复为当前使用的分布
+                self._select_distribution(self.timer_thread.interval_distribution)
+                return
+            params["path"] = path
+
+        try:
+            distribution = build_distribution(name, self.min_gap_spinbox.value(), **params)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "错误", f"无法加载间隔分布: {e}")
+            self._select_distribution(self.timer_thread.interval_distribution)
+            return
+        self.timer_thread.set_interval_distribution(distribution)
+
+    def update_min_gap(self):
+        """更新最短提醒间隔，沿用当前分布已构建的查找表"""
+        distribution = with_min_gap(self.timer_thread.interval_distribution, self.min_gap_spinbox.value())
+        self.timer_thread.set_interval_distribution(distribution)
+
+    def _select_distribution(self, distribution):
+        """在下拉框中选中指定分布"""
+        index = self.distribution_combo.findData(distribution.name)
+        if index >= 0:
+            self.distribution_combo.setCurrentIndex(index)
+
     def update_rest_time(self):
         """更新休息时间设置"""
         rest_time = self.rest_spinbox.value()
         self.timer_thread.set_rest_time(rest_time)
-        self.progress_display.break_progress["progress_bar"].setMaximum(rest_time)
-        # 更新初始显示的剩余时间
-        self.progress_display.update_break_progress(0, rest_time)
+        # 休息期间修改时由计时器按已休息的时间更新进度
+        if self.timer_thread.snapshot().phase != PHASE_RESTING:
+            self.show_progress("break", 0, rest_time)
+
+    def update_idle_detection(self):
+        """更新离开检测设置"""
+        self.timer_thread.set_idle_detection(self.idle_checkbox.isChecked())
+
+    def update_adaptive_interval(self):
+        """开启或关闭自适应间隔"""
+        if not self.adaptive_checkbox.isChecked():
+            self.timer_thread.set_interval_adapter(None)
+            return
+        if self.timer_thread.interval_adapter is None:
+            adapter = AdaptiveIntervalEstimator()
+            adapter.load()
+            self.timer_thread.set_interval_adapter(adapter)
+
+    def update_timer_slack(self):
+        """更新省电模式的松弛窗口"""
+        self.timer_thread.set_timer_slack(self.slack_spinbox.value())
+
+    def update_wakeup_label(self):
+        """显示省电模式本次运行每小时减少的唤醒次数"""
+        if self.slack_spinbox.value() <= 0 or not self.timer_thread.isRunning():
+            self.wakeup_label.clear()
+            return
+        stats = self.timer_thread.get_wakeup_stats()
+        self.wakeup_label.setText(f"每小时减少约 {stats['saved_per_hour']} 次唤醒")
+
+    def update_display_active(self):
+        """通知计时器线程窗口当前是否有人观看"""
+        self.timer_thread.set_display_active(self.isVisible() and not self.isMinimized())
+
+    def handle_presence_changed(self, away):
+        """处理用户离开/返回"""
+        if away:
+            self.status_label.setText("检测到离开，已自动暂停")
+        else:
+            self.status_label.setText("欢迎回来，已重新安排提醒")
+
+    def handle_silenced(self, event):
+        """免打扰时段中静默结束短休息或完成专注周期，只更新界面状态"""
+        if event == NOTIFY_BREAK_TIME:
+            self.status_label.setText("专注周期已在免打扰时段完成")
+            self.start_btn.setEnabled(True)
+            self.pause_btn.setEnabled(False)
+            self.stop_btn.setEnabled(False)
+        else:
+            self.status_label.setText("免打扰时段，继续专注")
 
     def handle_state_reset(self):
         """处理计时器状态重置信号"""
         # 重置所有进度条显示
         focus_time = self.focus_spinbox.value()
         rest_time = self.rest_spinbox.value()
-        self.progress_display.clear_all_progress(focus_time, rest_time, 0)
+        self.progress_values = {
+            "focus": (0, focus_time),
+            "reminder": (0, 0),
+            "break": (0, rest_time),
+        }
+        if self.progress_display is not None:
+            self.progress_display.clear_all_progress(focus_time, rest_time, 0)
 
         # 在状态重置时更新按钮状态
         if not self.timer_thread.running:
@@ -327,18 +537,23 @@ class MainWindow(QMainWindow):
             self.pause_btn.setEnabled(False)
             self.stop_btn.setEnabled(False)
             self.status_label.setText("已停止")
-
-            # 启用所有配置控件
-            self.set_config_widgets_enabled(True)
+            if self.slack_spinbox.value() > 0:
+                stats = self.timer_thread.get_wakeup_stats()
+                self.status_label.setText(
+                    f"已停止，省电模式每小时减少约 {stats['saved_per_hour']} 次唤醒"
+                )
 
     def start_timer(self):
         """开始计时器"""
         self.update_focus_time()
         self.update_reminder_interval()
         self.update_rest_time()
+        self.update_idle_detection()
+        self.update_adaptive_interval()
+        self.update_timer_slack()
+        self.update_display_active()
 
-        # 禁用所有配置控件
-        self.set_config_widgets_enabled(False)
+        # 设置在专注期间保持可编辑，修改会直接应用到正在运行的计时器
 
         if not self.timer_thread.isRunning():
             self.timer_thread.start()
@@ -351,6 +566,17 @@ class MainWindow(QMainWindow):
         self.pause_btn.setEnabled(True)
         self.stop_btn.setEnabled(True)
 
+    def resume_session(self, checkpoint):
+        """从检查点继续上次中断的专注周期"""
+        self.focus_spinbox.setValue(checkpoint.focus_time)
+        self.min_interval_spinbox.setValue(checkpoint.min_interval)
+        self.max_interval_spinbox.setValue(checkpoint.max_interval)
+        self.rest_spinbox.setValue(checkpoint.rest_total)
+        if not self.timer_thread.isRunning():
+            self.timer_thread.restore(checkpoint)
+        self.start_timer()
+        self.status_label.setText(f"已恢复上次的专注（已专注 {checkpoint.elapsed_time} 分钟）")
+
     def pause_timer(self):
         """暂停计时器"""
         if self.timer_thread.isRunning():
@@ -376,49 +602,120 @@ class MainWindow(QMainWindow):
             # 如果线程已经不在运行，手动更新UI
             self.status_label.setText("已停止")
             self.start_btn.setEnabled(True)
-            # 启用所有配置控件
-            self.set_config_widgets_enabled(True)
 
     def play_reminder_sound(self):
-        """播放提醒声音并显示休息提示"""
-        success = self.sound_manager.play_current_sound(self)
-        if success:
-            rest_time = self.rest_spinbox.value()
-            self.status_label.setText(f"请休息{rest_time}秒钟!")
+        """显示休息提示（提示音由通知渠道播放）"""
+        rest_time = self.rest_spinbox.value()
+        self.status_label.setText(f"请休息{rest_time}秒钟!")
 
     def play_short_break_end_sound(self):
-        """播放短休息结束提示音"""
-        success = self.sound_manager.play_short_sound(self)
-        if success:
-            self.status_label.setText("休息结束，继续专注!")
+        """显示短休息结束提示（提示音由通知渠道播放）"""
+        self.status_label.setText("休息结束，继续专注!")
 
     def update_progress(self, elapsed_minutes):
         """更新专注时间进度"""
         total_minutes = self.focus_spinbox.value()
-        self.progress_display.update_focus_progress(elapsed_minutes, total_minutes)
+        self.show_progress("focus", elapsed_minutes, total_minutes)
 
     def update_reminder_progress(self, current_seconds, total_seconds):
         """更新提醒间隔进度"""
-        self.progress_display.update_reminder_progress(current_seconds, total_seconds)
+        self.show_progress("reminder", current_seconds, total_seconds)
 
     def update_break_progress(self, current_seconds, total_seconds):
         """更新休息时间进度"""
-        self.progress_display.update_break_progress(current_seconds, total_seconds)
+        self.show_progress("break", current_seconds, total_seconds)
+
+    def show_progress(self, kind, current, total):
+        """记录并显示进度，进度组件已释放时只记录数值"""
+        self.progress_values[kind] = (current, total)
+        if self.progress_display is None:
+            return
+        if kind == "focus":
+            self.progress_display.update_focus_progress(current, total)
+        elif kind == "reminder":
+            self.progress_display.update_reminder_progress(current, total)
+        else:
+            self.progress_display.update_break_progress(current, total)
+
+    def release_progress_display(self):
+        """低内存模式下释放不可见的进度组件"""
+        if self.progress_display is None:
+            return
+        before = self._measure_rss()
+        self.main_layout.removeWidget(self.progress_display)
+        self.progress_display.deleteLater()
+        self.progress_display = None
+        self._record_release("释放进度组件", before)
+
+    def restore_progress_display(self):
+        """窗口重新显示时重建进度组件并恢复数值"""
+        if self.progress_display is not None:
+            return
+        self.progress_display = ProgressDisplay()
+        self.main_layout.insertWidget(self.progress_index, self.progress_display)
+
+        focus_current, focus_total = self.progress_values["focus"]
+        reminder_current, reminder_total = self.progress_values["reminder"]
+        break_current, break_total = self.progress_values["break"]
+        self.progress_display.clear_all_progress(focus_total, break_total, 0)
+        self.progress_display.update_focus_progress(focus_current, focus_total)
+        if reminder_total > 0:
+            self.progress_display.update_reminder_progress(reminder_current, reminder_total)
+        self.progress_display.update_break_progress(break_current, break_total)
+
+    def toggle_history_chart(self, checked):
+        """显示或隐藏历史图表，第一次显示时才创建"""
+        if checked:
+            if self.history_panel is None:
+                # 图表模块只在用到时导入
+                from history_chart import RANGES, HistoryChartPanel
+
+                history = self.timer_thread.history
+                path = history.path if history is not None else default_history_path()
+                self.history_panel = HistoryChartPanel(path)
+                self.history_panel.reload()
+                self.history_panel.chart.show_recent(RANGES["week"])
+                self.main_layout.insertWidget(
+                    self.main_layout.indexOf(self.status_label), self.history_panel
+                )
+            self.history_panel.show()
+        elif self.history_panel is not None:
+            if self.low_memory:
+                # 低内存模式下释放图表和分桶数据
+                before = self._measure_rss()
+                self.main_layout.removeWidget(self.history_panel)
+                self.history_panel.deleteLater()
+                self.history_panel = None
+                self._record_release("释放历史图表", before)
+            else:
+                self.history_panel.hide()
+
+    def _measure_rss(self):
+        """释放前测量内存，未启用内存报告时返回None"""
+        if self.memory_report is None:
+            return None
+        return current_rss()
+
+    def _record_release(self, label, before):
+        """在延迟删除完成后记录释放操作"""
+        if self.memory_report is None:
+            return
+        QTimer.singleShot(0, lambda: self.memory_report.record_release(label, before))
 
     def show_break_time(self):
         """显示长休息时间提示"""
         focus_time = self.focus_spinbox.value()
         self.status_label.setText("专注周期完成!")
 
-        # 播放长提示音
-        self.sound_manager.play_long_sound(self)
-
         # 显示选择对话框
         dialog = BreakPromptDialog(self, focus_time)
         dialog.exec()
+        result_action = dialog.result_action
+        # 对话框用完即释放
+        dialog.deleteLater()
 
         # 根据用户选择执行操作
-        if dialog.result_action == "rest":
+        if result_action == "rest":
             self.show_break_window()
         else:
             # 重新开始
@@ -431,10 +728,30 @@ class MainWindow(QMainWindow):
             self.timer_thread.stop()
 
         # 创建并显示休息窗口，传递调试模式状态
-        self.break_window = BreakWindow(self, debug_mode=self.is_debug_mode)
+        if self.fullscreen_break_checkbox.isChecked():
+            # 全屏遮罩始终可见，关闭时自行释放
+            self.break_window = BreakOverlay(self, debug_mode=self.is_debug_mode)
+        else:
+            self.break_window = BreakWindow(
+                self,
+                debug_mode=self.is_debug_mode,
+                timer_slack=self.slack_spinbox.value(),
+            )
+            self.break_window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         self.break_window.break_finished.connect(self.on_break_finished)
         self.break_window.restart_requested.connect(self.restart_timer)
+        self.break_window.destroyed.connect(self.on_break_window_destroyed)
+        self._break_window_rss = self._measure_rss()
         self.break_window.show()
+        if self.plugins is not None:
+            self.plugins.emit(EVENT_BREAK_START, self.break_window)
+
+    def on_break_window_destroyed(self):
+        """休息窗口关闭后释放引用"""
+        self.break_window = None
+        if self.plugins is not None:
+            self.plugins.emit(EVENT_BREAK_END)
+        self._record_release("释放休息窗口", self._break_window_rss)
 
     def on_break_finished(self):
         """休息结束处理"""
@@ -442,9 +759,6 @@ class MainWindow(QMainWindow):
         self.sound_manager.play_long_sound(self)
         self.status_label.setText("休息结束，可以开始新的专注")
 
-        # 启用所有配置控件
-        self.set_config_widgets_enabled(True)
-
         # 启用开始按钮
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
@@ -456,18 +770,102 @@ class MainWindow(QMainWindow):
         if self.timer_thread.isRunning():
             self.timer_thread.stop()
 
-        # 启用所有设置，然后立即开始
-        self.set_config_widgets_enabled(True)
+        # 立即开始
         self.start_timer()
 
+    def showEvent(self, event):
+        """窗口显示时恢复逐秒刷新"""
+        super().showEvent(event)
+        self.update_visibility()
+
+    def hideEvent(self, event):
+        """窗口隐藏时允许合并唤醒"""
+        super().hideEvent(event)
+        self.update_visibility()
+
+    def changeEvent(self, event):
+        """窗口最小化或还原时更新可见状态"""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_visibility()
+
+    def update_visibility(self):
+        """根据窗口可见性调整刷新频率，低内存模式下释放或重建进度组件"""
+        self.update_display_active()
+        if self.isVisible() and not self.isMinimized():
+            self.update_wakeup_label()
+        elif not self.owns_timer and not self._closing:
+            self._release_timer.start()
+            return
+        if not self.low_memory:
+            return
+        if self.isVisible() and not self.isMinimized():
+            self.restore_progress_display()
+        else:
+            self.release_progress_display()
+
+    def release_to_tray(self):
+        """托盘模式下窗口最小化或隐藏后销毁，释放整个窗口，需要时由托盘重建
+
+        休息窗口或模态对话框打开时保留窗口，关闭它们后再次最小化时释放。
+        """
+        if self._closing or (self.isVisible() and not self.isMinimized()):
+            return
+        if self.break_window is not None or QApplication.activeModalWidget() is not None:
+            return
+        self.close()
+
+    def sync_with_timer(self):
+        """按计时器的当前状态恢复界面（托盘模式下重建窗口时使用）"""
+        thread = self.timer_thread
+        config = thread.config
+
+        # 同步设置，设置值会触发更新，之后再恢复进度
+        self.focus_spinbox.setValue(config.focus_time)
+        self.min_interval_spinbox.setValue(config.min_interval)
+        self.max_interval_spinbox.setValue(config.max_interval)
+        self.rest_spinbox.setValue(config.rest_total)
+        self.idle_checkbox.setChecked(config.idle_detection)
+        self.adaptive_checkbox.setChecked(config.adapter is not None)
+        self._select_distribution(config.distribution)
+        self.min_gap_spinbox.setValue(min_gap_of(config.distribution))
+        self.slack_spinbox.setValue(config.timer_slack)
+        if self.sound_manager.current_sound == self.sound_manager.long_sound_file:
+            self.use_long_sound()
+
+        if not thread.isRunning():
+            return
+
+        snapshot = thread.snapshot()
+        self.show_progress("focus", snapshot.elapsed_minutes, snapshot.focus_time)
+        if snapshot.reminder_interval > 0:
+            self.show_progress("reminder", snapshot.reminder_passed, snapshot.reminder_interval)
+        self.show_progress("break", snapshot.rest_seconds, snapshot.rest_total)
+
+        self.stop_btn.setEnabled(True)
+        if thread.paused:
+            self.start_btn.setEnabled(True)
+            self.pause_btn.setEnabled(False)
+            self.status_label.setText("已暂停")
+        else:
+            self.start_btn.setEnabled(False)
+            self.pause_btn.setEnabled(True)
+            self.status_label.setText("专注中...")
+
     def closeEvent(self, event):
         """窗口关闭事件处理"""
-        if self.timer_thread.isRunning():
-            self.timer_thread.stop()
-            self.timer_thread.wait()
+        self._closing = True
+        if self.break_window is not None:
+            # 全屏遮罩是独立的顶层窗口，随主窗口一起关闭
+            self.break_window.close()
+        if self.owns_timer:
+            if self.timer_thread.isRunning():
+                self.timer_thread.stop()
+                self.timer_thread.wait()
+            self.notifier.close()
+            self.timer_thread.close_quiet_hours()
+        else:
+            # 计时器由外部持有并继续运行，只断开与本窗口的连接
+            for signal, slot in self.timer_connections:
+                signal.disconnect(slot)
         event.accept()
-
-    def set_config_widgets_enabled(self, enabled):
-        """设置所有配置控件的启用状态"""
-        for widget in self.config_widgets:
-            widget.setEnabled(enabled)
\ No newline at end of file
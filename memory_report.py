@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import time
+
+
+def current_rss():
+    """获取当前进程的常驻内存（字节），无法获取时返回None"""
+    # Linux: /proc/self/statm 第二列为常驻页数
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # 其它平台优先使用psutil（可选依赖）
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    # 最后退回到峰值内存
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def trim_heap():
+    """回收Python垃圾并尽量把空闲堆内存归还给操作系统"""
+    gc.collect()
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name or not sys.platform.startswith("linux"):
+        return
+    try:
+        libc = ctypes.CDLL(libc_name)
+        # glibc的malloc_trim会释放堆顶和空闲页
+        libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def format_bytes(size):
+    """将字节数格式化为MB字符串"""
+    if size is None:
+        return "未知"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class MemoryReport:
+    """常驻内存报告，记录关键时间点的内存并统计释放操作节省的内存"""
+
+    def __init__(self):
+        self.marks = []  # (标签, 时间, RSS)
+        self.releases = []  # (标签, 释放前RSS, 释放后RSS)
+
+    def mark(self, label):
+        """记录一个时间点的内存"""
+        rss = current_rss()
+        self.marks.append((label, time.monotonic(), rss))
+        return rss
+
+    def record_release(self, label, before):
+        """记录一次释放操作，before为释放前测得的RSS"""
+        trim_heap()
+        after = current_rss()
+        self.releases.append((label, before, after))
+        return after
+
+    def total_saved(self):
+        """所有释放操作合计节省的内存（字节）"""
+        total = 0
+        for _, before, after in self.releases:
+            if before is not None and after is not None and before > after:
+                total += before - after
+        return total
+
+    def format(self):
+        """生成文本报告"""
+        lines = ["内存报告:"]
+        if self.marks:
+            start = self.marks[0][1]
+            previous = None
+            for label, timestamp, rss in self.marks:
+                delta = ""
+                if previous is not None and rss is not None:
+                    delta = f" ({(rss - previous) / (1024 * 1024):+.1f} MB)"
+                lines.append(
+                    f"  [{timestamp - start:8.1f}s] {label}: {format_bytes(rss)}{delta}"
+                )
+                previous = rss
+        if self.releases:
+            lines.append("释放操作:")
+            for label, before, after in self.releases:
+                lines.append(f"  {label}: {format_bytes(before)} -> {format_bytes(after)}")
+            lines.append(f"合计节省: {format_bytes(self.total_saved())}")
+        return "\n".join(lines)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""通知渠道与异步分发
+
+计时事件（提醒、短休息结束、专注完成）转换为 Notification 后交给
+NotificationDispatcher，dispatch() 只把通知放入各渠道的有界队列就返回，
+真正的发送在工作线程池中进行:
+
+- 每个渠道同一时间最多占用一个工作线程，慢的渠道不会拖慢其它渠道
+- 每个渠道有自己的超时，超时和失败只记入统计
+- 队列满时丢弃最旧的通知，积压不会无限增长
+
+内置渠道：桌面通知、Webhook（POST JSON）、自定义脚本。
+声音只能在GUI线程播放，见 sound_manager.SoundChannel。
+
+渠道在用户数据目录下的 notifications.json 中配置，例如:
+
+    {
+        "sound": true,
+        "desktop": true,
+        "webhook": {"url": "http://127.0.0.1:9000/hook", "timeout": 2},
+        "script": {"command": "/path/to/script.sh", "timeout": 5}
+    }
+"""
+
+import json
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from app_paths import user_data_path
+from timer_core import NOTIFY_BREAK_TIME, NOTIFY_REMINDER, NOTIFY_REST_END
+
+logger = logging.getLogger(__name__)
+
+Notification = namedtuple("Notification", ["event", "title", "message", "created_at"])
+
+DEFAULT_CONFIG = {"sound": True, "desktop": False}
+
+
+def timer_notification(name, rest_total, focus_time):
+    """把计时事件转换为通知，不需要通知的事件返回None"""
+    if name == NOTIFY_REMINDER:
+        message = f"请休息{rest_total}秒钟!"
+    elif name == NOTIFY_REST_END:
+        message = "休息结束，继续专注!"
+    elif name == NOTIFY_BREAK_TIME:
+        message = f"已专注{focus_time}分钟，请长时间休息"
+    else:
+        return None
+    return Notification(name, "随机提醒", message, time.time())
+
+
+class Channel:
+    """通知渠道
+
+    send() 在工作线程中调用，应在timeout秒内返回，失败时抛出异常。
+    """
+
+    name = "channel"
+    timeout = 5  # 单次发送的超时（秒）
+    queue_size = 8  # 等待发送的通知上限
+
+    def send(self, notification):
+        raise NotImplementedError
+
+
+class DesktopChannel(Channel):
+    """系统桌面通知（Linux用notify-send，macOS用osascript）"""
+
+    name = "desktop"
+    timeout = 3
+
+    def __init__(self, timeout=None):
+        if timeout is not None:
+            self.timeout = timeout
+        if sys.platform == "darwin":
+            self.program = shutil.which("osascript")
+        elif sys.platform.startswith("linux"):
+            self.program = shutil.which("notify-send")
+        else:
+            self.program = None
+
+    @property
+    def available(self):
+        return self.program is not None
+
+    def send(self, notification):
+        if sys.platform == "darwin":
+            script = (
+                f"display notification {json.dumps(notification.message)} "
+                f"with title {json.dumps(notification.title)}"
+            )
+            args = [self.program, "-e", script]
+        else:
+            args = [self.program, "-a", notification.title, notification.title, notification.message]
+        subprocess.run(
+            args,
+            timeout=self.timeout,
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+
+class WebhookChannel(Channel):
+    """把通知以JSON POST到本地服务"""
+
+    name = "webhook"
+    timeout = 2
+
+    def __init__(self, url, timeout=None, headers=None):
+        self.url = url
+        if timeout is not None:
+            self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, notification):
+        body = json.dumps(notification._asdict(), ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class ScriptChannel(Channel):
+    """运行自定义脚本，通知内容通过环境变量传入
+
+    RR_EVENT、RR_TITLE、RR_MESSAGE、RR_CREATED_AT，超时后脚本被终止。
+    """
+
+    name = "script"
+    timeout = 5
+
+    def __init__(self, command, timeout=None):
+        self.args = shlex.split(command) if isinstance(command, str) else list(command)
+        if timeout is not None:
+            self.timeout = timeout
+
+    def send(self, notification):
+        env = dict(
+            os.environ,
+            RR_EVENT=notification.event,
+            RR_TITLE=notification.title,
+            RR_MESSAGE=notification.message,
+            RR_CREATED_AT=str(notification.created_at),
+        )
+        subprocess.run(
+            self.args,
+            env=env,
+            timeout=self.timeout,
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+def _is_timeout(error):
+    """发送是否因超时失败（urllib把连接超时包装在URLError中）"""
+    if isinstance(error, (subprocess.TimeoutExpired, TimeoutError)):
+        return True
+    return isinstance(getattr(error, "reason", None), TimeoutError)
+
+
+class _ChannelQueue:
+    """单个渠道的有界队列和统计"""
+
+    __slots__ = ("channel", "pending", "busy", "sent", "failed", "timeouts", "dropped",
+                 "max_ms", "last_error")
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.pending = deque()
+        self.busy = False  # 是否已有工作线程在发送
+        self.sent = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.max_ms = 0.0
+        self.last_error = ""
+
+
+class NotificationDispatcher:
+    """把通知异步分发到各渠道
+
+    dispatch() 可以在任意线程调用，不做任何I/O。
+    """
+
+    def __init__(self, channels, workers=None):
+        """
+        Args:
+            channels: 渠道列表
+            workers: 工作线程数，默认每个渠道一个（最多8个）
+        """
+        self._queues = [_ChannelQueue(channel) for channel in channels]
+        self._lock = threading.Lock()
+        # 有渠道发送完毕时通知 close()
+        self._idle = threading.Condition(self._lock)
+        self._executor = None
+        if self._queues:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers or min(8, len(self._queues)),
+                thread_name_prefix="notify",
+            )
+
+    @property
+    def channels(self):
+        return [queue.channel for queue in self._queues]
+
+    def dispatch(self, notification):
+        """放入各渠道的队列，空闲的渠道立即安排发送（关闭后忽略）"""
+        start = []
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                return
+            for queue in self._queues:
+                if len(queue.pending) >= queue.channel.queue_size:
+                    # 队列已满，丢弃最旧的通知
+                    queue.pending.popleft()
+                    queue.dropped += 1
+                queue.pending.append(notification)
+                if not queue.busy:
+                    queue.busy = True
+                    start.append(queue)
+        for queue in start:
+            try:
+                executor.submit(self._drain, queue)
+            except RuntimeError:
+                # 提交前恰好被关闭
+                with self._lock:
+                    queue.busy = False
+                    self._idle.notify_all()
+
+    def _drain(self, queue):
+        """在工作线程中依次发送一个渠道积压的通知"""
+        channel = queue.channel
+        while True:
+            with self._lock:
+                if not queue.pending:
+                    queue.busy = False
+                    self._idle.notify_all()
+                    return
+                notification = queue.pending.popleft()
+            start = time.perf_counter()
+            try:
+                channel.send(notification)
+            except Exception as e:
+                if _is_timeout(e):
+                    queue.timeouts += 1
+                    queue.last_error = f"超时: {e}"
+                    logger.warning("通知渠道 %s 超时（%s秒）", channel.name, channel.timeout)
+                else:
+                    queue.failed += 1
+                    queue.last_error = str(e)
+                    logger.warning("通知渠道 %s 发送失败: %s", channel.name, e)
+            else:
+                queue.sent += 1
+            queue.max_ms = max(queue.max_ms, (time.perf_counter() - start) * 1000)
+
+    def stats(self):
+        """各渠道的发送统计"""
+        with self._lock:
+            return {
+                queue.channel.name: {
+                    "sent": queue.sent,
+                    "failed": queue.failed,
+                    "timeouts": queue.timeouts,
+                    "dropped": queue.dropped,
+                    "pending": len(queue.pending),
+                    "max_ms": queue.max_ms,
+                    "last_error": queue.last_error,
+                }
+                for queue in self._queues
+            }
+
+    def close(self, wait=False):
+        """停止分发
+
+        wait为True时发送完所有积压的通知；否则丢弃积压的通知，
+        只等待正在发送的通知，最多等待各渠道超时中的最大值，超时后不再等待卡住的渠道。
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if not wait:
+            timeout = max(queue.channel.timeout for queue in self._queues)
+            with self._lock:
+                for queue in self._queues:
+                    queue.dropped += len(queue.pending)
+                    queue.pending.clear()
+                if not self._idle.wait_for(
+                    lambda: not any(queue.busy for queue in self._queues), timeout
+                ):
+                    logger.warning("关闭时仍有通知渠道未在 %s 秒内发送完毕", timeout)
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def load_config(path=None):
+    """读取通知配置，文件不存在或格式错误时使用默认配置"""
+    path = path or user_data_path("notifications.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return dict(DEFAULT_CONFIG)
+    except (OSError, ValueError) as e:
+        logger.warning("读取通知配置失败，使用默认配置: %s", e)
+        return dict(DEFAULT_CONFIG)
+    if not isinstance(config, dict):
+        logger.warning("通知配置格式错误，使用默认配置")
+        return dict(DEFAULT_CONFIG)
+    return {**DEFAULT_CONFIG, **config}
+
+
+def build_channels(config):
+    """按配置创建非GUI渠道（声音渠道由界面层创建）"""
+    channels = []
+    if config.get("desktop"):
+        desktop = DesktopChannel(**_options(config["desktop"]))
+        if desktop.available:
+            channels.append(desktop)
+        else:
+            logger.warning("当前系统没有可用的桌面通知命令，已跳过桌面通知")
+    webhook = config.get("webhook")
+    if webhook:
+        options = _options(webhook)
+        if "url" not in options:
+            logger.warning("Webhook通知缺少url，已跳过")
+        else:
+            channels.append(WebhookChannel(**options))
+    script = config.get("script")
+    if script:
+        options = _options(script)
+        if "command" not in options:
+            logger.warning("脚本通知缺少command，已跳过")
+        else:
+            channels.append(ScriptChannel(**options))
+    return channels
+
+
+def _options(value):
+    """渠道配置可以是true或参数字典"""
+    return dict(value) if isinstance(value, dict) else {}
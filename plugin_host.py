@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""插件
+
+插件是普通的Python包，通过入口点（entry points）声明要处理的事件，每个事件一个分组:
+
+    [project.entry-points."random_reminder.reminder"]
+    stretch = "rr_stretch:on_reminder"
+
+    [project.entry-points."random_reminder.break_start"]
+    dimmer = "rr_dimmer:on_break_start"
+
+事件及处理函数的参数见 EVENTS。处理函数在界面线程中调用。
+
+启动时不扫描已安装的包，而是读取缓存的入口点索引；sys.path 中任一目录的修改时间变化
+（安装、升级或卸载了包）时才重新扫描。插件模块在它订阅的事件第一次发生时才导入，
+没有订阅者的事件不连接计时器信号，安装很多插件也不影响启动时间和空闲内存。
+"""
+
+import importlib
+import json
+import logging
+import os
+import sys
+
+from app_paths import user_data_path
+
+logger = logging.getLogger(__name__)
+
+GROUP_PREFIX = "random_reminder."
+INDEX_VERSION = 1
+
+EVENT_REMINDER = "reminder"
+EVENT_REST_END = "rest_end"
+EVENT_FOCUS_COMPLETE = "focus_complete"
+EVENT_PHASE = "phase"
+EVENT_PRESENCE = "presence"
+EVENT_BREAK_START = "break_start"
+EVENT_BREAK_END = "break_end"
+
+# 事件 -> 处理函数的参数说明
+EVENTS = {
+    EVENT_REMINDER: "()，随机提醒，开始短休息",
+    EVENT_REST_END: "()，短休息结束",
+    EVENT_FOCUS_COMPLETE: "()，专注周期完成",
+    EVENT_PHASE: "(phase)，计时阶段变化，取值见 timer_engine.PHASE_*",
+    EVENT_PRESENCE: "(away)，用户离开或返回",
+    EVENT_BREAK_START: "(window)，长休息窗口或全屏遮罩已显示",
+    EVENT_BREAK_END: "()，长休息窗口已关闭",
+}
+
+# 计时事件 -> TimerThread上对应的信号名
+TIMER_SIGNALS = {
+    EVENT_REMINDER: "signal_play_sound",
+    EVENT_REST_END: "signal_play_short_break_end_sound",
+    EVENT_FOCUS_COMPLETE: "signal_break_time",
+    EVENT_PHASE: "signal_phase_changed",
+    EVENT_PRESENCE: "signal_presence_changed",
+}
+
+
+def default_index_path():
+    """默认的入口点索引缓存"""
+    return user_data_path("plugin_index.json")
+
+
+def path_fingerprint(paths=None):
+    """sys.path 中各目录的修改时间，安装或卸载包时会变化"""
+    fingerprint = []
+    for entry in sys.path if paths is None else paths:
+        try:
+            fingerprint.append([entry, os.stat(entry or ".").st_mtime_ns])
+        except OSError:
+            continue
+    return fingerprint
+
+
+def scan_entry_points():
+    """扫描所有已安装包的入口点，返回 {事件: [[插件名, 目标], ...]}"""
+    # 只在索引失效时用到，导入和扫描都较慢
+    from importlib.metadata import distributions
+
+    hooks = {}
+    seen = set()
+    for dist in distributions():
+        for entry in dist.entry_points:
+            if not entry.group.startswith(GROUP_PREFIX):
+                continue
+            event = entry.group[len(GROUP_PREFIX):]
+            if event not in EVENTS:
+                logger.warning("插件 %s 订阅了未知事件 %s", entry.name, event)
+                continue
+            # 同一个包出现在多个路径时只取第一个
+            key = (event, entry.name, entry.value)
+            if key in seen:
+                continue
+            seen.add(key)
+            hooks.setdefault(event, []).append([entry.name, entry.value])
+    return hooks
+
+
+def load_index(path=None, paths=None):
+    """读取入口点索引，缓存失效或不存在时重新扫描并写回"""
+    path = path or default_index_path()
+    fingerprint = path_fingerprint(paths)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index.get("fingerprint") == fingerprint:
+            return index["hooks"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    hooks = scan_entry_points()
+    index = {"version": INDEX_VERSION, "fingerprint": fingerprint, "hooks": hooks}
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        logger.warning("无法写入插件索引 %s", path, exc_info=True)
+    return hooks
+
+
+def resolve(target):
+    """导入 "模块:属性.属性" 形式的入口点目标"""
+    module_name, _, attrs = target.partition(":")
+    obj = importlib.import_module(module_name.strip())
+    for attr in filter(None, attrs.strip().split(".")):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class PluginHost:
+    """按事件分发给插件，插件在事件第一次发生时才导入"""
+
+    def __init__(self, hooks=None):
+        """
+        参数:
+            hooks: {事件: [[插件名, 目标], ...]}，通常来自 load_index()
+        """
+        self.hooks = hooks or {}
+        self._handlers = {}  # 事件 -> [(插件名, 处理函数)]，已导入的事件
+        self.loaded = []  # 已导入的插件名，按导入顺序
+
+    @property
+    def events(self):
+        """有插件订阅的事件"""
+        return [event for event, entries in self.hooks.items() if entries]
+
+    def has_subscribers(self, event):
+        return bool(self.hooks.get(event))
+
+    def connect_timer(self, timer_thread):
+        """只为有订阅者的计时事件连接TimerThread的信号"""
+        for event, signal_name in TIMER_SIGNALS.items():
+            if self.has_subscribers(event):
+                signal = getattr(timer_thread, signal_name)
+                signal.connect(lambda *args, event=event: self.emit(event, *args))
+
+    def _load(self, event):
+        """导入订阅了该事件的插件，导入失败的插件被跳过"""
+        handlers = []
+        for name, target in self.hooks.get(event, ()):
+            try:
+                handler = resolve(target)
+            except Exception:
+                logger.exception("无法加载插件 %s（%s）", name, target)
+                continue
+            handlers.append((name, handler))
+            if name not in self.loaded:
+                self.loaded.append(name)
+                logger.info("已加载插件 %s（%s）", name, target)
+        self._handlers[event] = handlers
+        return handlers
+
+    def emit(self, event, *args):
+        """把事件分发给订阅的插件，单个插件出错不影响其它插件"""
+        handlers = self._handlers.get(event)
+        if handlers is None:
+            if not self.hooks.get(event):
+                return
+            handlers = self._load(event)
+        for name, handler in handlers:
+            try:
+                handler(*args)
+            except Exception:
+                logger.exception("插件 %s 处理 %s 事件时出错", name, event)
+
+
+def load_plugins(index_path=None):
+    """读取入口点索引并创建插件宿主，读取失败时返回没有插件的宿主"""
+    try:
+        hooks = load_index(index_path)
+    except Exception:
+        logger.exception("扫描插件失败")
+        hooks = {}
+    if hooks:
+        logger.info("发现插件订阅的事件: %s", ", ".join(sorted(hooks)))
+    return PluginHost(hooks)
@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""免打扰时段
+
+读取本地的 .ics 日历和按星期重复的免打扰规则，把当前时刻前后一段时间内的
+所有事件展开成时间段，排序并合并为互不重叠的区间索引。
+"现在是否免打扰"和"下一个空闲时刻"都只需在起点数组上二分查找，复杂度O(log n)。
+读取和展开日历在后台线程中进行，日历中有成千上万个重复事件也不会拖慢计时线程。
+
+提醒到期时如果处于免打扰时段:
+- defer（默认）：推迟到免打扰结束的时刻
+- suppress：跳过这次提醒，重新安排下一次
+
+短休息结束和专注周期完成也一样：defer时延续到免打扰结束，suppress时静默发生。
+
+配置保存在用户数据目录下的 quiet_hours.json，例如:
+
+    {
+        "mode": "defer",
+        "calendars": ["~/calendars/work.ics"],
+        "rules": [
+            {"days": "mon-fri", "start": "12:00", "end": "13:30"},
+            {"days": "mon-fri", "start": "18:00", "end": "09:00"},
+            {"days": "sat,sun", "start": "00:00", "end": "24:00"}
+        ]
+    }
+
+结束时间不晚于开始时间的规则跨越午夜。日历只处理VEVENT：
+忽略已取消和标记为空闲（TRANSP:TRANSPARENT）的事件，全天事件只有明确标记为忙碌时才计入；
+重复规则支持 FREQ=DAILY/WEEKLY/MONTHLY/YEARLY 以及 INTERVAL、COUNT、UNTIL、BYDAY、
+BYMONTHDAY，并处理 EXDATE 和 RECURRENCE-ID。
+"""
+
+import array
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+from app_paths import user_data_path
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # 没有时区数据库时按本地时间处理
+    ZoneInfo = None
+
+logger = logging.getLogger(__name__)
+
+MODE_DEFER = "defer"
+MODE_SUPPRESS = "suppress"
+
+# 展开的时间范围：当前时刻前一天到之后HORIZON秒
+HORIZON = 7 * 86400
+# 每隔多少秒检查一次日历文件是否有变化
+RELOAD_INTERVAL = 300
+# 展开一个重复事件时最多检查的周期数，避免永远不会发生的规则陷入死循环
+MAX_PERIODS = 10000
+
+WEEKDAYS = {"mo": 0, "tu": 1, "we": 2, "th": 3, "fr": 4, "sa": 5, "su": 6}
+DAY_NAMES = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+QuietRule = namedtuple("QuietRule", ["days", "start", "end"])  # 星期集合、开始/结束（当天的分钟数）
+
+# 日历事件：start为不带时区的当地时间，zone为它所在的时区（None表示本地时间）
+CalendarEvent = namedtuple(
+    "CalendarEvent", ["uid", "start", "duration", "zone", "rrule", "exdates", "recurrence_id"]
+)
+
+
+class IntervalIndex:
+    """排序且互不重叠的区间索引
+
+    构建时排序并合并重叠或相接的区间，起点和终点分别存放在两个紧凑数组中，
+    查询只做一次二分查找。
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        self.starts = array.array("d")
+        self.ends = array.array("d")
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _find(self, t):
+        """包含t的区间下标，不在任何区间内时返回-1"""
+        i = bisect.bisect_right(self.starts, t) - 1
+        if i >= 0 and t < self.ends[i]:
+            return i
+        return -1
+
+    def blocked(self, t):
+        """t是否落在某个区间内"""
+        return self._find(t) >= 0
+
+    def next_free(self, t):
+        """t之后（含t）第一个不在任何区间内的时刻"""
+        i = self._find(t)
+        return self.ends[i] if i >= 0 else t
+
+    def next_blocked(self, t):
+        """t之后（含t）下一个区间的开始时刻，没有时返回None"""
+        i = self._find(t)
+        if i >= 0:
+            return t
+        i = bisect.bisect_right(self.starts, t)
+        return self.starts[i] if i < len(self.starts) else None
+
+
+def parse_days(value):
+    """解析星期描述：mon-fri、sat,sun、daily 或星期名列表"""
+    if isinstance(value, (list, tuple)):
+        value = ",".join(value)
+    days = set()
+    for part in str(value).lower().split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part in ("daily", "all", "*"):
+            days.update(range(7))
+            continue
+        first, _, last = part.partition("-")
+        if first[:3] not in DAY_NAMES or (last and last[:3] not in DAY_NAMES):
+            raise ValueError(f"无法识别的星期: {part}")
+        begin = DAY_NAMES[first[:3]]
+        end = DAY_NAMES[last[:3]] if last else begin
+        day = begin
+        while True:
+            days.add(day)
+            if day == end:
+                break
+            day = (day + 1) % 7
+    return frozenset(days)
+
+
+def _parse_clock(value):
+    """HH:MM 转为当天的分钟数（允许 24:00）"""
+    hours, _, minutes = str(value).partition(":")
+    total = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f"无效的时间: {value}")
+    return total
+
+
+def parse_rule(config):
+    """从配置字典创建免打扰规则"""
+    return QuietRule(
+        parse_days(config.get("days", "daily")),
+        _parse_clock(config["start"]),
+        _parse_clock(config["end"]),
+    )
+
+
+def expand_rules(rules, window_start, window_end):
+    """把按星期重复的规则展开为 [开始, 结束) 时间戳区间"""
+    intervals = []
+    day = date.fromtimestamp(window_start) - timedelta(days=1)
+    last = date.fromtimestamp(window_end)
+    while day <= last:
+        midnight = datetime(day.year, day.month, day.day)
+        weekday = day.weekday()
+        for rule in rules:
+            if weekday not in rule.days:
+                continue
+            end = rule.end if rule.end > rule.start else rule.end + 24 * 60
+            # 在当地时间上计算，夏令时切换当天也正确
+            start_ts = (midnight + timedelta(minutes=rule.start)).timestamp()
+            end_ts = (midnight + timedelta(minutes=end)).timestamp()
+            if end_ts > window_start and start_ts < window_end:
+                intervals.append((start_ts, end_ts))
+        day += timedelta(days=1)
+    return intervals
+
+
+# ---- iCalendar ----
+
+_DURATION = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+
+def _unfold(text):
+    """合并折行（以空格或制表符开头的行接在上一行后面）"""
+    lines = []
+    for line in text.splitlines():
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+
+def _split_property(line):
+    """拆分 名称;参数=值:内容"""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    options = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        options[key.upper()] = param_value.strip('"')
+    return name.upper(), options, value
+
+
+def _zone(tzid):
+    """TZID对应的时区，找不到时返回None（按本地时间处理）"""
+    if not tzid or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("未知的时区 %s，按本地时间处理", tzid)
+        return None
+
+
+def _parse_datetime(value, options):
+    """解析日期时间
+
+    Returns:
+        (不带时区的当地时间, 时区, 是否为全天)
+    """
+    value = value.strip()
+    if options.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d"), None, True
+    if value.endswith("Z"):
+        return datetime.strptime(value[:15], "%Y%m%dT%H%M%S"), timezone.utc, False
+    return datetime.strptime(value[:15], "%Y%m%dT%H%M%S"), _zone(options.get("TZID")), False
+
+
+def _parse_duration(value):
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"无效的时长: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -duration if sign == "-" else duration
+
+
+def _timestamp(local, zone):
+    """当地时间转为时间戳"""
+    if zone is not None:
+        return local.replace(tzinfo=zone).timestamp()
+    return local.timestamp()
+
+
+def _parse_rrule(value, zone):
+    rule = {}
+    for part in value.split(";"):
+        key, _, item = part.partition("=")
+        rule[key.upper()] = item
+    parsed = {
+        "freq": rule.get("FREQ", "").upper(),
+        "interval": max(1, int(rule.get("INTERVAL", 1))),
+        "count": int(rule["COUNT"]) if "COUNT" in rule else None,
+        "until": None,
+        "byday": [],
+        "bymonthday": [int(day) for day in rule["BYMONTHDAY"].split(",")]
+        if rule.get("BYMONTHDAY")
+        else [],
+    }
+    if rule.get("UNTIL"):
+        local, until_zone, _ = _parse_datetime(rule["UNTIL"], {})
+        parsed["until"] = _timestamp(local, until_zone or zone)
+    for day in filter(None, rule.get("BYDAY", "").split(",")):
+        ordinal, weekday = day[:-2], day[-2:].lower()
+        if weekday in WEEKDAYS:
+            parsed["byday"].append((int(ordinal) if ordinal not in ("", "+") else 0, WEEKDAYS[weekday]))
+    if parsed["freq"] not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        raise ValueError(f"不支持的重复规则: {value}")
+    return parsed
+
+
+def parse_ics(text):
+    """解析iCalendar文本，返回会占用时间的事件列表"""
+    events = []
+    current = None
+    for line in _unfold(text):
+        name, options, value = _split_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current = {"exdates": []}
+        elif name == "END" and value.upper() == "VEVENT":
+            if current is not None:
+                event = _build_event(current)
+                if event is not None:
+                    events.append(event)
+            current = None
+        elif current is not None:
+            if name == "EXDATE":
+                current["exdates"] += [(item, options) for item in value.split(",")]
+            else:
+                current.setdefault(name, (value, options))
+    return _apply_overrides(events)
+
+
+def _build_event(props):
+    """由VEVENT的属性创建事件，不占用时间或格式错误时返回None"""
+    if "DTSTART" not in props:
+        return None
+    status = props.get("STATUS", ("",))[0].upper()
+    transparency = props.get("TRANSP", ("",))[0].upper()
+    if status == "CANCELLED" or transparency == "TRANSPARENT":
+        return None
+    try:
+        start, zone, all_day = _parse_datetime(*props["DTSTART"])
+        if all_day and transparency != "OPAQUE":
+            # 全天事件（节日、生日等）默认不算忙碌
+            return None
+        if "DTEND" in props:
+            end, end_zone, _ = _parse_datetime(*props["DTEND"])
+            duration = timedelta(
+                seconds=_timestamp(end, end_zone or zone) - _timestamp(start, zone)
+            )
+        elif "DURATION" in props:
+            duration = _parse_duration(props["DURATION"][0])
+        else:
+            duration = timedelta(days=1) if all_day else timedelta(0)
+        rrule = _parse_rrule(props["RRULE"][0], zone) if "RRULE" in props else None
+        exdates = set()
+        for value, options in props["exdates"]:
+            local, ex_zone, _ = _parse_datetime(value, options)
+            exdates.add(_timestamp(local, ex_zone or zone))
+        recurrence_id = None
+        if "RECURRENCE-ID" in props:
+            local, rid_zone, _ = _parse_datetime(*props["RECURRENCE-ID"])
+            recurrence_id = _timestamp(local, rid_zone or zone)
+    except ValueError as e:
+        logger.warning("跳过无法解析的日历事件 %s: %s", props.get("SUMMARY", ("",))[0], e)
+        return None
+    if duration <= timedelta(0):
+        return None
+    uid = props.get("UID", ("",))[0]
+    return CalendarEvent(uid, start, duration, zone, rrule, exdates, recurrence_id)
+
+
+def _apply_overrides(events):
+    """单独修改过的重复事件实例（RECURRENCE-ID）替换原来的那一次"""
+    overridden = {}
+    for event in events:
+        if event.recurrence_id is not None:
+            overridden.setdefault(event.uid, set()).add(event.recurrence_id)
+    if not overridden:
+        return events
+    return [
+        event._replace(exdates=event.exdates | overridden[event.uid])
+        if event.rrule is not None and event.uid in overridden
+        else event
+        for event in events
+    ]
+
+
+def _add_months(year, month, months):
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def _month_days(year, month, rule, start):
+    """某个月中发生的日期"""
+    next_year, next_month = _add_months(year, month, 1)
+    length = (date(next_year, next_month, 1) - date(year, month, 1)).days
+    days = []
+    for day in rule["bymonthday"]:
+        days.append(day if day > 0 else length + day + 1)
+    for ordinal, weekday in rule["byday"]:
+        first = (weekday - date(year, month, 1).weekday()) % 7 + 1
+        matches = list(range(first, length + 1, 7))
+        if ordinal == 0:
+            days += matches
+        elif -len(matches) <= ordinal <= len(matches):
+            days.append(matches[ordinal - 1 if ordinal > 0 else ordinal])
+    if not days:
+        days = [start.day]
+    return sorted(day for day in set(days) if 1 <= day <= length)
+
+
+def _period_candidates(event, period):
+    """第period个重复周期内的所有开始时间（当地时间，已排序）"""
+    rule = event.rrule
+    start = event.start
+    step = period * rule["interval"]
+    freq = rule["freq"]
+    if freq == "DAILY":
+        local = start + timedelta(days=step)
+        # BYDAY、BYMONTHDAY对按天重复的规则起筛选作用
+        if rule["byday"] and local.weekday() not in {weekday for _, weekday in rule["byday"]}:
+            return []
+        if rule["bymonthday"]:
+            next_year, next_month = _add_months(local.year, local.month, 1)
+            length = (date(next_year, next_month, 1) - date(local.year, local.month, 1)).days
+            if not any(local.day == (day if day > 0 else length + day + 1) for day in rule["bymonthday"]):
+                return []
+        return [local]
+    if freq == "WEEKLY":
+        monday = start - timedelta(days=start.weekday()) + timedelta(weeks=step)
+        weekdays = sorted({weekday for _, weekday in rule["byday"]}) or [start.weekday()]
+        return [monday + timedelta(days=weekday) for weekday in weekdays]
+    if freq == "MONTHLY":
+        year, month = _add_months(start.year, start.month, step)
+        return [start.replace(year=year, month=month, day=day) for day in _month_days(year, month, rule, start)]
+    # YEARLY：同月同日，2月29日在平年跳过
+    try:
+        return [start.replace(year=start.year + step)]
+    except ValueError:
+        return []
+
+
+def _first_period(event, window_start):
+    """没有COUNT时可以直接跳到窗口附近的周期"""
+    rule = event.rrule
+    if rule["count"] is not None:
+        return 0
+    begin = datetime.fromtimestamp(window_start) - event.duration
+    if begin <= event.start:
+        return 0
+    freq = rule["freq"]
+    if freq == "DAILY":
+        periods = (begin - event.start).days
+    elif freq == "WEEKLY":
+        periods = (begin - event.start).days // 7
+    elif freq == "MONTHLY":
+        periods = (begin.year - event.start.year) * 12 + begin.month - event.start.month
+    else:
+        periods = begin.year - event.start.year
+    # 留出时区差异的余量
+    return max(0, periods // rule["interval"] - 1)
+
+
+def expand_event(event, window_start, window_end):
+    """把一个事件在窗口内的所有发生展开为 [开始, 结束) 时间戳区间"""
+    duration = event.duration.total_seconds()
+    if event.rrule is None:
+        start = _timestamp(event.start, event.zone)
+        if start < window_end and start + duration > window_start:
+            return [(start, start + duration)]
+        return []
+
+    rule = event.rrule
+    intervals = []
+    remaining = rule["count"]
+    first = _first_period(event, window_start)
+    for period in range(first, first + MAX_PERIODS):
+        for local in _period_candidates(event, period):
+            if local < event.start:
+                continue
+            start = _timestamp(local, event.zone)
+            if rule["until"] is not None and start > rule["until"]:
+                return intervals
+            if start >= window_end:
+                return intervals
+            if remaining is not None:
+                if remaining <= 0:
+                    return intervals
+                remaining -= 1
+            if start in event.exdates:
+                continue
+            if start + duration > window_start:
+                intervals.append((start, start + duration))
+    return intervals
+
+
+def expand_events(events, window_start, window_end):
+    intervals = []
+    for event in events:
+        intervals += expand_event(event, window_start, window_end)
+    return intervals
+
+
+def read_calendar(path):
+    """读取 .ics 文件"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_ics(f.read())
+
+
+class QuietHours:
+    """免打扰时段
+
+    计时线程只查询区间索引。读取日历、检查日历文件是否变化和展开都在后台线程中完成，
+    完成后把新的索引和窗口整体替换（一次赋值），查询方不会看到构建到一半的索引，
+    也不需要加锁。查询时发现窗口快到期或到了检查日历文件的时间，只唤醒后台线程，
+    本次仍使用现有的索引；窗口在剩余一半时就开始滑动，新索引有充足的时间构建好。
+    """
+
+    def __init__(self, calendars=(), rules=(), mode=MODE_DEFER, horizon=HORIZON, clock=time.time):
+        """
+        Args:
+            calendars: .ics 文件路径列表
+            rules: QuietRule 列表
+            mode: defer（推迟到免打扰结束）或 suppress（跳过这次提醒）
+            horizon: 每次展开当前时刻之后多少秒
+            clock: 返回当前时间戳的函数
+        """
+        if mode not in (MODE_DEFER, MODE_SUPPRESS):
+            raise ValueError(f"未知的免打扰模式: {mode}")
+        self.calendars = [os.path.expanduser(path) for path in calendars]
+        self.rules = list(rules)
+        self.mode = mode
+        self.horizon = horizon
+        self.clock = clock
+        self.expand_count = 0  # 展开次数
+        # (区间索引, 展开的窗口, 下一次检查日历文件的时间)，整体替换
+        self._state = (IntervalIndex(), (0.0, 0.0), 0.0)
+        self._events = {}  # 路径 -> (修改时间, 事件列表)，只在持有_update_lock时访问
+        self._update_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()  # 至少完成过一次构建
+        self._pending = None  # 请求后台线程更新时的查询时刻
+        self._thread = None
+        self._closed = False
+
+    @property
+    def index(self):
+        """当前的区间索引"""
+        return self._state[0]
+
+    def start(self):
+        """启动后台线程并立即开始第一次构建（读取配置后调用）"""
+        self._request(self.clock())
+
+    def wait_ready(self, timeout=None):
+        """等待第一次构建完成，返回是否已完成"""
+        return self._ready.wait(timeout)
+
+    def close(self, timeout=5):
+        """停止后台线程，等待正在进行的构建结束"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _request(self, t):
+        """让后台线程按查询时刻t更新索引，不等待"""
+        self._pending = t
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="quiet-hours", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.update(self._pending)
+            except Exception:
+                logger.exception("更新免打扰时段失败")
+
+    def _ensure(self, t):
+        """返回可以查询的索引，需要更新时交给后台线程"""
+        index, window, check_at = self._state
+        if not window[0] <= t < check_at:
+            self._request(t)
+        return index
+
+    def update(self, t=None):
+        """读取有变化的日历，需要时重新展开并替换索引（在后台线程中调用，也可以直接调用）"""
+        t = self.clock() if t is None else t
+        with self._update_lock:
+            changed = self._reload_calendars()
+            start, end = self._state[1]
+            # 查询时刻离窗口末尾不足一半时向后滑动
+            if changed or not start <= t < end - self.horizon / 2:
+                self._rebuild(t)
+            index, window, _ = self._state
+            self._state = (index, window, min(t + RELOAD_INTERVAL, window[1] - self.horizon / 2))
+        self._ready.set()
+
+    def _reload_calendars(self):
+        """重新读取有变化的日历文件，返回是否有变化"""
+        changed = False
+        for path in self.calendars:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = None
+            cached = self._events.get(path)
+            if cached is not None and cached[0] == mtime:
+                continue
+            events = []
+            if mtime is not None:
+                try:
+                    events = read_calendar(path)
+                except OSError as e:
+                    logger.warning("读取日历 %s 失败: %s", path, e)
+            else:
+                logger.warning("日历文件不存在: %s", path)
+            self._events[path] = (mtime, events)
+            changed = True
+        return changed
+
+    def rebuild(self, t=None):
+        """展开 [t-1天, t+horizon) 内的所有免打扰时段并替换索引"""
+        t = self.clock() if t is None else t
+        with self._update_lock:
+            self._rebuild(t)
+
+    def _rebuild(self, t):
+        start, end = t - 86400, t + self.horizon
+        intervals = expand_rules(self.rules, start, end)
+        for _, events in self._events.values():
+            intervals += expand_events(events, start, end)
+        index = IntervalIndex(intervals)
+        self._state = (index, (start, end), self._state[2])
+        self.expand_count += 1
+        logger.debug("免打扰时段已展开: %s 个区间", len(index))
+
+    def blocked(self, t=None):
+        """t（默认为当前时刻）是否处于免打扰时段"""
+        t = self.clock() if t is None else t
+        return self._ensure(t).blocked(t)
+
+    def next_free(self, t=None):
+        """t（默认为当前时刻）之后第一个不处于免打扰时段的时刻"""
+        t = self.clock() if t is None else t
+        return self._ensure(t).next_free(t)
+
+    def defer_seconds(self, t=None):
+        """距离免打扰结束还有多少秒，不处于免打扰时段时返回0"""
+        t = self.clock() if t is None else t
+        return self.next_free(t) - t
+
+
+def load_quiet_hours(path=None):
+    """读取免打扰配置，没有配置或没有任何时段时返回None"""
+    path = path or user_data_path("quiet_hours.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("读取免打扰配置失败: %s", e)
+        return None
+    if not isinstance(config, dict):
+        logger.warning("免打扰配置格式错误")
+        return None
+    try:
+        rules = [parse_rule(rule) for rule in config.get("rules", [])]
+        calendars = list(config.get("calendars", []))
+        if not rules and not calendars:
+            return None
+        quiet_hours = QuietHours(calendars, rules, mode=config.get("mode", MODE_DEFER))
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning("免打扰配置无效: %s", e)
+        return None
+    # 在后台展开，第一次提醒前通常早已完成
+    quiet_hours.start()
+    return quiet_hours
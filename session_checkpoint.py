@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""专注会话检查点
+
+计时引擎每隔几秒把当前进度写入用户数据目录下的 session.ckpt，
+进程崩溃或机器重启后可以从中断处继续。
+
+检查点是一条定长二进制记录（带CRC校验），先写临时文件再原子替换，
+写入一半或损坏的文件读取时直接忽略。状态没有变化时（例如暂停中）不重复写入。
+"""
+
+import logging
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+from app_paths import user_data_path
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAGIC = b"RRCP"
+CHECKPOINT_VERSION = 1
+
+# 魔数 版本 | 保存时间 阶段 标志 | 专注分钟 最小间隔 最大间隔 休息秒数 | 已专注分钟 秒计数 提醒已过秒数 提醒间隔 已休息秒数
+RECORD = struct.Struct("<4sB dBB HIII HBIII")
+CRC = struct.Struct("<I")
+CHECKPOINT_SIZE = RECORD.size + CRC.size
+
+FLAG_RESTING = 0x01
+
+# 阶段编码
+PHASE_CODES = {"focus": 1, "resting": 2, "paused": 3}
+PHASE_NAMES = {code: name for name, code in PHASE_CODES.items()}
+
+# 超过这个时间的检查点不再提示恢复（秒）
+MAX_AGE = 12 * 3600
+
+Checkpoint = namedtuple(
+    "Checkpoint",
+    [
+        "saved_at",  # 保存时间（time.time()）
+        "phase",
+        "resting",
+        "focus_time",
+        "min_interval",
+        "max_interval",
+        "rest_total",
+        "elapsed_time",
+        "seconds_counter",
+        "reminder_passed",
+        "reminder_interval",
+        "rest_seconds",
+    ],
+)
+
+
+def default_checkpoint_path():
+    """默认的检查点文件"""
+    return user_data_path("session.ckpt")
+
+
+def encode(checkpoint):
+    """编码为定长记录"""
+    data = RECORD.pack(
+        CHECKPOINT_MAGIC,
+        CHECKPOINT_VERSION,
+        checkpoint.saved_at,
+        PHASE_CODES[checkpoint.phase],
+        FLAG_RESTING if checkpoint.resting else 0,
+        checkpoint.focus_time,
+        checkpoint.min_interval,
+        checkpoint.max_interval,
+        checkpoint.rest_total,
+        checkpoint.elapsed_time,
+        checkpoint.seconds_counter,
+        checkpoint.reminder_passed,
+        checkpoint.reminder_interval,
+        checkpoint.rest_seconds,
+    )
+    return data + CRC.pack(zlib.crc32(data))
+
+
+def decode(data):
+    """解码定长记录，格式不对或校验失败时返回None"""
+    if len(data) != CHECKPOINT_SIZE:
+        return None
+    body = data[: RECORD.size]
+    if CRC.unpack(data[RECORD.size:])[0] != zlib.crc32(body):
+        return None
+    magic, version, saved_at, phase, flags, *values = RECORD.unpack(body)
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION or phase not in PHASE_NAMES:
+        return None
+    return Checkpoint(saved_at, PHASE_NAMES[phase], bool(flags & FLAG_RESTING), *values)
+
+
+def read_checkpoint(path=None, max_age=MAX_AGE):
+    """读取检查点，不存在、损坏或过期时返回None"""
+    try:
+        with open(path or default_checkpoint_path(), "rb") as f:
+            checkpoint = decode(f.read(CHECKPOINT_SIZE + 1))
+    except OSError:
+        return None
+    if checkpoint is None or not 0 <= time.time() - checkpoint.saved_at <= max_age:
+        return None
+    return checkpoint
+
+
+def clear_checkpoint(path=None):
+    """删除检查点"""
+    try:
+        os.remove(path or default_checkpoint_path())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("删除检查点失败: %s", e)
+
+
+class Checkpointer:
+    """在计时线程中定期写入检查点
+
+    update() 每次发布快照时调用，距上次写入不足interval秒或状态没有变化时直接返回，
+    实际写入的只有几十字节，不调用fsync。
+    """
+
+    def __init__(self, path=None, interval=5):
+        self.path = path or default_checkpoint_path()
+        self.interval = interval
+        self.write_count = 0  # 实际写入次数
+        self._last_write = None  # 上次写入的时间（单调时钟）
+        self._last_state = None  # 上次写入的状态，用于跳过重复写入
+
+    def update(self, snapshot, config):
+        """按最新快照写入检查点（需要时）"""
+        if snapshot.phase not in PHASE_CODES:
+            return False
+        now = time.monotonic()
+        if self._last_write is not None and now - self._last_write < self.interval:
+            return False
+        checkpoint = Checkpoint(
+            saved_at=time.time(),
+            phase=snapshot.phase,
+            resting=snapshot.resting,
+            focus_time=config.focus_time,
+            min_interval=config.min_interval,
+            max_interval=config.max_interval,
+            rest_total=snapshot.rest_total,
+            elapsed_time=snapshot.elapsed_minutes,
+            seconds_counter=snapshot.seconds_counter,
+            reminder_passed=snapshot.reminder_passed,
+            reminder_interval=snapshot.reminder_interval,
+            rest_seconds=snapshot.rest_seconds,
+        )
+        self._last_write = now
+        state = checkpoint[1:]
+        if state == self._last_state:
+            return False
+        self._last_state = state
+        return self.write(checkpoint)
+
+    def write(self, checkpoint):
+        """原子写入检查点"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(encode(checkpoint))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("写入检查点失败: %s", e)
+            return False
+        self.write_count += 1
+        return True
+
+    def clear(self):
+        """会话正常结束时删除检查点"""
+        self._last_write = None
+        self._last_state = None
+        clear_checkpoint(self.path)
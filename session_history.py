@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""专注会话历史
+
+计时器事件以定长二进制记录追加写入用户数据目录下的 history.bin。
+导出时按块流式读取，输出为CSV或带类型的列式二进制文件；
+导入时把多人的导出文件合并到一个SQLite库中供查询。
+
+用法:
+    python session_history.py export -f csv -o me.csv
+    python session_history.py export -f col -o me.rrcol
+    python session_history.py import team.db a.rrcol b.csv ...
+    python session_history.py summary team.db
+"""
+
+import argparse
+import array
+import csv
+import getpass
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+
+from app_paths import user_data_path
+
+# 事件类型
+EVENT_START = 1  # 开始专注，value为专注分钟数
+EVENT_REMINDER = 2  # 随机提醒，value为本次间隔秒数
+EVENT_REST_END = 3  # 短休息结束，value为休息秒数
+EVENT_FOCUS_COMPLETE = 4  # 专注周期完成，value为专注分钟数
+EVENT_PAUSE = 5  # 暂停，value为本次已专注秒数
+EVENT_RESUME = 6  # 恢复，value为本次已专注秒数
+EVENT_STOP = 7  # 停止，value为本次已专注秒数
+EVENT_AWAY = 8  # 检测到离开
+EVENT_BACK = 9  # 离开后返回或休眠恢复
+
+EVENT_NAMES = {
+    EVENT_START: "start",
+    EVENT_REMINDER: "reminder",
+    EVENT_REST_END: "rest_end",
+    EVENT_FOCUS_COMPLETE: "focus_complete",
+    EVENT_PAUSE: "pause",
+    EVENT_RESUME: "resume",
+    EVENT_STOP: "stop",
+    EVENT_AWAY: "away",
+    EVENT_BACK: "back",
+}
+EVENT_CODES = {name: code for code, name in EVENT_NAMES.items()}
+
+# 定长记录：时间戳(float64) 事件(uint8) 数值(int32)
+RECORD = struct.Struct("<dBi")
+
+# 列式文件格式
+COLUMNAR_MAGIC = b"RRCOL\x01"
+CHUNK_HEADER = struct.Struct("<I")
+CHUNK_SIZE = 65536  # 每块的记录数
+
+
+def default_history_path():
+    """默认的历史记录文件"""
+    return user_data_path("history.bin")
+
+
+class HistoryRecorder:
+    """追加写入计时器事件，可在任意线程调用"""
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self._lock = threading.Lock()
+        self._file = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """注册事件监听，callback(timestamp, event, value)"""
+        self._listeners.append(callback)
+
+    def append(self, event, value=0, timestamp=None):
+        """追加一条事件记录"""
+        timestamp = time.time() if timestamp is None else timestamp
+        data = RECORD.pack(timestamp, event, int(value))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(data)
+            self._file.flush()
+        for callback in self._listeners:
+            callback(timestamp, event, value)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_history_chunks(path=None, chunk_size=CHUNK_SIZE):
+    """按块读取历史记录，每块返回 (timestamps, events, values) 三个数组
+
+    只在内存中保留一块数据，导出多年的历史也不会占用大量内存。
+    尾部不完整的记录（写入时崩溃）会被忽略。
+    """
+    path = path or default_history_path()
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(RECORD.size * chunk_size)
+            count = len(data) // RECORD.size
+            if count == 0:
+                break
+            timestamps = array.array("d")
+            events = array.array("B")
+            values = array.array("i")
+            for timestamp, event, value in RECORD.iter_unpack(data[: count * RECORD.size]):
+                timestamps.append(timestamp)
+                events.append(event)
+                values.append(value)
+            yield timestamps, events, values
+            if count < chunk_size:
+                break
+
+
+def _little_endian(column):
+    """列式文件固定使用小端字节序"""
+    if sys.byteorder == "big":
+        column = array.array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def export_csv(out_path, user, history_path=None):
+    """流式导出为CSV，返回导出的记录数"""
+    total = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user", "timestamp", "event", "value"])
+        for timestamps, events, values in iter_history_chunks(history_path):
+            writer.writerows(
+                (user, f"{t:.3f}", EVENT_NAMES.get(e, str(e)), v)
+                for t, e, v in zip(timestamps, events, values)
+            )
+            total += len(timestamps)
+    return total
+
+
+def export_columnar(out_path, user, history_path=None):
+    """流式导出为列式二进制文件，返回导出的记录数
+
+    格式: 魔数 | 用户名长度(uint16) 用户名(UTF-8) | 若干块
+    每块: 记录数(uint32) | 时间戳 float64[n] | 事件 uint8[n] | 数值 int32[n]
+    """
+    total = 0
+    user_bytes = user.encode("utf-8")
+    with open(out_path, "wb") as f:
+        f.write(COLUMNAR_MAGIC)
+        f.write(struct.pack("<H", len(user_bytes)))
+        f.write(user_bytes)
+        for timestamps, events, values in iter_history_chunks(history_path):
+            f.write(CHUNK_HEADER.pack(len(timestamps)))
+            f.write(_little_endian(timestamps).tobytes())
+            f.write(events.tobytes())
+            f.write(_little_endian(values).tobytes())
+            total += len(timestamps)
+    return total
+
+
+def read_columnar(path):
+    """读取列式文件，返回 (用户名, 块迭代器)"""
+    f = open(path, "rb")
+    if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        f.close()
+        raise ValueError(f"不是有效的列式历史文件: {path}")
+    (name_length,) = struct.unpack("<H", f.read(2))
+    user = f.read(name_length).decode("utf-8")
+
+    def chunks():
+        with f:
+            while True:
+                header = f.read(CHUNK_HEADER.size)
+                if len(header) < CHUNK_HEADER.size:
+                    break
+                (count,) = CHUNK_HEADER.unpack(header)
+                columns = []
+                for typecode in ("d", "B", "i"):
+                    column = array.array(typecode)
+                    column.frombytes(f.read(column.itemsize * count))
+                    columns.append(_little_endian(column))
+                yield tuple(columns)
+
+    return user, chunks()
+
+
+def read_csv(path, chunk_size=CHUNK_SIZE):
+    """按块读取导出的CSV，返回 (用户, 时间戳, 事件, 数值) 元组列表"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        chunk = []
+        for user, timestamp, event, value in reader:
+            code = EVENT_CODES.get(event)
+            chunk.append((user, float(timestamp), code if code else int(event), int(value)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class HistoryStore:
+    """合并多人导出文件的SQLite存储
+
+    (用户, 时间戳, 事件) 唯一，重复导入同一个文件或有重叠的文件不会重复计数。
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                user_id INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                event INTEGER NOT NULL,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        self._ensure_unique_index()
+        self._user_ids = dict(self.conn.execute("SELECT name, id FROM users"))
+
+    def _ensure_unique_index(self):
+        """建立 (用户, 时间戳, 事件) 唯一索引，旧版本的库先去掉已经重复导入的记录"""
+        conn = self.conn
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'events_unique'"
+        ).fetchone()
+        if exists:
+            return
+        with conn:
+            conn.execute(
+                "DELETE FROM events WHERE rowid NOT IN "
+                "(SELECT MIN(rowid) FROM events GROUP BY user_id, ts, event)"
+            )
+            # 唯一索引的前缀同样用于按用户和时间查询，不再需要单独的索引
+            conn.execute("DROP INDEX IF EXISTS events_user_ts")
+            conn.execute("CREATE UNIQUE INDEX events_unique ON events (user_id, ts, event)")
+
+    def _user_id(self, name):
+        if name not in self._user_ids:
+            cursor = self.conn.execute("INSERT INTO users (name) VALUES (?)", (name,))
+            self._user_ids[name] = cursor.lastrowid
+        return self._user_ids[name]
+
+    def import_files(self, paths):
+        """批量导入导出文件，返回新导入的记录数（已经存在的记录被跳过）
+
+        整批导入在一个事务中完成，合并上百个文件也只需要几秒。
+        """
+        conn = self.conn
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        total = 0
+        with conn:
+            for path in paths:
+                total += self._import_file(path)
+        conn.execute("PRAGMA synchronous = FULL")
+        return total
+
+    def _import_file(self, path):
+        with open(path, "rb") as f:
+            is_columnar = f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+
+        total = 0
+        insert = "INSERT OR IGNORE INTO events (user_id, ts, event, value) VALUES (?, ?, ?, ?)"
+        if is_columnar:
+            user, chunks = read_columnar(path)
+            user_id = self._user_id(user)
+            for timestamps, events, values in chunks:
+                cursor = self.conn.executemany(
+                    insert, zip([user_id] * len(timestamps), timestamps, events, values)
+                )
+                total += cursor.rowcount
+        else:
+            for chunk in read_csv(path):
+                cursor = self.conn.executemany(
+                    insert, ((self._user_id(u), t, e, v) for u, t, e, v in chunk)
+                )
+                total += cursor.rowcount
+        return total
+
+    def daily_summary(self, user=None):
+        """按用户和日期统计提醒次数、完成的专注周期和暂停次数"""
+        sql = """
+            SELECT users.name,
+                   date(events.ts, 'unixepoch', 'localtime') AS day,
+                   SUM(events.event = ?) AS reminders,
+                   SUM(events.event = ?) AS completed,
+                   SUM(events.event = ?) AS pauses
+            FROM events JOIN users ON users.id = events.user_id
+        """
+        params = [EVENT_REMINDER, EVENT_FOCUS_COMPLETE, EVENT_PAUSE]
+        if user is not None:
+            sql += " WHERE users.name = ?"
+            params.append(user)
+        sql += " GROUP BY users.name, day ORDER BY users.name, day"
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="专注会话历史导出与合并")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="导出本机历史")
+    export_parser.add_argument("-f", "--format", choices=["csv", "col"], default="col")
+    export_parser.add_argument("-o", "--output", required=True)
+    export_parser.add_argument("-u", "--user", default=getpass.getuser())
+    export_parser.add_argument("--history", help="历史文件路径，默认为用户数据目录")
+
+    import_parser = subparsers.add_parser("import", help="合并导出文件到SQLite库")
+    import_parser.add_argument("store")
+    import_parser.add_argument("files", nargs="+")
+
+    summary_parser = subparsers.add_parser("summary", help="按天汇总")
+    summary_parser.add_argument("store")
+    summary_parser.add_argument("-u", "--user")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        exporter = export_csv if args.format == "csv" else export_columnar
+        count = exporter(args.output, args.user, args.history)
+        print(f"已导出 {count} 条记录到 {args.output}")
+    elif args.command == "import":
+        start = time.perf_counter()
+        store = HistoryStore(args.store)
+        count = store.import_files(args.files)
+        store.close()
+        print(
+            f"已从 {len(args.files)} 个文件导入 {count} 条记录，"
+            f"耗时 {time.perf_counter() - start:.2f} 秒"
+        )
+    else:
+        store = HistoryStore(args.store)
+        print("用户\t日期\t提醒\t完成\t暂停")
+        for row in store.daily_summary(args.user):
+            print("\t".join(str(x) for x in row))
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
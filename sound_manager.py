@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import os
 import sys
 import platform
 import subprocess
 from pathlib import Path
-from PyQt6.QtCore import QObject, QUrl, QTimer
+from PyQt6.QtCore import Qt, QObject, QUrl, QTimer, pyqtSignal
 from PyQt6.QtMultimedia import QSoundEffect
 from PyQt6.QtWidgets import QMessageBox
 
+from notifications import Channel, NotificationDispatcher, build_channels, load_config
+from timer_core import NOTIFY_BREAK_TIME, NOTIFY_REMINDER, NOTIFY_REST_END
+
+logger = logging.getLogger(__name__)
+
 
 def resource_path(relative_path):
     """获取资源的绝对路径，适用于开发环境和打包后的环境"""
@@ -26,18 +32,54 @@ def resource_path(relative_path):
 class SoundManager(QObject):
     """处理声音相关功能的管理类"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, release_after=0):
+        """
+        Args:
+            parent: 父对象
+            release_after: 闲置多少秒后释放音效缓冲区，0表示一直保留
+        """
         super().__init__(parent)
         self._init_sound_files()
-        self.sound_effect = QSoundEffect()
-        self.sound_effect.setVolume(1.0)  # 确保音量设置为最大
-
-        # 监听状态变化
-        self.sound_effect.statusChanged.connect(self._status_changed)
-        self.sound_effect.playingChanged.connect(self._playing_changed)
+        self._sound_effect = None  # 首次播放时创建
+        self.release_after = release_after
+        self._release_timer = None
+        if release_after > 0:
+            self._release_timer = QTimer(self)
+            self._release_timer.setSingleShot(True)
+            self._release_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+            self._release_timer.timeout.connect(self.release_sound)
 
         self.current_sound = self.short_sound_file  # 默认使用短音效
-        print(f"SoundManager初始化完成，当前音效: {self.current_sound}")
+        logger.debug("SoundManager初始化完成，当前音效: %s", self.current_sound)
+
+    @property
+    def sound_effect(self):
+        """音效对象，按需创建"""
+        if self._sound_effect is None:
+            self._sound_effect = QSoundEffect()
+            self._sound_effect.setVolume(1.0)  # 确保音量设置为最大
+
+            # 监听状态变化
+            self._sound_effect.statusChanged.connect(self._status_changed)
+            self._sound_effect.playingChanged.connect(self._playing_changed)
+        if self._release_timer is not None:
+            # 每次使用都重新计算闲置时间
+            self._release_timer.start(self.release_after * 1000)
+        return self._sound_effect
+
+    def release_sound(self):
+        """释放音效对象及其解码后的音频缓冲区"""
+        effect = self._sound_effect
+        if effect is None:
+            return
+        if effect.isPlaying():
+            # 仍在播放，稍后再试
+            self._release_timer.start(self.release_after * 1000)
+            return
+        self._sound_effect = None
+        effect.stop()
+        effect.deleteLater()
+        logger.debug("音效闲置，已释放音频缓冲区")
 
     def _init_sound_files(self):
         """初始化声音文件路径"""
@@ -48,24 +90,15 @@ class SoundManager(QObject):
         self.short_sound_file = str(static_dir / "dingdong.wav")
         self.long_sound_file = str(static_dir / "dingdong-long.wav")
 
-        # 验证文件是否存在并输出详细信息
-        if os.path.exists(self.short_sound_file):
-            print(f"短音效文件存在: {self.short_sound_file}, 大小: {os.path.getsize(self.short_sound_file)} 字节")
-        else:
-            print(f"警告: 短音效文件不存在: {self.short_sound_file}")
-
-        if os.path.exists(self.long_sound_file):
-            print(f"长音效文件存在: {self.long_sound_file}, 大小: {os.path.getsize(self.long_sound_file)} 字节")
-        else:
-            print(f"警告: 长音效文件不存在: {self.long_sound_file}")
+        # 验证文件是否存在
+        for sound_file in (self.short_sound_file, self.long_sound_file):
+            if not os.path.exists(sound_file):
+                logger.warning("音效文件不存在: %s", sound_file)
 
-        # 列出static目录中的所有文件
-        print("static目录中的文件列表:")
-        if static_dir.exists():
+        # 列出static目录中的所有文件（只在调试级别下读取文件大小）
+        if logger.isEnabledFor(logging.DEBUG):
             for file in static_dir.iterdir():
-                print(f"  {file.name} - {os.path.getsize(file)} 字节")
-        else:
-            print("  静态目录不存在")
+                logger.debug("static目录文件: %s - %d 字节", file.name, file.stat().st_size)
 
     def use_short_sound(self):
         """使用短音效"""
@@ -78,17 +111,17 @@ class SoundManager(QObject):
         return self.long_sound_file
 
     def _status_changed(self):
-        status = self.sound_effect.status()
-        print(f"音效状态变化: {status}")
+        status = self.sender().status()
+        logger.debug("音效状态变化: %s", status)
 
     def _playing_changed(self):
-        is_playing = self.sound_effect.isPlaying()
-        print(f"音效播放状态变化: {'正在播放' if is_playing else '停止播放'}")
+        is_playing = self.sender().isPlaying()
+        logger.debug("音效播放状态变化: %s", "正在播放" if is_playing else "停止播放")
 
     def play_current_sound(self, parent_widget=None):
         """播放当前选择的提示音"""
         try:
-            print(f"尝试播放当前音效: {self.current_sound}, 大小: {os.path.getsize(self.current_sound)} 字节")
+            logger.debug("尝试播放当前音效: %s", self.current_sound)
 
             # 尝试使用备用播放方法
             # if self._play_using_system_command(self.current_sound):
@@ -100,15 +133,15 @@ class SoundManager(QObject):
 
             # 设置音效源
             url = QUrl.fromLocalFile(self.current_sound)
-            print(f"音效URL: {url.toString()}")
+            logger.debug("音效URL: %s", url)
             self.sound_effect.setSource(url)
 
             is_loaded = self.sound_effect.isLoaded()
-            print(f"音效是否已加载: {is_loaded}")
+            logger.debug("音效是否已加载: %s", is_loaded)
 
             # 等待音效加载完成
             if not is_loaded:
-                print("音效未加载，正在加载...")
+                logger.debug("音效未加载，正在加载...")
                 self.sound_effect.setLoopCount(1)  # 确保只播放一次
                 # 添加小的延迟以确保音效加载
                 timer = QTimer()
@@ -117,11 +150,10 @@ class SoundManager(QObject):
 
             # 播放音效
             self.sound_effect.play()
-            print(f"音效播放请求已发送，音量: {self.sound_effect.volume()}")
+            logger.debug("音效播放请求已发送，音量: %s", self.sound_effect.volume())
             return True
         except Exception as e:
-            error_msg = f"播放提示音失败: {str(e)}"
-            print(f"错误: {error_msg}")
+            logger.error("播放提示音失败: %s", e)
             if parent_widget:
                 QMessageBox.warning(parent_widget, "错误", f"播放提示音失败: {str(e)}")
             return False
@@ -132,10 +164,10 @@ class SoundManager(QObject):
             system = platform.system()
 
             if not os.path.exists(sound_file):
-                print(f"文件不存在: {sound_file}")
+                logger.warning("文件不存在: %s", sound_file)
                 return False
 
-            print(f"使用系统命令播放: {sound_file}")
+            logger.debug("使用系统命令播放: %s", sound_file)
 
             if system == "Darwin":  # macOS
                 subprocess.Popen(["afplay", sound_file])
@@ -149,16 +181,16 @@ class SoundManager(QObject):
                 subprocess.Popen(["aplay", sound_file])
                 return True
             else:
-                print(f"不支持的操作系统: {system}")
+                logger.warning("不支持的操作系统: %s", system)
                 return False
         except Exception as e:
-            print(f"使用系统命令播放音频失败: {e}")
+            logger.error("使用系统命令播放音频失败: %s", e)
             return False
 
     def play_specific_sound(self, sound_file, parent_widget=None):
         """播放指定的提示音文件"""
         try:
-            print(f"尝试播放指定音效: {sound_file}")
+            logger.debug("尝试播放指定音效: %s", sound_file)
 
             # 首先尝试使用系统命令播放
             # if self._play_using_system_command(sound_file):
@@ -177,6 +209,7 @@ class SoundManager(QObject):
             timer.singleShot(100, self.sound_effect.play)
             return True
         except Exception as e:
+            logger.error("播放提示音失败: %s", e)
             if parent_widget:
                 QMessageBox.warning(parent_widget, "错误", f"播放提示音失败: {str(e)}")
             return False
@@ -187,4 +220,46 @@ class SoundManager(QObject):
 
     def play_long_sound(self, parent_widget=None):
         """播放长提示音"""
-        return self.play_specific_sound(self.long_sound_file, parent_widget)
\ No newline at end of file
+        return self.play_specific_sound(self.long_sound_file, parent_widget)
+
+
+class SoundChannel(QObject, Channel):
+    """声音通知渠道
+
+    QSoundEffect只能在GUI线程使用：send()在通知工作线程中只发出信号，
+    由GUI线程的事件循环播放，工作线程不会等待播放。
+    """
+
+    name = "sound"
+    timeout = 1
+    queue_size = 2
+
+    _play_requested = pyqtSignal(str)
+
+    def __init__(self, sound_manager):
+        super().__init__(sound_manager)
+        self.sound_manager = sound_manager
+        self._play_requested.connect(self._play)
+
+    def send(self, notification):
+        self._play_requested.emit(notification.event)
+
+    def _play(self, event):
+        """在GUI线程中按事件播放对应的提示音"""
+        if event == NOTIFY_REMINDER:
+            self.sound_manager.play_current_sound()
+        elif event == NOTIFY_REST_END:
+            self.sound_manager.play_short_sound()
+        elif event == NOTIFY_BREAK_TIME:
+            # 专注周期完成时的长提示音，原先在主窗口的处理函数中直接播放；
+            # 休息结束时的长提示音不是计时通知，仍由主窗口播放
+            self.sound_manager.play_long_sound()
+
+
+def build_notifier(sound_manager):
+    """按用户的通知配置创建分发器，声音渠道使用给定的声音管理器"""
+    config = load_config()
+    channels = build_channels(config)
+    if config.get("sound"):
+        channels.insert(0, SoundChannel(sound_manager))
+    return NotificationDispatcher(channels)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""团队专注统计服务
+
+客户端按批上报事件（可gzip压缩），服务端在内存中维护按用户/日期预聚合的统计，
+定期快照到磁盘，看板直接从聚合结果读取。
+
+接口:
+    POST /ingest    {"user": "...", "events": [[时间戳, 事件, 数值], ...]}
+    GET  /rollups   ?user=&from=YYYY-MM-DD&to=YYYY-MM-DD
+    GET  /health
+
+用法:
+    python team_server.py --port 8765 --snapshot rollups.json
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from session_history import (
+    EVENT_FOCUS_COMPLETE,
+    EVENT_PAUSE,
+    EVENT_REMINDER,
+    EVENT_STOP,
+)
+
+logger = logging.getLogger(__name__)
+
+# 聚合字段
+ROLLUP_FIELDS = ("events", "reminders", "completed", "pauses", "stops", "focus_seconds")
+
+
+class RollupStore:
+    """按 (用户, 日期) 预聚合的统计，线程安全"""
+
+    def __init__(self, snapshot_path=None):
+        self.snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._rollups = {}  # (user, day) -> [events, reminders, completed, pauses, stops, focus_seconds]
+        self._dirty = False
+        self._day_cache = {}  # 以本地日为单位缓存日期字符串，避免每个事件都格式化
+
+    def _day_of(self, timestamp):
+        local = time.localtime(timestamp)
+        # 按本地时间的天编号，不能用UTC的天：非UTC时区里UTC的一天跨两个本地日期
+        day_index = int((timestamp + local.tm_gmtoff) // 86400)
+        day = self._day_cache.get(day_index)
+        if day is None:
+            day = time.strftime("%Y-%m-%d", local)
+            if len(self._day_cache) > 4096:
+                self._day_cache.clear()
+            self._day_cache[day_index] = day
+        return day
+
+    def _prepare(self, events):
+        """校验一批事件并换算日期，返回 [(日期, 事件, 数值)]
+
+        格式错误时抛出ValueError或TypeError，此时聚合结果没有任何改动。
+        """
+        prepared = []
+        for item in events:
+            timestamp, event, value = item
+            if isinstance(event, bool) or not isinstance(event, int):
+                raise TypeError(f"事件类型应为整数: {event!r}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"事件数值应为数字: {value!r}")
+            try:
+                day = self._day_of(float(timestamp))
+            except (OverflowError, OSError) as e:
+                raise ValueError(f"无效的时间戳 {timestamp!r}: {e}") from e
+            prepared.append((day, event, value))
+        return prepared
+
+    def ingest(self, user, events):
+        """合并一批事件，返回接收的事件数
+
+        整批先校验再合并，一批中有格式错误的事件时整批拒绝，不会只合并一部分。
+        """
+        prepared = self._prepare(events)
+        count = 0
+        with self._lock:
+            for day, event, value in prepared:
+                key = (user, day)
+                row = self._rollups.get(key)
+                if row is None:
+                    row = self._rollups[key] = [0] * len(ROLLUP_FIELDS)
+                row[0] += 1
+                if event == EVENT_REMINDER:
+                    row[1] += 1
+                elif event == EVENT_FOCUS_COMPLETE:
+                    row[2] += 1
+                    row[5] += value * 60
+                elif event == EVENT_PAUSE:
+                    row[3] += 1
+                elif event == EVENT_STOP:
+                    row[4] += 1
+                    row[5] += value
+                count += 1
+            self._dirty = True
+        return count
+
+    def query(self, user=None, day_from=None, day_to=None):
+        """查询聚合结果"""
+        with self._lock:
+            items = list(self._rollups.items())
+        result = []
+        for (row_user, day), row in items:
+            if user is not None and row_user != user:
+                continue
+            if day_from is not None and day < day_from:
+                continue
+            if day_to is not None and day > day_to:
+                continue
+            entry = {"user": row_user, "day": day}
+            entry.update(zip(ROLLUP_FIELDS, row))
+            result.append(entry)
+        result.sort(key=lambda e: (e["user"], e["day"]))
+        return result
+
+    def snapshot(self):
+        """有变化时把聚合结果写入快照文件（原子替换）"""
+        if not self.snapshot_path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = [[user, day, row] for (user, day), row in self._rollups.items()]
+            self._dirty = False
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.snapshot_path)
+        return True
+
+    def load(self):
+        """从快照恢复"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for user, day, row in data:
+                self._rollups[(user, day)] = list(row)
+        return len(data)
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 长连接处理器"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 响应头和响应体分两次写出，避免与延迟确认叠加出40ms延迟
+    max_body = 16 * 1024 * 1024
+    max_decompressed = 64 * 1024 * 1024  # 解压后的上限，防止压缩炸弹
+
+    def log_message(self, format, *args):
+        # 访问日志经日志队列在后台线程写出，不在请求线程中写标准错误
+        if self.server.verbose:
+            logger.info("%s %s", self.address_string(), format % args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > self.max_body:
+            raise ValueError("请求体过大")
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = self._gunzip(body)
+        return body
+
+    def _gunzip(self, body):
+        """解压gzip请求体，解压后超过 max_decompressed 时不再继续解压"""
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            data = decompressor.decompress(body, self.max_decompressed + 1)
+        except zlib.error as e:
+            raise ValueError(f"gzip数据错误: {e}") from e
+        if len(data) > self.max_decompressed:
+            raise ValueError("解压后的请求体过大")
+        if not decompressor.eof:
+            raise ValueError("gzip数据不完整")
+        return data
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/ingest":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self._read_body())
+            user = str(payload["user"])
+            count = self.server.store.ingest(user, payload["events"])
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(200, {"accepted": count})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif url.path == "/rollups":
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            rows = self.server.store.query(
+                user=query.get("user"),
+                day_from=query.get("from"),
+                day_to=query.get("to"),
+            )
+            self._send_json(200, {"rollups": rows})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class TeamServer(ThreadingHTTPServer):
+    """统计服务，默认只监听本机"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host="127.0.0.1", port=8765, snapshot_path=None,
+                 snapshot_interval=30, verbose=False):
+        super().__init__((host, port), IngestHandler)
+        self.store = RollupStore(snapshot_path)
+        self.store.load()
+        self.verbose = verbose
+        self.snapshot_interval = snapshot_interval
+        self._stop_event = threading.Event()
+        self._snapshot_thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _snapshot_loop(self):
+        while not self._stop_event.wait(self.snapshot_interval):
+            self.store.snapshot()
+
+    def start_snapshots(self):
+        """启动定期快照线程"""
+        if not self._snapshot_thread.is_alive():
+            self._snapshot_thread.start()
+
+    def start(self):
+        """在后台线程中运行（测试和负载生成时使用）"""
+        self.start_snapshots()
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop_event.set()
+        self.shutdown()
+        self.server_close()
+        self.store.snapshot()
+
+
+class TeamReporter:
+    """客户端：按批上报事件
+
+    事件先进入内存缓冲区，由后台线程每隔一段时间或攒够一批时统一上报，
+    复用同一个长连接并用gzip压缩。网络错误和服务端错误（5xx）时事件保留到下一次重试，
+    被服务端拒绝（4xx）的批次记录日志后丢弃，避免一批坏数据挡住之后的所有事件。
+    缓冲区最多保留 max_buffer 条，超出时丢弃最旧的事件。每个请求最多 batch_size 条。
+    连接不是线程安全的，所有发送都在 _send_lock 下进行。
+    """
+
+    def __init__(self, url, user, flush_interval=60, batch_size=500, max_buffer=10000):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.user = user
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_event(self, timestamp, event, value):
+        """加入一条事件（可作为HistoryRecorder的监听器）"""
+        with self._lock:
+            self._buffer.append((timestamp, event, value))
+            self._trim()
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def _trim(self):
+        """长时间无法上报时丢弃最旧的事件（调用方持有锁）"""
+        if len(self._buffer) > self.max_buffer:
+            dropped = len(self._buffer) - self.max_buffer
+            del self._buffer[:dropped]
+            logger.warning("团队统计缓冲区已满，丢弃最旧的 %d 条事件", dropped)
+
+    def _requeue(self, batch):
+        """把上报失败的批次放回缓冲区前部，下次重试"""
+        with self._lock:
+            self._buffer[:0] = batch
+            self._trim()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        with self._send_lock:
+            self._close_connection()
+
+    def flush(self):
+        """立即按批上报缓冲区中的事件，返回是否全部成功"""
+        with self._send_lock:
+            ok = True
+            while True:
+                with self._lock:
+                    batch = self._buffer[:self.batch_size]
+                    del self._buffer[:self.batch_size]
+                if not batch:
+                    return ok
+                status = self._send(batch)
+                if status is None or status >= 500:
+                    # 网络错误或服务端错误，剩余事件留到下次
+                    self._requeue(batch)
+                    return False
+                if status != 200:
+                    logger.warning("团队统计服务拒绝了 %d 条事件（HTTP %d），已丢弃", len(batch), status)
+                    ok = False
+
+    def _send(self, batch):
+        """发送一批事件，返回HTTP状态码，网络错误时返回None（调用方持有 _send_lock）"""
+        body = gzip.compress(
+            json.dumps({"user": self.user, "events": batch}).encode("utf-8")
+        )
+        try:
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+            self._conn.request(
+                "POST", "/ingest", body=body,
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+            response = self._conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning("上报团队统计失败: %s", e)
+            self._close_connection()
+            return None
+        if response.status >= 500:
+            logger.warning("上报团队统计失败: HTTP %d，稍后重试", response.status)
+        return response.status
+
+    def _close_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self, timeout=5):
+        """停止后台线程并尽量上报剩余事件
+
+        后台线程在timeout秒内没有结束（卡在一次发送中）时不再上报，连接由它在退出时关闭。
+        """
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("团队统计上报仍在进行，放弃上报剩余的 %d 条事件", len(self._buffer))
+            return
+        self.flush()
+        with self._send_lock:
+            self._close_connection()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="团队专注统计服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--snapshot", help="快照文件路径")
+    parser.add_argument("--snapshot-interval", type=int, default=30, help="快照间隔（秒）")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    from app_logging import setup_logging
+
+    setup_logging(log_file=False)
+    server = TeamServer(args.host, args.port, args.snapshot, args.snapshot_interval, args.verbose)
+    server.start_snapshots()
+    print(f"团队统计服务已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._stop_event.set()
+        server.server_close()
+        server.store.snapshot()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""休眠检测的单元测试
+
+用法: python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import idle_detector  # noqa: E402
+from idle_detector import IdleDetector  # noqa: E402
+
+
+class FakeClocks:
+    """可以分别拨动的单调时钟、计入休眠的时钟和墙上时钟"""
+
+    def __init__(self):
+        self.mono = 1000.0
+        self.boot = 5000.0
+        self.wall = 1.7e9
+
+    def run(self, seconds):
+        self.mono += seconds
+        self.boot += seconds
+        self.wall += seconds
+
+    def suspend(self, seconds):
+        # 休眠期间 time.monotonic 在 Linux/macOS 上停止
+        self.boot += seconds
+        self.wall += seconds
+
+
+class SuspendTest(unittest.TestCase):
+    def make_detector(self, clocks, boot_clock=True):
+        patches = [
+            mock.patch.object(idle_detector.time, "monotonic", lambda: clocks.mono),
+            mock.patch.object(idle_detector.time, "time", lambda: clocks.wall),
+            mock.patch.object(
+                idle_detector, "_suspend_clock",
+                lambda: (lambda: clocks.boot) if boot_clock else None,
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        detector = IdleDetector(use_system_idle=False)
+        detector.reset()
+        return detector
+
+    def test_wall_clock_step_is_not_a_suspend(self):
+        clocks = FakeClocks()
+        detector = self.make_detector(clocks)
+        clocks.run(1)
+        clocks.wall += 3600  # 校时或手动修改系统时间
+        self.assertEqual(detector.check(1), IdleDetector.ACTIVE)
+        self.assertEqual(detector.last_gap, 0)
+
+    def test_suspend_is_detected(self):
+        clocks = FakeClocks()
+        detector = self.make_detector(clocks)
+        clocks.run(1)
+        clocks.suspend(600)
+        self.assertEqual(detector.check(1), IdleDetector.SUSPENDED)
+        self.assertEqual(detector.last_gap, 600)
+        clocks.run(1)
+        self.assertEqual(detector.check(1), IdleDetector.ACTIVE)
+
+    def test_falls_back_to_wall_clock_without_suspend_clock(self):
+        clocks = FakeClocks()
+        detector = self.make_detector(clocks, boot_clock=False)
+        clocks.run(1)
+        clocks.suspend(600)
+        self.assertEqual(detector.check(1), IdleDetector.SUSPENDED)
+
+
+if __name__ == "__main__":
+    unittest.main()
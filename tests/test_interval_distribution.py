@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""提醒间隔分布的单元测试
+
+用法: python -m unittest discover -s tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interval_distribution import (  # noqa: E402
+    ExponentialInterval,
+    HistogramInterval,
+    UniformInterval,
+    build_distribution,
+    min_gap_of,
+    with_min_gap,
+)
+
+
+class MinGapTest(unittest.TestCase):
+    def test_min_gap_wins_over_range(self):
+        distribution = with_min_gap(UniformInterval(), 240)
+        rng = random.Random(1)
+        # 范围退化为一个值或整体低于最短间隔时都返回最短间隔
+        self.assertEqual(distribution.sample(180, 180, rng), 240)
+        self.assertEqual(distribution.sample(180, 200, rng), 240)
+        self.assertEqual(distribution.sample(180, 240, rng), 240)
+        # 最小间隔高于最短间隔时不受影响
+        self.assertEqual(distribution.sample(300, 300, rng), 300)
+
+    def test_samples_respect_min_gap(self):
+        rng = random.Random(2)
+        for base in (UniformInterval(), ExponentialInterval(0.2), HistogramInterval([5, 1, 0, 1])):
+            distribution = with_min_gap(base, 250)
+            samples = [distribution.sample(180, 300, rng) for _ in range(2000)]
+            self.assertGreaterEqual(min(samples), 250, base.name)
+            self.assertLessEqual(max(samples), 300, base.name)
+
+    def test_with_min_gap_round_trip(self):
+        distribution = build_distribution("exponential", 200, mean=0.3)
+        self.assertEqual(min_gap_of(distribution), 200)
+        base = with_min_gap(distribution, 0)
+        self.assertEqual(min_gap_of(base), 0)
+        self.assertIs(base, distribution.base)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""通知分发器的单元测试
+
+用法: python -m unittest discover -s tests
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notifications import Channel, NotificationDispatcher, timer_notification  # noqa: E402
+from timer_core import NOTIFY_REMINDER  # noqa: E402
+
+
+class BlockingChannel(Channel):
+    """发送时等待放行的渠道"""
+
+    name = "blocking"
+    timeout = 1
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.sent = 0
+
+    def send(self, notification):
+        self.entered.set()
+        self.release.wait(5)
+        self.sent += 1
+
+
+class DispatcherTest(unittest.TestCase):
+    def notification(self):
+        return timer_notification(NOTIFY_REMINDER, 10, 90)
+
+    def test_close_waits_for_in_flight_send(self):
+        channel = BlockingChannel()
+        dispatcher = NotificationDispatcher([channel])
+        dispatcher.dispatch(self.notification())
+        self.assertTrue(channel.entered.wait(5))
+        threading.Timer(0.1, channel.release.set).start()
+        dispatcher.close()
+        self.assertEqual(channel.sent, 1)
+
+    def test_close_is_bounded_by_channel_timeout(self):
+        channel = BlockingChannel()
+        dispatcher = NotificationDispatcher([channel])
+        dispatcher.dispatch(self.notification())
+        self.assertTrue(channel.entered.wait(5))
+        start = time.monotonic()
+        dispatcher.close()
+        self.assertLess(time.monotonic() - start, channel.timeout + 0.5)
+        channel.release.set()
+
+    def test_dispatch_after_close_is_ignored(self):
+        channel = BlockingChannel()
+        channel.release.set()
+        dispatcher = NotificationDispatcher([channel])
+        dispatcher.close()
+        dispatcher.dispatch(self.notification())
+        stats = dispatcher.stats()["blocking"]
+        self.assertEqual((stats["pending"], stats["sent"]), (0, 0))
+        dispatcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
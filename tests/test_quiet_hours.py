@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""免打扰时段中日历展开的单元测试
+
+用法: python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quiet_hours import expand_events, parse_ics  # noqa: E402
+
+
+def calendar(*events):
+    """由若干VEVENT的属性行拼出iCalendar文本"""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for props in events:
+        lines += ["BEGIN:VEVENT", *props, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def starts(text, first, last):
+    """展开 [first, last) 内的事件，返回各次发生的当地开始时间"""
+    intervals = expand_events(parse_ics(text), first.timestamp(), last.timestamp())
+    return sorted(datetime.fromtimestamp(start) for start, _ in intervals)
+
+
+class ExpandTest(unittest.TestCase):
+    def setUp(self):
+        # 不带TZID的时间按本地时间处理，固定时区使结果与运行环境无关
+        self._tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Berlin"
+        time.tzset()
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._tz
+        time.tzset()
+
+    def test_daily_by_weekday_skips_weekend(self):
+        # 2026-10-19 是星期一
+        text = calendar([
+            "UID:standup",
+            "DTSTART:20261019T093000",
+            "DTEND:20261019T094500",
+            "RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR",
+        ])
+        result = starts(text, datetime(2026, 10, 19), datetime(2026, 11, 2))
+        self.assertEqual(len(result), 10)
+        self.assertTrue(all(local.weekday() < 5 for local in result))
+        self.assertEqual(result[5], datetime(2026, 10, 26, 9, 30))
+
+    def test_daily_by_month_day(self):
+        text = calendar([
+            "UID:payday",
+            "DTSTART:20261001T100000",
+            "DURATION:PT1H",
+            "RRULE:FREQ=DAILY;BYMONTHDAY=1,-1",
+        ])
+        result = starts(text, datetime(2026, 10, 1), datetime(2026, 12, 2))
+        self.assertEqual(result, [
+            datetime(2026, 10, 1, 10), datetime(2026, 10, 31, 10),
+            datetime(2026, 11, 1, 10), datetime(2026, 11, 30, 10),
+            datetime(2026, 12, 1, 10),
+        ])
+
+    def test_weekly_interval_and_count(self):
+        text = calendar([
+            "UID:review",
+            "DTSTART:20261020T140000",
+            "DTEND:20261020T150000",
+            "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH;COUNT=5",
+        ])
+        result = starts(text, datetime(2026, 10, 1), datetime(2027, 1, 1))
+        self.assertEqual(result, [
+            datetime(2026, 10, 20, 14), datetime(2026, 10, 22, 14),
+            datetime(2026, 11, 3, 14), datetime(2026, 11, 5, 14),
+            datetime(2026, 11, 17, 14),
+        ])
+
+    def test_monthly_by_month_day(self):
+        text = calendar([
+            "UID:report",
+            "DTSTART:20261015T090000",
+            "DURATION:PT2H",
+            "RRULE:FREQ=MONTHLY;BYMONTHDAY=15,-1;UNTIL=20261231T235959",
+        ])
+        result = starts(text, datetime(2026, 10, 1), datetime(2027, 3, 1))
+        self.assertEqual(result, [
+            datetime(2026, 10, 15, 9), datetime(2026, 10, 31, 9),
+            datetime(2026, 11, 15, 9), datetime(2026, 11, 30, 9),
+            datetime(2026, 12, 15, 9), datetime(2026, 12, 31, 9),
+        ])
+
+    def test_exdate_removes_occurrence(self):
+        text = calendar([
+            "UID:sync",
+            "DTSTART:20261019T110000",
+            "DTEND:20261019T113000",
+            "RRULE:FREQ=DAILY;COUNT=4",
+            "EXDATE:20261020T110000,20261021T110000",
+        ])
+        result = starts(text, datetime(2026, 10, 19), datetime(2026, 10, 30))
+        self.assertEqual(result, [datetime(2026, 10, 19, 11), datetime(2026, 10, 22, 11)])
+
+    def test_recurrence_id_replaces_occurrence(self):
+        text = calendar(
+            [
+                "UID:weekly",
+                "DTSTART:20261019T150000",
+                "DTEND:20261019T160000",
+                "RRULE:FREQ=WEEKLY",
+            ],
+            [
+                "UID:weekly",
+                "RECURRENCE-ID:20261026T150000",
+                "DTSTART:20261027T080000",
+                "DTEND:20261027T090000",
+            ],
+        )
+        result = starts(text, datetime(2026, 10, 19), datetime(2026, 11, 3))
+        self.assertEqual(result, [
+            datetime(2026, 10, 19, 15), datetime(2026, 10, 27, 8), datetime(2026, 11, 2, 15),
+        ])
+
+    def test_cancelled_and_transparent_events_are_ignored(self):
+        text = calendar(
+            ["UID:a", "DTSTART:20261019T100000", "DURATION:PT1H", "STATUS:CANCELLED"],
+            ["UID:b", "DTSTART:20261019T120000", "DURATION:PT1H", "TRANSP:TRANSPARENT"],
+            ["UID:c", "DTSTART;VALUE=DATE:20261020"],
+        )
+        self.assertEqual(starts(text, datetime(2026, 10, 19), datetime(2026, 10, 22)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""团队统计服务的单元测试
+
+用法: python -m unittest discover -s tests
+"""
+
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_history import EVENT_FOCUS_COMPLETE, EVENT_REMINDER  # noqa: E402
+from team_server import RollupStore, TeamReporter, TeamServer  # noqa: E402
+
+
+class LocalDayTest(unittest.TestCase):
+    """按本地日期聚合"""
+
+    def setUp(self):
+        self._tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Asia/Shanghai"
+        time.tzset()
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._tz
+        time.tzset()
+
+    def test_same_utc_day_different_local_days(self):
+        # 本地1月1日09:00和1月2日04:00都落在UTC的1月1日
+        first = time.mktime((2026, 1, 1, 9, 0, 0, 0, 0, -1))
+        second = time.mktime((2026, 1, 2, 4, 0, 0, 0, 0, -1))
+        self.assertEqual(int(first // 86400), int(second // 86400))
+
+        store = RollupStore()
+        store.ingest("alice", [[first, EVENT_REMINDER, 0], [second, EVENT_REMINDER, 0]])
+        days = {row["day"]: row["reminders"] for row in store.query(user="alice")}
+        self.assertEqual(days, {"2026-01-01": 1, "2026-01-02": 1})
+
+
+class IngestTest(unittest.TestCase):
+    def test_bad_batch_is_not_partially_applied(self):
+        store = RollupStore()
+        now = time.time()
+        with self.assertRaises((ValueError, TypeError)):
+            store.ingest("bob", [[now, EVENT_FOCUS_COMPLETE, 25], [now, EVENT_REMINDER]])
+        with self.assertRaises((ValueError, TypeError)):
+            store.ingest("bob", [[now, EVENT_REMINDER, 0], [now, EVENT_REMINDER, "x"]])
+        self.assertEqual(store.query(), [])
+
+        store.ingest("bob", [[now, EVENT_FOCUS_COMPLETE, 25]])
+        (row,) = store.query()
+        self.assertEqual((row["completed"], row["focus_seconds"]), (1, 1500))
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = TeamServer(port=0)
+        self.server.start()
+        self.host, self.port = self.server.server_address[:2]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def post(self, body):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        try:
+            conn.request("POST", "/ingest", body=body,
+                         headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def test_decompressed_size_is_limited(self):
+        payload = json.dumps({"user": "eve", "events": [], "pad": " " * (4 * 1024 * 1024)})
+        with mock.patch.object(self.server.RequestHandlerClass, "max_decompressed", 1024 * 1024):
+            self.assertEqual(self.post(gzip.compress(payload.encode("utf-8"))), 400)
+        self.assertEqual(self.server.store.query(), [])
+
+    def test_rejected_batch_is_dropped(self):
+        reporter = TeamReporter(self.server.url, "carol", flush_interval=3600)
+        try:
+            reporter.add_event(time.time(), EVENT_REMINDER, "bad")
+            self.assertFalse(reporter.flush())
+            # 4xx的批次被丢弃，不挡住之后的事件
+            reporter.add_event(time.time(), EVENT_REMINDER, 0)
+            self.assertTrue(reporter.flush())
+        finally:
+            reporter.close()
+        (row,) = self.server.store.query(user="carol")
+        self.assertEqual(row["reminders"], 1)
+
+    def test_flush_sends_at_most_batch_size_per_request(self):
+        reporter = TeamReporter(self.server.url, "frank", flush_interval=3600, batch_size=100)
+        try:
+            with mock.patch.object(reporter, "_send", wraps=reporter._send) as send:
+                for _ in range(250):
+                    reporter.add_event(time.time(), EVENT_REMINDER, 0)
+                # 攒满一批时后台线程也会上报，两边共用发送锁
+                self.assertTrue(reporter.flush())
+                sizes = [len(call.args[0]) for call in send.call_args_list]
+        finally:
+            reporter.close()
+        self.assertLessEqual(max(sizes), 100)
+        self.assertEqual(sum(sizes), 250)
+        (row,) = self.server.store.query(user="frank")
+        self.assertEqual(row["reminders"], 250)
+
+    def test_close_does_not_share_connection_with_stuck_worker(self):
+        reporter = TeamReporter(self.server.url, "grace", flush_interval=3600)
+        entered, release = threading.Event(), threading.Event()
+        original = reporter._send
+
+        def slow_send(batch):
+            entered.set()
+            release.wait(10)
+            return original(batch)
+
+        try:
+            with mock.patch.object(reporter, "_send", side_effect=slow_send) as send:
+                reporter.add_event(time.time(), EVENT_REMINDER, 0)
+                reporter._wake.set()
+                self.assertTrue(entered.wait(5))
+                reporter.add_event(time.time(), EVENT_REMINDER, 0)
+                reporter.close(timeout=0.2)
+                # 后台线程仍在发送，close() 不再从另一个线程使用同一个连接
+                self.assertEqual(send.call_count, 1)
+        finally:
+            release.set()
+        reporter._thread.join(5)
+        self.assertFalse(reporter._thread.is_alive())
+        self.assertIsNone(reporter._conn)
+
+    def test_buffer_is_bounded_when_server_is_down(self):
+        reporter = TeamReporter("http://127.0.0.1:9", "dave", flush_interval=3600, max_buffer=100)
+        try:
+            for index in range(250):
+                reporter.add_event(time.time(), EVENT_REMINDER, index)
+                if index % 50 == 0:
+                    reporter.flush()
+            self.assertLessEqual(len(reporter._buffer), 100)
+        finally:
+            reporter._stopped = True
+            reporter._wake.set()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""计时核心在免打扰时段中的行为
+
+用法: python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quiet_hours import MODE_DEFER, MODE_SUPPRESS  # noqa: E402
+from timer_core import (  # noqa: E402
+    NOTIFY_BREAK_TIME,
+    NOTIFY_REMINDER,
+    NOTIFY_REST_END,
+    NOTIFY_SILENCED,
+    TimerCore,
+)
+
+
+class FakeQuietHours:
+    """按核心已推进的秒数判断是否处于免打扰时段"""
+
+    def __init__(self, core, start, end, mode):
+        self.core = core
+        self.start = start
+        self.end = end
+        self.mode = mode
+
+    def defer_seconds(self, t=None):
+        now = self.core.focused_seconds()
+        return self.end - now if self.start <= now < self.end else 0
+
+
+class QuietHoursTest(unittest.TestCase):
+    def make_core(self, start, end, mode, focus_time=10, rest_total=30):
+        events = []
+        core = TimerCore(lambda name, *args: events.append((self.core.focused_seconds(), name, *args)))
+        self.core = core
+        core.state.focus_time = focus_time
+        core.state.rest_total = rest_total
+        core.state.min_interval = core.state.max_interval = 120
+        core.quiet_hours = FakeQuietHours(core, start, end, mode)
+        return core, events
+
+    @staticmethod
+    def named(events, *names):
+        return [(t, name, *args) for t, name, *args in events if name in names]
+
+    def test_break_time_is_deferred(self):
+        core, events = self.make_core(540, 700, MODE_DEFER)
+        core.start()
+        core.advance(3600)
+        self.assertFalse(core.running)
+        self.assertEqual(self.named(events, NOTIFY_BREAK_TIME), [(700, NOTIFY_BREAK_TIME)])
+
+    def test_break_time_is_silenced(self):
+        core, events = self.make_core(540, 700, MODE_SUPPRESS)
+        core.start()
+        core.advance(3600)
+        self.assertFalse(core.running)
+        self.assertEqual(self.named(events, NOTIFY_BREAK_TIME), [])
+        self.assertEqual(
+            self.named(events, NOTIFY_SILENCED), [(600, NOTIFY_SILENCED, NOTIFY_BREAK_TIME)]
+        )
+
+    def test_rest_end_is_deferred(self):
+        # 120秒时提醒，休息到150秒时已处于免打扰时段
+        core, events = self.make_core(140, 200, MODE_DEFER)
+        core.start()
+        core.advance(300)
+        self.assertEqual(
+            self.named(events, NOTIFY_REMINDER, NOTIFY_REST_END),
+            [(120, NOTIFY_REMINDER), (200, NOTIFY_REST_END)],
+        )
+        self.assertEqual(core.rest_limit(), core.state.rest_total)
+
+    def test_rest_end_is_silenced(self):
+        core, events = self.make_core(140, 200, MODE_SUPPRESS)
+        core.start()
+        core.advance(200)
+        self.assertEqual(self.named(events, NOTIFY_REST_END), [])
+        self.assertEqual(
+            self.named(events, NOTIFY_SILENCED), [(150, NOTIFY_SILENCED, NOTIFY_REST_END)]
+        )
+        self.assertFalse(core.state.is_resting)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""界面主题
+
+整个应用只使用一份样式表，在启动时设置到QApplication上并只解析一次。
+各窗口不再调用 setStyleSheet，而是给控件设置对象名（objectName）或属性，
+由样式表中的选择器匹配:
+
+    QLabel#breakCountdown        单个控件
+    QPushButton[primary="true"]  同一类控件的变体
+
+样式表只规定字号和间距，颜色来自调色板。浅色和深色主题只切换调色板，不需要重新解析样式表。
+"""
+
+import logging
+import os
+
+from PyQt6.QtGui import QColor, QPalette
+
+logger = logging.getLogger(__name__)
+
+THEME_SYSTEM = "system"  # 保持平台默认的样式和调色板
+
+# 主题 -> 调色板颜色
+THEMES = {
+    "light": {
+        "window": "#f5f5f5",
+        "window_text": "#202124",
+        "base": "#ffffff",
+        "alternate_base": "#eeeeee",
+        "text": "#202124",
+        "button": "#e8e8e8",
+        "button_text": "#202124",
+        "highlight": "#4caf50",
+        "highlighted_text": "#ffffff",
+        "placeholder": "#80868b",
+        "disabled_text": "#9aa0a6",
+    },
+    "dark": {
+        "window": "#202124",
+        "window_text": "#e8eaed",
+        "base": "#2b2c2f",
+        "alternate_base": "#333438",
+        "text": "#e8eaed",
+        "button": "#3c4043",
+        "button_text": "#e8eaed",
+        "highlight": "#4caf50",
+        "highlighted_text": "#ffffff",
+        "placeholder": "#9aa0a6",
+        "disabled_text": "#6f7378",
+    },
+}
+
+STYLESHEET = """
+QLabel[role="title"] { font-weight: bold; margin: 10px; }
+QLabel#appTitle { font-size: 18pt; }
+QLabel#promptTitle { font-size: 16pt; }
+QLabel#breakTitle { font-size: 24pt; margin: 20px; }
+QLabel#breakDescription { font-size: 14pt; margin: 10px; }
+QLabel#breakCountdown { font-size: 32pt; font-weight: bold; margin: 20px; }
+QLabel#activityTitle { font-size: 16pt; font-weight: bold; }
+QLabel#activityText { font-size: 12pt; margin: 0 20px; }
+ScreenOverlay QLabel { color: #ffffff; }
+QPushButton[primary="true"] { font-size: 14pt; padding: 8px; }
+"""
+
+# 调色板角色 -> THEMES中的键
+_ROLES = {
+    QPalette.ColorRole.Window: "window",
+    QPalette.ColorRole.WindowText: "window_text",
+    QPalette.ColorRole.Base: "base",
+    QPalette.ColorRole.AlternateBase: "alternate_base",
+    QPalette.ColorRole.ToolTipBase: "base",
+    QPalette.ColorRole.ToolTipText: "text",
+    QPalette.ColorRole.Text: "text",
+    QPalette.ColorRole.Button: "button",
+    QPalette.ColorRole.ButtonText: "button_text",
+    QPalette.ColorRole.Highlight: "highlight",
+    QPalette.ColorRole.HighlightedText: "highlighted_text",
+    QPalette.ColorRole.PlaceholderText: "placeholder",
+}
+
+
+def theme_names():
+    """可选的主题名"""
+    return [THEME_SYSTEM] + list(THEMES)
+
+
+def build_palette(colors):
+    """按主题颜色生成调色板"""
+    palette = QPalette()
+    for role, key in _ROLES.items():
+        palette.setColor(role, QColor(colors[key]))
+    disabled = QColor(colors["disabled_text"])
+    for role in (
+        QPalette.ColorRole.WindowText,
+        QPalette.ColorRole.Text,
+        QPalette.ColorRole.ButtonText,
+    ):
+        palette.setColor(QPalette.ColorGroup.Disabled, role, disabled)
+    return palette
+
+
+def apply_theme(app, name=None):
+    """设置应用的主题，返回实际使用的主题名
+
+    参数:
+        app: QApplication
+        name: 主题名，为None时读取环境变量 RANDOM_REMINDER_THEME，默认跟随系统
+    """
+    name = name or os.environ.get("RANDOM_REMINDER_THEME") or THEME_SYSTEM
+    if name != THEME_SYSTEM and name not in THEMES:
+        logger.warning("未知的主题 %s，使用系统默认", name)
+        name = THEME_SYSTEM
+    if name != THEME_SYSTEM:
+        # 平台样式可能忽略调色板，自定义主题统一使用Fusion
+        app.setStyle("Fusion")
+        app.setPalette(build_palette(THEMES[name]))
+    # 样式表不随主题变化，已经设置过时不再重新解析
+    if app.styleSheet() != STYLESHEET:
+        app.setStyleSheet(STYLESHEET)
+    return name
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""计时核心
+
+纯Python实现的专注/提醒/休息调度逻辑，不依赖Qt。
+图形界面的TimerThread和命令行守护进程共用这一份实现，
+事件通过 notify(名称, *参数) 回调通知调用方。
+"""
+
+import logging
+import math
+import time
+
+from interval_distribution import UniformInterval
+from quiet_hours import MODE_SUPPRESS
+from session_history import (
+    EVENT_FOCUS_COMPLETE,
+    EVENT_REMINDER,
+    EVENT_REST_END,
+    EVENT_START,
+)
+
+# 通知名称
+NOTIFY_PROGRESS = "progress"  # 专注分钟数变化 (elapsed_minutes)
+NOTIFY_BREAK_TIME = "break_time"  # 专注周期完成
+NOTIFY_REMINDER = "reminder"  # 随机提醒，进入短休息
+NOTIFY_REST_END = "rest_end"  # 短休息结束
+NOTIFY_REMINDER_PROGRESS = "reminder_progress"  # (已过秒数, 间隔秒数)
+NOTIFY_BREAK_PROGRESS = "break_progress"  # (已休息秒数, 休息总秒数)
+# 免打扰时段（suppress模式）中静默发生的短休息结束或专注完成 (原事件名称)，
+# 状态照常变化，但不播放提示音、不发送通知
+NOTIFY_SILENCED = "silenced"
+
+logger = logging.getLogger(__name__)
+
+
+class TimerState:
+    """计时状态
+
+    使用__slots__存放调度相关的计数器，避免每个实例携带__dict__，
+    常驻后台时占用更少内存。
+    """
+
+    __slots__ = (
+        "is_resting",
+        "rest_seconds",
+        "rest_total",
+        "focus_time",
+        "min_interval",
+        "max_interval",
+        "elapsed_time",
+        "next_reminder",
+        "seconds_counter",
+        "reminder_seconds_passed",
+        "reminder_interval_seconds",
+        "rest_extension",
+        "focus_extension",
+    )
+
+    def __init__(self):
+        self.rest_total = 10  # 短休息时间，默认10秒
+        self.focus_time = 90  # 默认专注时间90分钟
+        self.min_interval = 180  # 最小提醒间隔（秒）
+        self.max_interval = 300  # 最大提醒间隔（秒）
+        self.reset()
+
+    def reset(self):
+        """重置进度相关的计数器，保留设置"""
+        self.is_resting = False  # 是否处于休息状态
+        self.rest_seconds = 0  # 休息已经过的秒数
+        self.elapsed_time = 0  # 已经过的时间（分钟）
+        self.next_reminder = 0  # 下一次提醒的时间（分钟）
+        self.seconds_counter = 0  # 秒计数器
+        self.reminder_seconds_passed = 0  # 距离上次提醒已经过的秒数
+        self.reminder_interval_seconds = 0  # 当前提醒间隔（秒）
+        self.rest_extension = 0  # 免打扰时段推迟短休息结束的秒数
+        self.focus_extension = 0  # 免打扰时段推迟专注完成的秒数
+
+
+def _ignore(name, *args):
+    pass
+
+
+class TimerCore:
+    """专注计时的调度核心
+
+    只负责按给定的秒数推进状态并按时间顺序产生事件，
+    何时唤醒、在哪个线程运行由调用方决定。
+    """
+
+    def __init__(self, notify=None):
+        """
+        Args:
+            notify: 事件回调 notify(名称, *参数)，名称见 NOTIFY_* 常量
+        """
+        self.notify = notify or _ignore
+        self.state = TimerState()
+        self.running = False
+        self.interval_distribution = UniformInterval()  # 提醒间隔分布
+        self.interval_adapter = None  # 可选的自适应间隔估计器
+        self.history = None  # 可选的事件历史记录器
+        self.quiet_hours = None  # 可选的免打扰时段
+        self._last_reminder_at = None  # 最近一次提醒的时间（单调时钟）
+        self._interval_range = (0, 0)  # 安排当前提醒时使用的间隔范围
+
+    def start(self):
+        """开始一次新的专注周期"""
+        self.state.reset()
+        self.running = True
+        self._last_reminder_at = None
+        self.schedule_next_reminder()
+        self.record(EVENT_START, self.state.focus_time)
+
+    def restore(self, elapsed_time, seconds_counter):
+        """从检查点继续中断的专注周期
+
+        已专注的进度保留，中断期间的时间不补记；和休眠结束一样，
+        未完成的短休息直接结束，从当前时刻重新安排下一次提醒。
+        """
+        state = self.state
+        state.reset()
+        state.elapsed_time = min(elapsed_time, max(0, state.focus_time - 1))
+        state.seconds_counter = min(seconds_counter, 59)
+        self.running = True
+        self._last_reminder_at = None
+        self.notify(NOTIFY_PROGRESS, state.elapsed_time)
+        self.rebase()
+
+    def seconds_to_next_event(self):
+        """距离下一次提醒或短休息结束的秒数"""
+        state = self.state
+        if state.is_resting:
+            return self.rest_limit() - state.rest_seconds
+        if state.reminder_interval_seconds > 0:
+            return state.reminder_interval_seconds - state.reminder_seconds_passed
+        return 0
+
+    def seconds_to_focus_end(self):
+        """距离专注周期结束的秒数"""
+        state = self.state
+        return state.focus_time * 60 + state.focus_extension - self.focused_seconds()
+
+    def rest_limit(self):
+        """本次短休息的总秒数（含免打扰时段的推迟）"""
+        return self.state.rest_total + self.state.rest_extension
+
+    def next_wake(self, slack=0):
+        """距离下一次需要唤醒的秒数，slack秒内的事件合并为一次唤醒"""
+        candidates = sorted(
+            d for d in (self.seconds_to_next_event(), self.seconds_to_focus_end()) if d > 0
+        )
+        if not candidates:
+            return 1
+        wait = candidates[0]
+        for due in candidates[1:]:
+            if due - candidates[0] <= slack:
+                wait = due
+        return wait
+
+    def advance(self, seconds):
+        """推进计时若干秒，一次性按时间顺序处理期间发生的所有事件"""
+        state = self.state
+        notify = self.notify
+        while seconds > 0 and self.running:
+            # 每段推进不跨越分钟边界、提醒时刻、短休息结束或推迟后的专注结束
+            step = min(seconds, 60 - state.seconds_counter)
+            for due in (self.seconds_to_next_event(), self.seconds_to_focus_end()):
+                if due > 0:
+                    step = min(step, due)
+            seconds -= step
+
+            # 专注计时器始终运行
+            state.seconds_counter += step
+            if state.seconds_counter >= 60:
+                state.elapsed_time += 1
+                state.seconds_counter = 0
+                notify(NOTIFY_PROGRESS, state.elapsed_time)
+
+            # 检查专注时间是否到达，优先级最高
+            if self.seconds_to_focus_end() <= 0 and self._complete_focus():
+                return
+
+            if state.is_resting:
+                # 休息状态计时
+                state.rest_seconds += step
+                notify(NOTIFY_BREAK_PROGRESS, state.rest_seconds, self.rest_limit())
+                # 检查休息时间是否结束
+                if state.rest_seconds >= self.rest_limit():
+                    self._end_rest()
+            else:
+                # 非休息状态下，提醒间隔计时
+                state.reminder_seconds_passed += step
+                if state.reminder_interval_seconds > 0:
+                    notify(
+                        NOTIFY_REMINDER_PROGRESS,
+                        state.reminder_seconds_passed,
+                        state.reminder_interval_seconds,
+                    )
+                # 检查是否到达提醒间隔
+                if state.reminder_seconds_passed >= state.reminder_interval_seconds:
+                    self._remind()
+
+    def settle(self):
+        """立即处理因设置变化而已经到期的事件，不推进时间"""
+        state = self.state
+        if not self.running:
+            return
+        if self.seconds_to_focus_end() <= 0 and self._complete_focus():
+            return
+        if state.is_resting:
+            if state.rest_seconds >= self.rest_limit():
+                self._end_rest()
+        elif 0 < state.reminder_interval_seconds <= state.reminder_seconds_passed:
+            self._remind()
+
+    def _complete_focus(self):
+        """专注周期完成，返回False表示因免打扰时段推迟
+
+        defer模式下专注计时延续到免打扰结束再完成；suppress模式下照常完成但不提示。
+        """
+        state = self.state
+        wait = self._quiet_wait()
+        if wait > 0 and self.quiet_hours.mode != MODE_SUPPRESS:
+            logger.info("免打扰时段，专注完成推迟 %s 秒", wait)
+            state.focus_extension = self.focused_seconds() - state.focus_time * 60 + wait
+            return False
+        if wait > 0:
+            logger.info("免打扰时段，专注周期静默完成")
+            self.notify(NOTIFY_SILENCED, NOTIFY_BREAK_TIME)
+        else:
+            self.notify(NOTIFY_BREAK_TIME)
+        self.record(EVENT_FOCUS_COMPLETE, state.focus_time)
+        if self.interval_adapter is not None:
+            self.interval_adapter.record_completed()
+        self.running = False
+        return True
+
+    def _end_rest(self):
+        """短休息结束（处于免打扰时段时推迟或不提示）"""
+        state = self.state
+        wait = self._quiet_wait()
+        if wait > 0 and self.quiet_hours.mode != MODE_SUPPRESS:
+            # 延长本次短休息，到免打扰结束时再提示
+            logger.info("免打扰时段，短休息结束推迟 %s 秒", wait)
+            state.rest_extension = state.rest_seconds - state.rest_total + wait
+            self.notify(NOTIFY_BREAK_PROGRESS, state.rest_seconds, self.rest_limit())
+            return
+        state.is_resting = False
+        state.rest_seconds = 0
+        state.rest_extension = 0
+        if wait > 0:
+            logger.info("免打扰时段，短休息静默结束")
+            self.notify(NOTIFY_SILENCED, NOTIFY_REST_END)
+        else:
+            self.notify(NOTIFY_REST_END)
+        self.record(EVENT_REST_END, state.rest_total)
+        self.schedule_next_reminder()  # 休息结束后重新安排下一次提醒
+
+    def _remind(self):
+        """到达提醒间隔，进入短休息（处于免打扰时段时推迟或跳过）"""
+        state = self.state
+        if self._hold_for_quiet_hours():
+            return
+        self.notify(NOTIFY_REMINDER)
+        self.record(EVENT_REMINDER, state.reminder_interval_seconds)
+        self._last_reminder_at = time.monotonic()
+        state.is_resting = True  # 进入休息状态
+        state.rest_seconds = 0  # 重置休息时间计数器
+        state.rest_extension = 0
+        state.reminder_seconds_passed = 0  # 清零提醒计时
+
+    def _quiet_wait(self):
+        """处于免打扰时段时返回距结束的秒数（向上取整），否则为0"""
+        if self.quiet_hours is None:
+            return 0
+        wait = self.quiet_hours.defer_seconds()
+        return math.ceil(wait) if wait > 0 else 0
+
+    def _hold_for_quiet_hours(self):
+        """处于免打扰时段时推迟或跳过这次提醒，返回True表示不提醒"""
+        delay = self._quiet_wait()
+        if delay <= 0:
+            return False
+        state = self.state
+        if self.quiet_hours.mode == MODE_SUPPRESS:
+            logger.info("免打扰时段，跳过这次提醒")
+            self.schedule_next_reminder()
+        else:
+            # 延长当前间隔，到免打扰结束时再提醒
+            logger.info("免打扰时段，提醒推迟 %s 秒", delay)
+            state.reminder_interval_seconds = state.reminder_seconds_passed + delay
+            state.next_reminder = state.elapsed_time + state.reminder_interval_seconds / 60
+        self.notify(
+            NOTIFY_REMINDER_PROGRESS,
+            state.reminder_seconds_passed,
+            state.reminder_interval_seconds,
+        )
+        return True
+
+    def reconfigure(self, focus_time, min_interval, max_interval, rest_total):
+        """修改设置，运行中时就地调整剩余的计划
+
+        已专注的时间和当前提醒已经过的秒数都保留；当前提醒间隔按它在旧范围中的
+        相对位置映射到新范围，保持分布形状不变。调整后已经到期的事件由settle()处理。
+        """
+        state = self.state
+        range_changed = (min_interval, max_interval) != (state.min_interval, state.max_interval)
+        rest_changed = rest_total != state.rest_total
+        state.focus_time = focus_time
+        state.min_interval = min_interval
+        state.max_interval = max_interval
+        state.rest_total = rest_total
+        if not self.running:
+            return
+
+        if state.is_resting:
+            if rest_changed:
+                self.notify(NOTIFY_BREAK_PROGRESS, state.rest_seconds, self.rest_limit())
+        elif range_changed and state.reminder_interval_seconds > 0:
+            old_low, old_high = self._interval_range
+            low, high = self._current_range()
+            position = (
+                (state.reminder_interval_seconds - old_low) / (old_high - old_low)
+                if old_high > old_low
+                else 0.5
+            )
+            interval = max(1, int(round(low + min(1.0, max(0.0, position)) * (high - low))))
+            state.next_reminder += (interval - state.reminder_interval_seconds) / 60
+            state.reminder_interval_seconds = interval
+            self._interval_range = (low, high)
+            self.notify(NOTIFY_REMINDER_PROGRESS, state.reminder_seconds_passed, interval)
+
+    def rebase(self):
+        """从当前时刻重新安排计划（离开、休眠结束后调用）"""
+        state = self.state
+        if state.is_resting:
+            # 离开期间已经休息过，直接结束本次短休息
+            state.is_resting = False
+            state.rest_seconds = 0
+            state.rest_extension = 0
+            self.notify(NOTIFY_BREAK_PROGRESS, 0, state.rest_total)
+        self.schedule_next_reminder()
+        self.notify(NOTIFY_REMINDER_PROGRESS, 0, state.reminder_interval_seconds)
+
+    def schedule_next_reminder(self):
+        """安排下一次随机提醒的时间"""
+        state = self.state
+        low, high = self._current_range()
+        self._interval_range = (low, high)
+        # 分布的查找表在设置变化时已构建好，这里只做O(1)采样
+        state.reminder_interval_seconds = self.interval_distribution.sample(low, high)
+        # 确保下一次提醒时间是基于当前时间计算的，避免立即触发
+        state.next_reminder = state.elapsed_time + state.reminder_interval_seconds / 60
+        state.reminder_seconds_passed = 0  # 重置已经过的秒数
+
+    def _current_range(self):
+        """当前设置下的提醒间隔范围（秒）"""
+        low, high = self.state.min_interval, self.state.max_interval
+        if self.interval_adapter is not None:
+            low, high = self.interval_adapter.interval_range(low, high)
+        return low, high
+
+    def record_if_ignored(self):
+        """提醒后很快被暂停或停止，视为提醒被忽略"""
+        if self.interval_adapter is None or self._last_reminder_at is None:
+            return
+        if time.monotonic() - self._last_reminder_at <= self.interval_adapter.IGNORE_WINDOW:
+            self.interval_adapter.record_ignored()
+            self._last_reminder_at = None
+
+    def record(self, event, value=0):
+        """记录一条事件历史"""
+        if self.history is not None:
+            self.history.append(event, value)
+
+    def focused_seconds(self):
+        """本次会话已专注的秒数"""
+        return self.state.elapsed_time * 60 + self.state.seconds_counter
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""线程安全的计时引擎
+
+在TimerCore之上加入显式的状态机、命令队列和状态快照，不依赖Qt:
+
+- 设置保存在不可变的 TimerConfig 中，任意线程修改时整体替换，读取总是最新值
+- 运行状态只由运行计时循环的线程（唯一写者）修改，
+  其它线程通过 SimpleQueue 提交命令，由计时线程在下一次唤醒时按顺序执行
+- 每次处理完成后发布一个不可变的 TimerSnapshot，任意线程读取到的都是一致的状态
+
+阶段转换:
+    stopped/break --start/restore--> focus --提醒--> resting --休息结束--> focus
+    focus/resting --专注完成--> break
+    运行阶段定期写入检查点，进入stopped/break时删除
+    focus/resting --pause--> paused --resume--> 暂停前的阶段
+    任意运行阶段 --stop--> stopped
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from idle_detector import IdleDetector
+from interval_distribution import UniformInterval
+from session_history import (
+    EVENT_AWAY,
+    EVENT_BACK,
+    EVENT_PAUSE,
+    EVENT_RESUME,
+    EVENT_STOP,
+)
+from timer_core import (
+    NOTIFY_BREAK_TIME,
+    NOTIFY_REMINDER,
+    NOTIFY_REST_END,
+    NOTIFY_SILENCED,
+    TimerCore,
+)
+
+# 阶段
+PHASE_STOPPED = "stopped"
+PHASE_FOCUS = "focus"
+PHASE_RESTING = "resting"
+PHASE_LONG_BREAK = "break"
+PHASE_PAUSED = "paused"
+
+# 计时循环继续运行的阶段
+ACTIVE_PHASES = (PHASE_FOCUS, PHASE_RESTING, PHASE_PAUSED)
+
+# 引擎自身的通知，其余通知见 timer_core
+NOTIFY_PHASE = "phase"  # 阶段变化 (phase)
+NOTIFY_PRESENCE = "presence"  # 用户离开/返回 (away)
+
+# 命令
+CMD_START = "start"
+CMD_PAUSE = "pause"
+CMD_RESUME = "resume"
+CMD_STOP = "stop"
+CMD_CONFIGURE = "configure"
+CMD_DISPLAY = "display"
+CMD_RESTORE = "restore"
+
+# 界面不可见时默认允许推迟事件的秒数：不再逐秒唤醒，提醒最多晚几秒
+DEFAULT_TIMER_SLACK = 5
+
+TimerConfig = namedtuple(
+    "TimerConfig",
+    [
+        "focus_time",  # 专注时间（分钟）
+        "min_interval",  # 最小提醒间隔（秒）
+        "max_interval",  # 最大提醒间隔（秒）
+        "rest_total",  # 短休息时间（秒）
+        "idle_detection",  # 离开时是否自动暂停
+        "timer_slack",  # 省电模式允许推迟事件的秒数，0表示关闭
+        "distribution",  # 提醒间隔分布
+        "adapter",  # 可选的自适应间隔估计器
+        "history",  # 可选的事件历史记录器
+        "checkpointer",  # 可选的检查点写入器
+        "quiet_hours",  # 可选的免打扰时段
+    ],
+)
+
+TimerSnapshot = namedtuple(
+    "TimerSnapshot",
+    [
+        "phase",
+        "away",
+        "elapsed_minutes",
+        "seconds_counter",
+        "focus_time",
+        "reminder_passed",
+        "reminder_interval",
+        "rest_seconds",
+        "rest_total",
+        "resting",  # 是否处于短休息（暂停时也保留）
+        "version",
+    ],
+)
+
+
+def _ignore(name, *args):
+    pass
+
+
+class TimerEngine:
+    """专注计时引擎
+
+    run() 或 begin()/step() 所在的线程是唯一的写者；
+    其它方法可以在任意线程调用。
+    """
+
+    def __init__(self, notify=None, idle_detector=None):
+        """
+        Args:
+            notify: 事件回调 notify(名称, *参数)，在计时线程中调用
+            idle_detector: 空闲与休眠检测器，默认新建一个
+        """
+        self.notify = notify or _ignore
+        self.core = TimerCore(self._core_notify)
+        self.idle_detector = idle_detector or IdleDetector()
+        self.config = TimerConfig(
+            focus_time=90,
+            min_interval=180,
+            max_interval=300,
+            rest_total=10,
+            idle_detection=True,
+            timer_slack=DEFAULT_TIMER_SLACK,
+            distribution=UniformInterval(),
+            adapter=None,
+            history=None,
+            checkpointer=None,
+            quiet_hours=None,
+        )
+        self._config_lock = threading.Lock()  # 只保证并发修改设置时不丢失更新
+        self._commands = queue.SimpleQueue()
+        self._wake = threading.Event()
+
+        # 以下只在计时线程中修改
+        self.phase = PHASE_STOPPED
+        self._resume_phase = PHASE_FOCUS
+        self.away = False
+        self.display_active = True
+        self._carry_seconds = 0  # 上次唤醒未计入的不足一秒的时间
+        self.wakeup_count = 0  # 本次运行实际唤醒次数
+        self.covered_seconds = 0  # 本次运行覆盖的秒数
+        self._version = 0
+        self._apply_config()
+        self._snapshot = None
+        self._publish()
+
+    # ---- 任意线程 ----
+
+    def snapshot(self):
+        """获取最近一次发布的状态快照"""
+        return self._snapshot
+
+    def submit(self, command, *args):
+        """提交一条命令，由计时线程按顺序执行"""
+        self._commands.put((command, args))
+        self._wake.set()
+
+    def configure(self, **changes):
+        """修改设置，字段见 TimerConfig"""
+        with self._config_lock:
+            self.config = self.config._replace(**changes)
+        self.submit(CMD_CONFIGURE)
+
+    def restore(self, checkpoint):
+        """从检查点继续中断的专注周期，在开始前提交"""
+        self.submit(CMD_RESTORE, checkpoint)
+
+    def pause(self):
+        self.submit(CMD_PAUSE)
+
+    def resume(self):
+        self.submit(CMD_RESUME)
+
+    def stop(self):
+        self.submit(CMD_STOP)
+
+    def set_display_active(self, active):
+        """设置进度界面是否可见，不可见时允许合并唤醒"""
+        self.submit(CMD_DISPLAY, active)
+
+    def get_wakeup_stats(self):
+        """获取本次运行的唤醒统计
+
+        Returns:
+            dict: wakeups为实际唤醒次数，seconds为覆盖的秒数，
+                saved_per_hour为相比逐秒唤醒每小时节省的唤醒次数
+        """
+        seconds = self.covered_seconds
+        saved = max(0, seconds - self.wakeup_count)
+        saved_per_hour = int(saved * 3600 / seconds) if seconds else 0
+        return {
+            "wakeups": self.wakeup_count,
+            "seconds": seconds,
+            "saved_per_hour": saved_per_hour,
+        }
+
+    # ---- 计时线程 ----
+
+    def run(self):
+        """在当前线程中运行计时循环，直到停止或专注周期结束"""
+        self.begin()
+        while self.phase in ACTIVE_PHASES:
+            if self.phase == PHASE_PAUSED:
+                # 暂停时不轮询，由命令唤醒
+                self._wake.wait(60)
+                self._wake.clear()
+                self.step(0)
+                continue
+
+            wait_seconds = self._next_wait_seconds()
+            wait_start = time.monotonic()
+            self._wake.wait(wait_seconds)
+            self._wake.clear()
+
+            # 按实际经过的时间推进，等待可能被命令提前唤醒
+            waited = time.monotonic() - wait_start + self._carry_seconds
+            seconds = int(waited)
+            self._carry_seconds = waited - seconds
+            self.wakeup_count += 1
+            self.covered_seconds += seconds
+            self.step(seconds, wait_seconds)
+
+    def begin(self):
+        """开始一次新的专注周期（不等待，适合由外部时钟驱动）"""
+        self.submit(CMD_START)
+        self._drain()
+        self._publish()
+
+    def step(self, seconds, expected_interval=None):
+        """推进计时若干秒，然后执行排队的命令并发布快照
+
+        Args:
+            seconds: 经过的秒数
+            expected_interval: 本次预期的等待时长，给出时进行离开检测
+        """
+        if self.phase in (PHASE_FOCUS, PHASE_RESTING) and seconds >= 0:
+            if (
+                expected_interval is None
+                or not self.config.idle_detection
+                or self._check_presence(expected_interval)
+            ):
+                self.core.advance(seconds)
+            else:
+                # 离开或休眠期间不计时，也不发出任何提醒
+                self._carry_seconds = 0
+        self._drain()
+        self._publish()
+
+    def drain(self):
+        """在调用线程中执行排队的命令（只在计时循环未运行时调用）"""
+        self._drain()
+        self._publish()
+
+    def _drain(self):
+        while True:
+            try:
+                command, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            self._apply(command, args)
+
+    def _apply(self, command, args):
+        """执行一条命令"""
+        core = self.core
+        phase = self.phase
+        if command in (CMD_START, CMD_RESTORE):
+            if phase in (PHASE_STOPPED, PHASE_LONG_BREAK):
+                self._apply_config()
+                self.away = False
+                self._carry_seconds = 0
+                self.wakeup_count = 0
+                self.covered_seconds = 0
+                self.idle_detector.reset()
+                if command == CMD_START:
+                    core.start()
+                else:
+                    checkpoint = args[0]
+                    core.restore(checkpoint.elapsed_time, checkpoint.seconds_counter)
+                    core.record(EVENT_RESUME, core.focused_seconds())
+                self._set_phase(PHASE_FOCUS)
+        elif command == CMD_PAUSE:
+            if phase in (PHASE_FOCUS, PHASE_RESTING):
+                core.record_if_ignored()
+                core.record(EVENT_PAUSE, core.focused_seconds())
+                self._resume_phase = phase
+                self._set_phase(PHASE_PAUSED)
+        elif command == CMD_RESUME:
+            if phase == PHASE_PAUSED:
+                core.record(EVENT_RESUME, core.focused_seconds())
+                self._set_phase(self._resume_phase)
+                # 暂停期间修改的设置可能使事件已经到期
+                core.settle()
+            # 手动暂停的时间不应被误判为系统休眠
+            self.idle_detector.reset()
+            self._carry_seconds = 0
+        elif command == CMD_STOP:
+            if phase in ACTIVE_PHASES:
+                core.record_if_ignored()
+                core.record(EVENT_STOP, core.focused_seconds())
+            core.running = False
+            self.away = False
+            self._set_phase(PHASE_STOPPED)
+        elif command == CMD_CONFIGURE:
+            self._apply_config()
+        elif command == CMD_DISPLAY:
+            self.display_active = args[0]
+
+    def _apply_config(self):
+        """把最新设置应用到计时核心
+
+        运行中修改时不重启计时：已专注的时间保留，剩余的提醒和休息就地调整，
+        调整后已经到期的事件立即触发。新的间隔分布从下一次安排提醒时生效。
+        """
+        config = self.config
+        core = self.core
+        core.interval_distribution = config.distribution
+        core.interval_adapter = config.adapter
+        core.history = config.history
+        core.quiet_hours = config.quiet_hours
+        core.reconfigure(
+            config.focus_time, config.min_interval, config.max_interval, config.rest_total
+        )
+        if self.phase in (PHASE_FOCUS, PHASE_RESTING):
+            core.settle()
+        if not config.idle_detection and self.away:
+            self.away = False
+            self.idle_detector.reset()
+
+    def _set_phase(self, phase):
+        if phase != self.phase:
+            self.phase = phase
+            checkpointer = self.config.checkpointer
+            if checkpointer is not None and phase in (PHASE_STOPPED, PHASE_LONG_BREAK):
+                # 会话正常结束，不再需要恢复
+                checkpointer.clear()
+            self.notify(NOTIFY_PHASE, phase)
+
+    def _core_notify(self, name, *args):
+        """跟踪核心事件引起的阶段变化，再转发给调用方"""
+        event = args[0] if name == NOTIFY_SILENCED else name
+        if event == NOTIFY_REMINDER:
+            self._set_phase(PHASE_RESTING)
+        elif event == NOTIFY_REST_END:
+            self._set_phase(PHASE_FOCUS)
+        elif event == NOTIFY_BREAK_TIME:
+            self._set_phase(PHASE_LONG_BREAK)
+        self.notify(name, *args)
+
+    def _publish(self):
+        """发布新的状态快照（引用赋值是原子的）"""
+        state = self.core.state
+        self._version += 1
+        self._snapshot = TimerSnapshot(
+            phase=self.phase,
+            away=self.away,
+            elapsed_minutes=state.elapsed_time,
+            seconds_counter=state.seconds_counter,
+            focus_time=state.focus_time,
+            reminder_passed=state.reminder_seconds_passed,
+            reminder_interval=state.reminder_interval_seconds,
+            rest_seconds=state.rest_seconds,
+            rest_total=state.rest_total,
+            resting=state.is_resting,
+            version=self._version,
+        )
+        checkpointer = self.config.checkpointer
+        if checkpointer is not None:
+            checkpointer.update(self._snapshot, self.config)
+
+    def _next_wait_seconds(self):
+        """计算下一次唤醒前需要等待的秒数"""
+        if self.away:
+            # 离开期间降低唤醒频率，只等待检测器下一次查询
+            return self.idle_detector.system_idle_poll
+        slack = self.config.timer_slack
+        if slack <= 0 or self.display_active:
+            # 界面可见时需要逐秒刷新进度
+            return 1
+        # 无人观看时只在事件发生时唤醒，并把松弛窗口内的事件合并为一次唤醒
+        return self.core.next_wake(slack)
+
+    def _check_presence(self, expected_interval):
+        """检查用户是否在场，返回True表示本次计时有效"""
+        status = self.idle_detector.check(expected_interval)
+
+        if status == IdleDetector.SUSPENDED:
+            # 休眠刚刚结束，缺失的时间不补记，直接从当前时刻重新安排
+            self._rebase_after_absence()
+            self.notify(NOTIFY_PRESENCE, False)
+            self.core.record(EVENT_BACK, self.idle_detector.last_gap)
+            return False
+
+        if status == IdleDetector.IDLE:
+            if not self.away:
+                self.away = True
+                self.notify(NOTIFY_PRESENCE, True)
+                self.core.record(EVENT_AWAY)
+            return False
+
+        if self.away:
+            # 用户回来了，一步追平，不回放离开期间的计时
+            self._rebase_after_absence()
+            self.notify(NOTIFY_PRESENCE, False)
+            self.core.record(EVENT_BACK)
+            return False
+
+        return True
+
+    def _rebase_after_absence(self):
+        """离开或休眠结束后重新安排计划"""
+        self.away = False
+        self.core.rebase()
+        self._set_phase(PHASE_FOCUS)
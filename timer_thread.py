@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
-import time
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from notifications import timer_notification
+from timer_core import (
+    NOTIFY_BREAK_PROGRESS,
+    NOTIFY_BREAK_TIME,
+    NOTIFY_PROGRESS,
+    NOTIFY_REMINDER,
+    NOTIFY_REMINDER_PROGRESS,
+    NOTIFY_REST_END,
+    NOTIFY_SILENCED,
+)
+from timer_engine import (
+    ACTIVE_PHASES,
+    NOTIFY_PHASE,
+    NOTIFY_PRESENCE,
+    PHASE_PAUSED,
+    TimerEngine,
+)
+
 
 class TimerThread(QThread):
-    """后台计时器线程，负责时间管理和发出提醒信号"""
+    """后台计时器线程，负责时间管理和发出提醒信号
+
+    计时逻辑和状态机都在TimerEngine中，这里只是在独立线程中运行引擎，
+    并把引擎的事件转发为Qt信号。所有控制方法都只是向引擎提交命令，可以在任意线程调用。
+    """
 
     signal_play_sound = pyqtSignal()
     signal_play_short_break_end_sound = pyqtSignal()  # 短休息结束提示音信号
@@ -16,149 +36,188 @@ class TimerThread(QThread):
     signal_update_reminder_progress = pyqtSignal(int, int)  # 当前秒数, 总秒数
     signal_update_break_progress = pyqtSignal(int, int)  # 当前秒数, 总秒数
     signal_state_reset = pyqtSignal()  # 状态重置信号
+    signal_presence_changed = pyqtSignal(bool)  # 用户是否离开（离开/休眠为True）
+    signal_phase_changed = pyqtSignal(str)  # 引擎阶段变化
+    signal_silenced = pyqtSignal(str)  # 免打扰时段中静默发生的事件名称
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        # 初始化默认值
-        self.running = False
-        self.paused = False
-        self.is_resting = False  # 是否处于休息状态
-        self.rest_seconds = 0  # 休息已经过的秒数
-        self.rest_total = 10  # 短休息时间，默认10秒
-        self.focus_time = 90  # 默认专注时间90分钟
-        self.min_interval = 180  # 最小提醒间隔（秒）
-        self.max_interval = 300  # 最大提醒间隔（秒）
-        self.elapsed_time = 0  # 已经过的时间（分钟）
-        self.next_reminder = 0  # 下一次提醒的时间（分钟）
-        self.seconds_counter = 0  # 秒计数器
-        self.reminder_seconds_passed = 0  # 距离上次提醒已经过的秒数
-        self.reminder_interval_seconds = 0  # 当前提醒间隔（秒）
+        self.engine = TimerEngine(self._notify)  # 计时引擎
+        self.notifier = None  # 可选的通知分发器
+        self._signals = {
+            NOTIFY_PROGRESS: self.signal_update_progress.emit,
+            NOTIFY_BREAK_TIME: self.signal_break_time.emit,
+            NOTIFY_REMINDER: self.signal_play_sound.emit,
+            NOTIFY_REST_END: self.signal_play_short_break_end_sound.emit,
+            NOTIFY_REMINDER_PROGRESS: self.signal_update_reminder_progress.emit,
+            NOTIFY_BREAK_PROGRESS: self.signal_update_break_progress.emit,
+            NOTIFY_PRESENCE: self.signal_presence_changed.emit,
+            NOTIFY_PHASE: self.signal_phase_changed.emit,
+            NOTIFY_SILENCED: self.signal_silenced.emit,
+        }
+        # 本对象属于界面线程，阶段变化（停止、暂停、长休息）后在界面线程中保存自适应间隔，
+        # 计时线程不写文件
+        self.signal_phase_changed.connect(self.save_adapter)
+
+    def _notify(self, name, *args):
+        """把引擎的事件转发为对应的信号，需要通知的事件同时放入通知队列"""
+        self._signals[name](*args)
+        notifier = self.notifier
+        if notifier is not None:
+            config = self.engine.config
+            notification = timer_notification(name, config.rest_total, config.focus_time)
+            if notification is not None:
+                notifier.dispatch(notification)
+
+    def snapshot(self):
+        """获取引擎的最新状态快照"""
+        return self.engine.snapshot()
+
+    @property
+    def config(self):
+        """当前设置"""
+        return self.engine.config
+
+    @property
+    def running(self):
+        return self.engine.snapshot().phase in ACTIVE_PHASES
+
+    @property
+    def paused(self):
+        return self.engine.snapshot().phase == PHASE_PAUSED
+
+    @property
+    def away(self):
+        """是否因离开或休眠而自动暂停"""
+        return self.engine.snapshot().away
+
+    @property
+    def idle_detection_enabled(self):
+        return self.engine.config.idle_detection
+
+    @property
+    def timer_slack(self):
+        return self.engine.config.timer_slack
+
+    @property
+    def interval_distribution(self):
+        """提醒间隔分布"""
+        return self.engine.config.distribution
+
+    @property
+    def interval_adapter(self):
+        """可选的自适应间隔估计器"""
+        return self.engine.config.adapter
+
+    @property
+    def history(self):
+        """可选的事件历史记录器"""
+        return self.engine.config.history
 
     def reset_state(self):
-        """重置所有状态变量"""
-        self.paused = False
-        self.is_resting = False
-        self.rest_seconds = 0
-        self.elapsed_time = 0
-        self.next_reminder = 0
-        self.seconds_counter = 0
-        self.reminder_seconds_passed = 0
-        self.reminder_interval_seconds = 0
-        # 发出状态重置信号
+        """通知界面重置进度显示"""
         self.signal_state_reset.emit()
 
     def run(self):
         """线程主运行方法"""
-        # 完全重置所有状态
         self.reset_state()
-        self.running = True
-
-        # 安排第一个提醒间隔
-        self.schedule_next_reminder()
-
-        while self.running:
-            if not self.paused:
-                time.sleep(1)  # 每秒更新一次
-
-                # 退出检查 - 如果在sleep时被停止，立即退出循环
-                if not self.running:
-                    break
-
-                # 专注计时器始终运行
-                self.seconds_counter += 1
-                if self.seconds_counter >= 60:
-                    self.elapsed_time += 1
-                    self.seconds_counter = 0
-                    self.signal_update_progress.emit(self.elapsed_time)
-
-                # 检查专注时间是否到达，优先级最高
-                if self.elapsed_time >= self.focus_time:
-                    self.signal_break_time.emit()
-                    self.running = False
-                    continue
-
-                # 退出检查 - 再次检查是否被停止
-                if not self.running:
-                    break
-
-                if self.is_resting:
-                    # 休息状态计时
-                    self.rest_seconds += 1
-                    self.signal_update_break_progress.emit(
-                        self.rest_seconds, self.rest_total
-                    )
-                    # 检查休息时间是否结束
-                    if self.rest_seconds >= self.rest_total:
-                        self.is_resting = False
-                        self.rest_seconds = 0
-                        self.signal_play_short_break_end_sound.emit()  # 发送短休息结束信号
-                        self.schedule_next_reminder()  # 休息结束后重新安排下一次提醒
-                else:
-                    # 非休息状态下，提醒间隔计时
-                    self.reminder_seconds_passed += 1
-                    if self.reminder_interval_seconds > 0:
-                        self.signal_update_reminder_progress.emit(
-                            self.reminder_seconds_passed, self.reminder_interval_seconds
-                        )
-                    # 检查是否到达提醒间隔
-                    if self.reminder_seconds_passed >= self.reminder_interval_seconds:
-                        self.signal_play_sound.emit()
-                        self.is_resting = True  # 进入休息状态
-                        self.rest_seconds = 0  # 重置休息时间计数器
-                        self.reminder_seconds_passed = 0  # 清零提醒计时
-            else:
-                time.sleep(0.1)  # 暂停时减少CPU使用
-                # 退出检查 - 如果在暂停时被停止，立即退出循环
-                if not self.running:
-                    break
-
-    def schedule_next_reminder(self):
-        """安排下一次随机提醒的时间"""
-        # 将秒转换为分钟，并加上当前已经过的分钟数
-        self.reminder_interval_seconds = random.randint(
-            self.min_interval, self.max_interval
-        )
-        interval_minutes = self.reminder_interval_seconds / 60
-        # 确保下一次提醒时间是基于当前时间计算的，避免立即触发
-        self.next_reminder = self.elapsed_time + interval_minutes
-        self.reminder_seconds_passed = 0  # 重置已经过的秒数
+        self.engine.run()
 
     def get_current_reminder_interval(self):
         """获取当前的提醒间隔（秒）
 
         如果尚未设置提醒间隔，返回0
         """
-        return self.reminder_interval_seconds
+        return self.engine.snapshot().reminder_interval
 
     def stop(self):
         """停止计时器"""
-        # 先设置停止标志
-        self.running = False
+        self.engine.stop()
         # 等待线程完全停止，设置较长的超时确保线程能停止
         if not self.wait(1000):  # 等待最多2秒
             self.terminate()  # 如果线程仍然运行，强制终止
             self.wait(1000)   # 等待终止完成
 
-        # 确保线程已完全停止后再重置状态
+        # 线程已经退出，在当前线程中执行剩余的命令后再重置界面
+        self.engine.drain()
+        self.save_adapter()
         self.reset_state()
 
     def pause(self):
         """暂停计时器"""
-        self.paused = True
+        self.engine.pause()
 
     def resume(self):
         """恢复计时器"""
-        self.paused = False
+        self.engine.resume()
+
+    def restore(self, checkpoint):
+        """从检查点继续中断的专注周期，在start()之前调用"""
+        self.engine.restore(checkpoint)
+
+    def set_idle_detection(self, enabled):
+        """设置是否在用户离开或系统休眠时自动暂停"""
+        self.engine.configure(idle_detection=enabled)
 
     def set_focus_time(self, minutes):
         """设置专注时间"""
-        self.focus_time = minutes
+        self.engine.configure(focus_time=minutes)
 
     def set_reminder_interval(self, min_seconds, max_seconds):
         """设置提醒间隔范围（秒）"""
-        self.min_interval = min_seconds
-        self.max_interval = max_seconds
+        self.engine.configure(min_interval=min_seconds, max_interval=max_seconds)
+
+    def set_interval_distribution(self, distribution):
+        """设置提醒间隔分布，下一次安排提醒时生效"""
+        self.engine.configure(distribution=distribution)
+
+    def set_interval_adapter(self, adapter):
+        """设置自适应间隔估计器，None表示关闭"""
+        previous = self.engine.config.adapter
+        self.engine.configure(adapter=adapter)
+        if previous is not None and previous is not adapter:
+            previous.flush()
+
+    def save_adapter(self, *args):
+        """保存自适应间隔估计器未写入的学习结果（在界面线程中调用）"""
+        adapter = self.engine.config.adapter
+        if adapter is not None:
+            adapter.flush()
+
+    def set_history(self, recorder):
+        """设置事件历史记录器，None表示不记录"""
+        self.engine.configure(history=recorder)
+
+    def set_checkpointer(self, checkpointer):
+        """设置检查点写入器，None表示不写入"""
+        self.engine.configure(checkpointer=checkpointer)
+
+    def set_quiet_hours(self, quiet_hours):
+        """设置免打扰时段，None表示不限制"""
+        self.engine.configure(quiet_hours=quiet_hours)
+
+    def close_quiet_hours(self):
+        """停止免打扰时段的后台展开线程（退出前在停止计时后调用）"""
+        quiet_hours = self.engine.config.quiet_hours
+        if quiet_hours is not None:
+            quiet_hours.close()
+
+    def set_notifier(self, notifier):
+        """设置通知分发器，None表示不发送通知"""
+        self.notifier = notifier
 
     def set_rest_time(self, seconds):
         """设置休息时间（秒）"""
-        self.rest_total = seconds
\ No newline at end of file
+        self.engine.configure(rest_total=seconds)
+
+    def set_timer_slack(self, seconds):
+        """设置省电模式的松弛窗口（秒），0表示关闭"""
+        self.engine.configure(timer_slack=max(0, seconds))
+
+    def set_display_active(self, active):
+        """设置进度界面是否可见，不可见时允许合并唤醒"""
+        self.engine.set_display_active(active)
+
+    def get_wakeup_stats(self):
+        """获取本次运行的唤醒统计"""
+        return self.engine.get_wakeup_stats()
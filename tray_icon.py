@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+from PyQt6.QtGui import QAction, QActionGroup, QColor, QFont, QIcon, QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
+
+from main_window import MainWindow
+from plugin_host import load_plugins
+from quiet_hours import load_quiet_hours
+from session_checkpoint import Checkpointer
+from session_history import HistoryRecorder
+from sound_manager import SoundManager, build_notifier
+from timer_thread import TimerThread
+
+
+class TrayController(QObject):
+    """系统托盘模式
+
+    计时器线程和声音管理器由托盘持有，主窗口隐藏时即销毁，需要时再重建。
+    托盘图标显示当前阶段和距下次提醒的分钟数，每分钟或阶段变化时才刷新一次。
+    """
+
+    # 各阶段的显示名称和图标颜色
+    PHASES = {
+        "stopped": ("未开始", QColor(158, 158, 158)),
+        "focus": ("专注中", QColor(76, 175, 80)),
+        "resting": ("短休息", QColor(33, 150, 243)),
+        "paused": ("已暂停", QColor(255, 152, 0)),
+        "away": ("已离开", QColor(121, 85, 72)),
+        "break": ("长休息", QColor(156, 39, 176)),
+    }
+
+    def __init__(self, low_memory=False, memory_report=None, parent=None):
+        super().__init__(parent)
+        self.low_memory = low_memory
+        self.memory_report = memory_report
+        self.window = None
+        self.phase = "stopped"
+
+        self.timer_thread = TimerThread()
+        self.timer_thread.set_history(HistoryRecorder())
+        self.timer_thread.set_checkpointer(Checkpointer())
+        self.timer_thread.set_quiet_hours(load_quiet_hours())
+        self.sound_manager = SoundManager(release_after=60 if low_memory else 0)
+        # 提醒等事件由计时线程放入通知队列，在工作线程中发送
+        self.notifier = build_notifier(self.sound_manager)
+        self.timer_thread.set_notifier(self.notifier)
+        # 插件与计时器一样由托盘持有，主窗口重建时沿用
+        self.plugins = load_plugins()
+        self.plugins.connect_timer(self.timer_thread)
+
+        self.tray = QSystemTrayIcon(self)
+        self.tray.activated.connect(self.on_activated)
+        self.setup_menu()
+        self.setup_connections()
+
+        # 每分钟刷新一次剩余时间，不需要精确
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.refresh_timer.timeout.connect(self.update_icon)
+        self.refresh_timer.start(60 * 1000)
+
+        self.update_icon()
+        self.tray.show()
+
+    def setup_menu(self):
+        """设置托盘菜单"""
+        self.menu = QMenu()
+
+        show_action = QAction("显示主窗口", self.menu)
+        show_action.triggered.connect(self.show_window)
+        self.menu.addAction(show_action)
+        self.menu.addSeparator()
+
+        self.pause_action = QAction("暂停", self.menu)
+        self.pause_action.triggered.connect(self.toggle_pause)
+        self.menu.addAction(self.pause_action)
+
+        self.stop_action = QAction("停止", self.menu)
+        self.stop_action.triggered.connect(self.stop_timer)
+        self.menu.addAction(self.stop_action)
+
+        # 提示音选择
+        sound_menu = self.menu.addMenu("提示音")
+        sound_group = QActionGroup(sound_menu)
+        self.short_sound_action = QAction("短音效", sound_menu)
+        self.short_sound_action.triggered.connect(self.use_short_sound)
+        self.long_sound_action = QAction("长音效", sound_menu)
+        self.long_sound_action.triggered.connect(self.use_long_sound)
+        for action in (self.short_sound_action, self.long_sound_action):
+            action.setCheckable(True)
+            sound_group.addAction(action)
+            sound_menu.addAction(action)
+
+        self.menu.addSeparator()
+        quit_action = QAction("退出", self.menu)
+        quit_action.triggered.connect(self.quit)
+        self.menu.addAction(quit_action)
+
+        self.menu.aboutToShow.connect(self.update_menu)
+        self.tray.setContextMenu(self.menu)
+
+    def setup_connections(self):
+        """监听计时器的阶段变化"""
+        thread = self.timer_thread
+        thread.signal_play_sound.connect(self.on_reminder)
+        thread.signal_play_short_break_end_sound.connect(self.on_short_break_end)
+        thread.signal_break_time.connect(self.on_break_time)
+        thread.signal_state_reset.connect(self.refresh)
+        thread.signal_presence_changed.connect(self.refresh)
+        thread.signal_phase_changed.connect(self.refresh)
+
+    def current_phase(self):
+        """根据计时引擎的状态快照判断当前阶段"""
+        if self.window is not None and self.window.break_window is not None:
+            return "break"
+        snapshot = self.timer_thread.snapshot()
+        if snapshot.away and snapshot.phase != "paused":
+            return "away"
+        # 引擎的阶段名称与托盘的阶段一一对应
+        return snapshot.phase
+
+    def refresh(self):
+        """阶段变化时立即刷新图标，否则等待每分钟的定时刷新"""
+        phase = self.current_phase()
+        if phase != self.phase:
+            self.update_icon()
+
+    def minutes_to_reminder(self):
+        """距下次提醒的分钟数（向上取整），没有待定提醒时返回None"""
+        snapshot = self.timer_thread.snapshot()
+        if self.phase != "focus" or snapshot.reminder_interval <= 0:
+            return None
+        remaining = snapshot.reminder_interval - snapshot.reminder_passed
+        return max(0, (remaining + 59) // 60)
+
+    def update_icon(self):
+        """重绘托盘图标和提示文字"""
+        self.phase = self.current_phase()
+        name, color = self.PHASES[self.phase]
+        minutes = self.minutes_to_reminder()
+
+        pixmap = QPixmap(64, 64)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawEllipse(2, 2, 60, 60)
+        if minutes is not None:
+            font = QFont()
+            font.setPixelSize(30)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, str(min(minutes, 99)))
+        painter.end()
+        self.tray.setIcon(QIcon(pixmap))
+
+        if minutes is not None:
+            self.tray.setToolTip(f"随机提醒 - {name}，约 {minutes} 分钟后提醒")
+        else:
+            self.tray.setToolTip(f"随机提醒 - {name}")
+
+    def update_menu(self):
+        """菜单弹出前同步各项状态"""
+        running = self.timer_thread.isRunning()
+        self.pause_action.setEnabled(running)
+        self.pause_action.setText("继续" if self.timer_thread.paused else "暂停")
+        self.stop_action.setEnabled(running)
+        is_short = self.sound_manager.current_sound == self.sound_manager.short_sound_file
+        self.short_sound_action.setChecked(is_short)
+        self.long_sound_action.setChecked(not is_short)
+
+    def show_window(self):
+        """显示主窗口，已销毁时重新创建"""
+        if self.window is None:
+            self.window = MainWindow(
+                low_memory=self.low_memory,
+                memory_report=self.memory_report,
+                timer_thread=self.timer_thread,
+                sound_manager=self.sound_manager,
+                plugins=self.plugins,
+            )
+            # 关闭即销毁，计时器继续由托盘持有
+            self.window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            self.window.destroyed.connect(self.on_window_destroyed)
+            self.window.sync_with_timer()
+        self.window.showNormal()
+        self.window.raise_()
+        self.window.activateWindow()
+
+    def on_window_destroyed(self):
+        self.window = None
+        self.refresh()
+
+    def on_activated(self, reason):
+        """单击或双击托盘图标时显示主窗口"""
+        if reason in (
+            QSystemTrayIcon.ActivationReason.Trigger,
+            QSystemTrayIcon.ActivationReason.DoubleClick,
+        ):
+            self.show_window()
+
+    def on_reminder(self):
+        self.refresh()
+        if self.window is None:
+            # 没有主窗口时由托盘显示提醒，提示音由通知渠道播放
+            self.tray.showMessage("随机提醒", f"请休息{self.timer_thread.config.rest_total}秒钟!")
+
+    def on_short_break_end(self):
+        self.refresh()
+
+    def on_break_time(self):
+        if self.window is None:
+            # 专注周期结束需要用户选择，重建主窗口并交给它处理
+            self.show_window()
+            self.window.show_break_time()
+        self.refresh()
+
+    def toggle_pause(self):
+        """暂停或继续"""
+        if self.window is not None:
+            if self.timer_thread.paused:
+                self.window.start_timer()
+            else:
+                self.window.pause_timer()
+        elif self.timer_thread.paused:
+            self.timer_thread.resume()
+        else:
+            self.timer_thread.pause()
+        self.refresh()
+
+    def stop_timer(self):
+        """停止计时"""
+        if self.window is not None:
+            self.window.stop_timer()
+        elif self.timer_thread.isRunning():
+            self.timer_thread.stop()
+        self.refresh()
+
+    def use_short_sound(self):
+        if self.window is not None:
+            self.window.use_short_sound()
+        else:
+            self.sound_manager.use_short_sound()
+
+    def use_long_sound(self):
+        if self.window is not None:
+            self.window.use_long_sound()
+        else:
+            self.sound_manager.use_long_sound()
+
+    def quit(self):
+        """退出应用"""
+        if self.timer_thread.isRunning():
+            self.timer_thread.stop()
+        self.notifier.close()
+        self.timer_thread.close_quiet_hours()
+        if self.window is not None:
+            self.window.close()
+        self.tray.hide()
+        QApplication.quit()
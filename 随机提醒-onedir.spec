@@ -0,0 +1,118 @@
+# -*- mode: python ; coding: utf-8 -*-
+# 面向启动速度的打包配置：pyinstaller 随机提醒-onedir.spec
+#
+# 与 随机提醒.spec 的区别:
+# - 单目录布局，启动时不再把整个程序解压到临时目录
+# - 排除用不到的Qt模块和标准库模块，去掉Qt翻译文件和用不到的插件
+# - 字节码按 -OO 预编译
+# - 不使用UPX（压缩过的动态库每次加载都要先解压）
+
+import os
+import re
+
+block_cipher = None
+
+# 程序只用到 QtCore、QtGui、QtWidgets、QtMultimedia
+QT_EXCLUDES = [
+    'PyQt6.Qt3DAnimation', 'PyQt6.Qt3DCore', 'PyQt6.Qt3DExtras', 'PyQt6.Qt3DInput',
+    'PyQt6.Qt3DLogic', 'PyQt6.Qt3DRender', 'PyQt6.QtBluetooth', 'PyQt6.QtCharts',
+    'PyQt6.QtDataVisualization', 'PyQt6.QtDBus', 'PyQt6.QtDesigner', 'PyQt6.QtHelp',
+    'PyQt6.QtMultimediaWidgets', 'PyQt6.QtNetwork', 'PyQt6.QtNfc', 'PyQt6.QtOpenGL',
+    'PyQt6.QtOpenGLWidgets', 'PyQt6.QtPdf', 'PyQt6.QtPdfWidgets', 'PyQt6.QtPositioning',
+    'PyQt6.QtPrintSupport', 'PyQt6.QtQml', 'PyQt6.QtQuick', 'PyQt6.QtQuick3D',
+    'PyQt6.QtQuickWidgets', 'PyQt6.QtRemoteObjects', 'PyQt6.QtSensors', 'PyQt6.QtSerialPort',
+    'PyQt6.QtSpatialAudio', 'PyQt6.QtSql', 'PyQt6.QtSvg', 'PyQt6.QtSvgWidgets',
+    'PyQt6.QtTest', 'PyQt6.QtTextToSpeech', 'PyQt6.QtWebChannel', 'PyQt6.QtWebEngineCore',
+    'PyQt6.QtWebEngineQuick', 'PyQt6.QtWebEngineWidgets', 'PyQt6.QtWebSockets', 'PyQt6.QtXml',
+    'PyQt6.lupdate', 'PyQt6.uic',
+]
+STDLIB_EXCLUDES = [
+    'tkinter', 'unittest', 'doctest', 'pydoc', 'pdb', 'lib2to3', 'idlelib', 'test', 'xmlrpc',
+]
+
+# 保留的Qt插件目录（平台、主题、输入法、样式、多媒体后端、图片格式）
+# QtGui只内置PNG，休息活动内容包中的JPEG、GIF等由imageformats中的插件解码
+QT_PLUGIN_KEEP = {
+    'platforms', 'platformthemes', 'platforminputcontexts', 'styles', 'multimedia', 'imageformats',
+    'wayland-decoration-client', 'wayland-graphics-integration-client',
+    'wayland-shell-integration', 'xcbglintegrations',
+}
+# 排除的插件不再需要的Qt动态库；界面是光栅绘制，也不需要Windows的软件OpenGL
+QT_LIBRARY_EXCLUDE = re.compile(
+    r'(Qt6(Quick|Qml|Pdf|VirtualKeyboard|Svg|WebEngine|Designer)|opengl32sw)', re.IGNORECASE
+)
+# 依赖已排除的Qt动态库的图片格式插件
+QT_IMAGEFORMAT_EXCLUDE = re.compile(r'(svg|pdf)', re.IGNORECASE)
+QT_ROOT = 'PyQt6/Qt6/'
+
+
+def keep_qt_file(entry):
+    """是否保留Qt的数据文件或动态库"""
+    dest = entry[0].replace('\\', '/')
+    if not dest.startswith(QT_ROOT):
+        return not QT_LIBRARY_EXCLUDE.search(os.path.basename(dest))
+    parts = dest[len(QT_ROOT):].split('/')
+    if parts[0] == 'translations':
+        return False
+    if parts[0] == 'plugins':
+        if len(parts) > 2 and parts[1] == 'imageformats':
+            return not QT_IMAGEFORMAT_EXCLUDE.search(parts[-1])
+        return len(parts) > 1 and parts[1] in QT_PLUGIN_KEEP
+    return not QT_LIBRARY_EXCLUDE.search(parts[-1])
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('static/*.wav', 'static')],  # 添加音效文件
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=QT_EXCLUDES + STDLIB_EXCLUDES,
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+    optimize=2,
+)
+a.binaries = [entry for entry in a.binaries if keep_qt_file(entry)]
+a.datas = [entry for entry in a.datas if keep_qt_file(entry)]
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='随机提醒',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=True,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='随机提醒',
+)
+
+app = BUNDLE(
+    coll,
+    name='随机提醒.app',
+    icon=None,
+    bundle_identifier=None,
+)